@@ -0,0 +1,82 @@
+from collections.abc import Sequence
+from functools import cache
+from typing import Any
+
+import pygame
+
+from background import COLOR_KEY, background_images, draw_background_images
+from blocks import (
+    cached_images,
+    cached_masks,
+    collectible_images,
+    draw_block_images,
+    draw_collectible_images,
+    draw_tree_images,
+    tree_images,
+)
+from shooting import bullet_images, draw_bullet_images
+
+ATLAS_WIDTH = 256
+
+Images = dict[Any, pygame.surface.Surface]
+
+
+def pack(
+    sizes: Sequence[tuple[int, int]], width: int
+) -> tuple[list[pygame.rect.Rect], tuple[int, int]]:
+    """Places rectangles in rows, tallest first, returning them and the total size"""
+    width = max([width, *(w for w, _ in sizes)])
+    rects = [pygame.rect.Rect(0, 0, *size) for size in sizes]
+    x, y, row_height = 0, 0, 0
+    for rect in sorted(rects, key=lambda rect: rect.height, reverse=True):
+        if x + rect.width > width:
+            x, y, row_height = 0, y + row_height, 0
+        rect.topleft = (x, y)
+        x += rect.width
+        row_height = max(row_height, rect.height)
+    return rects, (width, y + row_height)
+
+
+class Atlas:
+    """Sprites packed into one display format surface, each one a subsurface"""
+
+    def __init__(self, images: Sequence[pygame.surface.Surface], alpha: bool) -> None:
+        rects, size = pack([image.get_size() for image in images], ATLAS_WIDTH)
+        image = pygame.surface.Surface(size, pygame.SRCALPHA if alpha else 0)
+        # maximum over the cleared atlas copies pixels without blending them
+        special_flags = pygame.BLEND_RGBA_MAX if alpha else 0
+        for sprite, rect in zip(images, rects):
+            image.blit(sprite, rect, special_flags=special_flags)
+        self.image = image.convert_alpha() if alpha else image.convert()
+        self.sprites = [self.image.subsurface(rect) for rect in rects]
+
+
+@cache
+def load_assets():
+    """Draws every procedural sprite once per run, in the display's pixel format"""
+    tables: list[tuple[Images, Images]] = [
+        (cached_images, draw_block_images()),
+        (collectible_images, draw_collectible_images()),
+        (tree_images, draw_tree_images()),
+        (bullet_images, draw_bullet_images()),
+    ]
+    opaque, transparent = [], []
+    for table, images in tables:
+        for key, image in images.items():
+            if image.get_flags() & pygame.SRCALPHA:
+                transparent.append((table, key, image))
+            else:
+                opaque.append((table, key, image))
+    for group, alpha in ((opaque, False), (transparent, True)):
+        atlas = Atlas([image for _, _, image in group], alpha)
+        for (table, key, _), sprite in zip(group, atlas.sprites):
+            table[key] = sprite
+    for block_class, image in cached_images.items():
+        cached_masks[block_class] = pygame.mask.from_surface(image)
+
+    for background_class, layers in draw_background_images().items():
+        for index, layer in layers.items():
+            layer = layer.convert()
+            # the key turns into the transparent sky when the layers are uploaded
+            layer.set_colorkey(COLOR_KEY)
+            background_images[background_class][index] = layer
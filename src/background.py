@@ -1,3 +1,5 @@
+import math
+
 import pygame
 
 from biome import Biome
@@ -13,10 +15,14 @@ def blank_background(mult: int = 1):
 
 class BackgroundResolver:
     def __init__(self) -> None:
-        self.mountains = Mountains()
+        # one instance per biome, their layers are shared through background_images
+        self.backgrounds = {
+            biome: background_class()
+            for biome, background_class in biome_backgrounds.items()
+        }
 
-    def resolve(self, _: Biome, player_position: pygame.math.Vector2):
-        return self.mountains.get_image(player_position)
+    def select(self, biome: Biome) -> "Background":
+        return self.backgrounds[biome]
 
 
 class Background:
@@ -26,20 +32,6 @@ class Background:
         2: 0.7,
         3: 0.5,
     }
-    canvas = blank_background()
-
-    def get_image(self, position: pygame.math.Vector2):
-        delta_x = position.x % SCREEN_WIDTH
-        layers = background_images[self.__class__]
-        img = self.canvas
-        img.fill(self.color)
-        img.blits(
-            tuple(
-                (layers[index], (-disp * delta_x, 0))
-                for index, disp in self.displacements.items()
-            )
-        )
-        return img
 
 
 class Mountains(Background):
@@ -47,18 +39,40 @@ class Mountains(Background):
         self.color = Color.SKY
 
 
-background_images: dict[type[Background], dict[int, pygame.surface.Surface]] = {
-    Mountains: {
-        1: blank_background(),
-        2: blank_background(),
-        3: blank_background(),
-    },
+class Hills(Background):
+    def __init__(self) -> None:
+        self.color = Color.SKY
+
+
+class Dunes(Background):
+    def __init__(self) -> None:
+        self.color = Color.DESERT_SKY
+
+
+biome_backgrounds: dict[Biome, type[Background]] = {
+    Biome.MOUNTAINS: Mountains,
+    Biome.HILLS: Hills,
+    Biome.DUNES: Dunes,
 }
 
+Layers = dict[int, pygame.surface.Surface]
+
+# full screen layers are drawn once by the asset manager, not at import
+background_images: dict[type[Background], Layers] = {
+    background_class: {} for background_class in biome_backgrounds.values()
+}
 
-def load_background_images():
-    for index in Background.displacements:
-        background_images[Mountains][index] = make_mountain_background(index)
+
+def draw_background_images() -> dict[type[Background], Layers]:
+    makers = {
+        Mountains: make_mountain_background,
+        Hills: make_hill_background,
+        Dunes: make_dune_background,
+    }
+    return {
+        background_class: {index: make(index) for index in Background.displacements}
+        for background_class, make in makers.items()
+    }
 
 
 def make_mountain_background(layer: int):
@@ -67,24 +81,64 @@ def make_mountain_background(layer: int):
         2: Color.MOUNTAIN_2,
         3: Color.MOUNTAIN_3,
     }
-    img = blank_background()
-    width, height = img.get_size()
-    disp = Background.displacements[layer]
-    width *= disp
-    img = pygame.transform.scale(img, (width, height))
+    width = SCREEN_WIDTH * Background.displacements[layer]
+    height = SCREEN_HEIGHT
+    img = blank_background(2)
+    img.fill(COLOR_KEY)
+    img.set_colorkey(COLOR_KEY)
+    # one mountain per repetition, drawn straight into the scrolling strip
+    for i in range(4):
+        left = i * width
+        pygame.draw.polygon(
+            img,
+            colors[layer],
+            [
+                (left + width // 2, (height // 8) * layer),
+                (left, height),
+                (left + width, height),
+            ],
+        )
+    return img
+
+
+def make_hill_background(layer: int):
+    colors = {
+        1: Color.HILL_1,
+        2: Color.HILL_2,
+        3: Color.HILL_3,
+    }
+    width = SCREEN_WIDTH * Background.displacements[layer]
+    height = SCREEN_HEIGHT
+    img = blank_background(2)
+    img.fill(COLOR_KEY)
+    img.set_colorkey(COLOR_KEY)
+    # two rounded hills per repetition, starting left of the strip for the overlap
+    for i in range(-1, 9):
+        top = (height // 4) + (height // 10) * layer + (i % 2) * (height // 12)
+        rect = pygame.rect.Rect(i * width / 2, top, width / 2, 2 * (height - top))
+        pygame.draw.ellipse(img, colors[layer], rect.inflate(width / 4, 0))
+    return img
+
+
+def make_dune_background(layer: int):
+    colors = {
+        1: Color.DUNE_1,
+        2: Color.DUNE_2,
+        3: Color.DUNE_3,
+    }
+    width = SCREEN_WIDTH * Background.displacements[layer]
+    height = SCREEN_HEIGHT
+    img = blank_background(2)
     img.fill(COLOR_KEY)
     img.set_colorkey(COLOR_KEY)
+    # a sine wave repeating every width, so the strip scrolls seamlessly
+    crest = height // 3 + (height // 10) * layer
+    swell = height // 16
+    points = [
+        (x, crest + swell * math.sin(2 * math.pi * x / width))
+        for x in range(0, img.get_width() + 1, 8)
+    ]
     pygame.draw.polygon(
-        img,
-        colors[layer],
-        [
-            (width // 2, (height // 8) * layer),
-            (0, height),
-            (width, height),
-        ],
+        img, colors[layer], [*points, (img.get_width(), height), (0, height)]
     )
-    img2 = blank_background(2)
-    img2.fill(COLOR_KEY)
-    img2.set_colorkey(COLOR_KEY)
-    img2.blits(tuple((img, (i * img.get_width(), 0)) for i in range(4)))
-    return img2
+    return img
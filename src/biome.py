@@ -1,6 +1,72 @@
-class Biome:
-    ...
+import enum
+import random
+from array import array
+from collections.abc import Sequence
 
+from settings import BIOME_FADE, BIOME_WIDTH, BLOCK_SIZE
 
-def get_biome():
-    ...
+
+class Biome(enum.IntEnum):
+    MOUNTAINS = 0
+    HILLS = 1
+    DUNES = 2
+
+
+class BiomeMap:
+    """Biome of every world column, with how much of its neighbour fades in
+
+    Everything is computed when the world is generated, so a lookup is one
+    index into each array however many biomes there are.
+    """
+
+    def __init__(self, biomes: Sequence[int], fade: int = BIOME_FADE) -> None:
+        self.biomes = bytearray(biomes)
+        self.neighbours = bytearray(biomes)
+        self.weights = array("f", bytes(4 * len(biomes)))
+
+        borders = [x for x in range(1, len(biomes)) if biomes[x] != biomes[x - 1]]
+        for border in borders:
+            # the neighbour is half blended in at a border, gone fade columns away
+            for distance in range(fade):
+                weight = 0.5 * (1 - (distance + 0.5) / fade)
+                for column, neighbour in (
+                    (border - 1 - distance, biomes[border]),
+                    (border + distance, biomes[border - 1]),
+                ):
+                    if 0 <= column < len(biomes):
+                        self.neighbours[column] = neighbour
+                        self.weights[column] = weight
+
+    @classmethod
+    def generate(
+        cls,
+        columns: int,
+        width: tuple[int, int] = BIOME_WIDTH,
+        fade: int = BIOME_FADE,
+        seed: int | None = None,
+    ):
+        """Splits the columns into runs of random biomes, never the same twice"""
+        # follows the global seed, so seeded runs generate the same world
+        rng = random.Random(random.getrandbits(32) if seed is None else seed)
+        biomes: list[int] = []
+        biome = rng.randrange(len(Biome))
+        while len(biomes) < columns:
+            biomes.extend([biome] * rng.randint(*width))
+            biome = (biome + rng.randrange(1, len(Biome))) % len(Biome)
+        return cls(biomes[:columns], fade)
+
+    def _column(self, x: float):
+        return min(max(int(x // BLOCK_SIZE), 0), len(self.biomes) - 1)
+
+    def get_biome(self, x: float):
+        """Biome at the horizontal world position, in pixels"""
+        return Biome(self.biomes[self._column(x)])
+
+    def get_blend(self, x: float) -> tuple[Biome, Biome, float]:
+        """Biome at the position, the one fading in and how much it shows"""
+        column = self._column(x)
+        return (
+            Biome(self.biomes[column]),
+            Biome(self.neighbours[column]),
+            self.weights[column],
+        )
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
+import enum
 import random
 from abc import ABC, ABCMeta, abstractmethod
 
 import pygame
 
-from background import load_background_images
 from colors import Color
 from draw import BorderOptions, FillBorderColors, draw_bordered_rect
 from materials import BaseMaterial
@@ -13,7 +13,6 @@ from materials import Rock as RockMaterial
 from materials import Wood as WoodMaterial
 from materials import all_materials
 from settings import BLOCK_SIZE
-from shooting import load_bullet_images
 from sprites import GravitySprite
 from utils.container import Container2d
 from utils.coords import Coords
@@ -21,12 +20,20 @@ from utils.coords import Coords
 COLLECTIBLE_SIZE = BLOCK_SIZE // 2
 
 
+class CollisionShape(enum.IntEnum):
+    NONE = enum.auto()
+    TILE = enum.auto()
+    MASK = enum.auto()
+
+
 class BaseCollectible(GravitySprite, ABC, metaclass=ABCMeta):
     @property
     def collectible_image(self):
-        return collectible_images.get(
-            self.__class__, pygame.surface.Surface((COLLECTIBLE_SIZE, COLLECTIBLE_SIZE))
-        )
+        image = collectible_images.get(self.__class__)
+        if image is None:
+            size = (COLLECTIBLE_SIZE, COLLECTIBLE_SIZE)
+            image = collectible_images[self.__class__] = pygame.surface.Surface(size)
+        return image
 
     @property
     @abstractmethod
@@ -39,9 +46,11 @@ class BaseCollectible(GravitySprite, ABC, metaclass=ABCMeta):
         gravity: int | None = None,
         terminal_velocity: int | None = None,
         blocks: Container2d[BaseBlock] | None = None,
+        count: int = 1,
     ) -> None:
         super().__init__(gravity or 0, terminal_velocity or 0)
         self.coords = coords
+        self.count = count
         self.rect = self.collectible_image.get_rect().copy()
         padding = 1
         self.rect.centerx = random.randint(
@@ -73,6 +82,21 @@ class BaseCollectible(GravitySprite, ABC, metaclass=ABCMeta):
     def update(self, dt: float):
         super().update(dt)
         self.update_position(dt)
+        self.update_rest_time(dt)
+
+    def is_resting(self) -> bool:
+        return super().is_resting() and not self.pulling_velocity
+
+    def can_merge(self, other: BaseCollectible):
+        return other is not self and other.__class__ is self.__class__
+
+    def merge(self, other: BaseCollectible):
+        self.count += other.count
+        other.kill()
+
+    @property
+    def support_coords(self) -> Coords:
+        return (self.rect.centerx // BLOCK_SIZE, (self.rect.bottom + 1) // BLOCK_SIZE)
 
     def update_position(self, dt: float):
         self.rect.centery += int(
@@ -88,6 +112,9 @@ class BaseCollectible(GravitySprite, ABC, metaclass=ABCMeta):
 
 
 class BaseBlock(BaseCollectible, ABC, metaclass=ABCMeta):
+    # irregular shapes collide by mask, the rest fill the whole tile
+    collision_shape: CollisionShape = CollisionShape.TILE
+
     @property
     @abstractmethod
     def material(self) -> BaseMaterial:
@@ -104,8 +131,9 @@ class BaseBlock(BaseCollectible, ABC, metaclass=ABCMeta):
         gravity: int | None = None,
         terminal_velocity: int | None = None,
         blocks: Container2d[BaseBlock] | None = None,
+        count: int = 1,
     ) -> None:
-        super().__init__(coords, gravity, terminal_velocity, blocks)
+        super().__init__(coords, gravity, terminal_velocity, blocks, count)
         self.rect = pygame.rect.Rect((0, 0, BLOCK_SIZE, BLOCK_SIZE))
         self.coords = coords
         self.rect.x, self.rect.y = (coords[0] * BLOCK_SIZE, coords[1] * BLOCK_SIZE)
@@ -157,6 +185,7 @@ class Wood(BaseBlock):
 class Spike(BaseHazard):
     material: BaseMaterial = all_materials[RockMaterial]
     damage: int = 10
+    collision_shape: CollisionShape = CollisionShape.MASK
 
     @property
     def collectibles(self) -> dict[type[BaseCollectible], int]:
@@ -196,15 +225,17 @@ class ChangingBlock(BaseBlock, metaclass=ABCMeta):
                 self.state += 1
 
 
-tree_images = {
-    0: pygame.surface.Surface((BLOCK_SIZE, BLOCK_SIZE)),
-    1: pygame.surface.Surface((BLOCK_SIZE, 2 * BLOCK_SIZE)),
-    2: pygame.surface.Surface((BLOCK_SIZE, 3 * BLOCK_SIZE)),
-    3: pygame.surface.Surface((3 * BLOCK_SIZE, 5 * BLOCK_SIZE)),
-    4: pygame.surface.Surface((3 * BLOCK_SIZE, 6 * BLOCK_SIZE)),
-    5: pygame.surface.Surface((3 * BLOCK_SIZE, 7 * BLOCK_SIZE)),
-    6: pygame.surface.Surface((5 * BLOCK_SIZE, 9 * BLOCK_SIZE)),
+# in blocks, the images are drawn by draw_tree_images
+TREE_SIZES = {
+    0: (1, 1),
+    1: (1, 2),
+    2: (1, 3),
+    3: (3, 5),
+    4: (3, 6),
+    5: (3, 7),
+    6: (5, 9),
 }
+tree_images: dict[int, pygame.surface.Surface] = {}
 
 
 class Tree(ChangingBlock):
@@ -213,6 +244,7 @@ class Tree(ChangingBlock):
     counter: int = 0
     images: dict[int, pygame.surface.Surface] = tree_images
     max_state: int = 6
+    collision_shape: CollisionShape = CollisionShape.NONE
 
     @property
     def collectibles(self) -> dict[type[BaseCollectible], int]:
@@ -228,7 +260,8 @@ class Tree(ChangingBlock):
 
     @property
     def rect(self):
-        rect = self.image.get_rect()
+        width, height = TREE_SIZES[self.state]
+        rect = pygame.rect.Rect(0, 0, width * BLOCK_SIZE, height * BLOCK_SIZE)
         rect.x, rect.y = (self.coords[0] * BLOCK_SIZE, self.coords[1] * BLOCK_SIZE)
         if self.state == 0:
             pass
@@ -255,19 +288,12 @@ class Tree(ChangingBlock):
         ...
 
 
-cached_images: dict[type[BaseBlock], pygame.surface.Surface] = {
-    Rock: pygame.surface.Surface((BLOCK_SIZE, BLOCK_SIZE)),
-    Spike: pygame.surface.Surface((BLOCK_SIZE, BLOCK_SIZE)),
-    Wood: pygame.surface.Surface((BLOCK_SIZE, BLOCK_SIZE)),
-}
+# filled by the asset manager rather than at import
+cached_images: dict[type[BaseBlock], pygame.surface.Surface] = {}
 
 cached_masks: dict[type[BaseBlock], pygame.mask.Mask] = {}
 
-collectible_images: dict[type[BaseCollectible], pygame.surface.Surface] = {
-    Rock: pygame.surface.Surface((COLLECTIBLE_SIZE, COLLECTIBLE_SIZE)),
-    Spike: pygame.surface.Surface((COLLECTIBLE_SIZE, COLLECTIBLE_SIZE)),
-    Wood: pygame.surface.Surface((COLLECTIBLE_SIZE, COLLECTIBLE_SIZE)),
-}
+collectible_images: dict[type[BaseCollectible], pygame.surface.Surface] = {}
 
 
 def get_tree_image(state: int, surf: pygame.surface.Surface):
@@ -349,71 +375,66 @@ def get_tree_image(state: int, surf: pygame.surface.Surface):
     return surf
 
 
-def load_collectible_images():
-    img = collectible_images[Rock]
+def draw_collectible_images() -> dict[type[BaseCollectible], pygame.surface.Surface]:
+    size = (COLLECTIBLE_SIZE, COLLECTIBLE_SIZE)
+    rock = pygame.surface.Surface(size)
     draw_bordered_rect(
-        img,
-        img.get_rect(),
+        rock,
+        rock.get_rect(),
         FillBorderColors(Color.ROCK_FILL, Color.ROCK_BORDER),
         BorderOptions(width=2),
     )
 
-    img = collectible_images[Spike]
-    img = img.convert_alpha()
-    img.fill(Color.TRANSPARENT)
-    rect = img.get_rect()
+    spike = pygame.surface.Surface(size, pygame.SRCALPHA)
+    spike.fill(Color.TRANSPARENT)
+    rect = spike.get_rect()
     pygame.draw.polygon(
-        img,
+        spike,
         Color.ROCK_FILL,
         (rect.bottomleft, (rect.centerx, rect.top), rect.bottomright),
     )
-    collectible_images[Spike] = img
 
-    img = collectible_images[Wood]
+    wood = pygame.surface.Surface(size)
     draw_bordered_rect(
-        img,
-        img.get_rect(),
+        wood,
+        wood.get_rect(),
         FillBorderColors(Color.TRUNK_FILL, Color.TRUNK_BORDER),
         BorderOptions(width=2),
     )
+    return {Rock: rock, Spike: spike, Wood: wood}
 
 
-def load_tree_images():
-    for index, surf in tree_images.items():
-        surf = surf.convert_alpha()
+def draw_tree_images() -> dict[int, pygame.surface.Surface]:
+    images = {}
+    for index, (width, height) in TREE_SIZES.items():
+        size = (width * BLOCK_SIZE, height * BLOCK_SIZE)
+        surf = pygame.surface.Surface(size, pygame.SRCALPHA)
         surf.fill(Color.TRANSPARENT)
-        tree_images[index] = get_tree_image(index, surf)
+        images[index] = get_tree_image(index, surf)
+    return images
 
 
-def draw_cached_images():
-    img = cached_images[Rock]
+def draw_block_images() -> dict[type[BaseBlock], pygame.surface.Surface]:
+    size = (BLOCK_SIZE, BLOCK_SIZE)
+    rock = pygame.surface.Surface(size)
     draw_bordered_rect(
-        img, img.get_rect(), FillBorderColors(Color.ROCK_FILL, Color.ROCK_BORDER)
+        rock, rock.get_rect(), FillBorderColors(Color.ROCK_FILL, Color.ROCK_BORDER)
     )
-    cached_masks[Rock] = pygame.mask.from_surface(img)
 
-    img = cached_images[Spike]
-    img = img.convert_alpha()
-    img.fill(Color.TRANSPARENT)
-    rect = img.get_rect()
+    spike = pygame.surface.Surface(size, pygame.SRCALPHA)
+    spike.fill(Color.TRANSPARENT)
+    rect = spike.get_rect()
     pygame.draw.polygon(
-        img,
+        spike,
         Color.ROCK_FILL,
         (rect.bottomleft, (rect.centerx, rect.top), rect.bottomright),
     )
-    cached_images[Spike] = img
-    cached_masks[Spike] = pygame.mask.from_surface(img)
 
-    img = cached_images[Wood]
+    wood = pygame.surface.Surface(size)
     draw_bordered_rect(
-        img, img.get_rect(), FillBorderColors(Color.TRUNK_FILL, Color.TRUNK_BORDER)
+        wood, wood.get_rect(), FillBorderColors(Color.TRUNK_FILL, Color.TRUNK_BORDER)
     )
-    cached_masks[Wood] = pygame.mask.from_surface(img)
-
-    load_tree_images()
-    load_collectible_images()
-    load_bullet_images()
-    load_background_images()
+    return {Rock: rock, Spike: spike, Wood: wood}
 
 
 def make_block(
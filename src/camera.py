@@ -1,47 +1,65 @@
 from itertools import product
+from math import ceil
 from typing import Iterable
 
 import pygame
-from moderngl import Context
 from numpy import divide
 
 from background import BackgroundResolver
-from biome import Biome
 from characters import BaseCharacter, Mode
 from colors import Color, InterfaceColor
-from interface import BaseInterfaceElement
-from lighting import ShadowCaster
+from interface import BaseInterfaceElement, Hud
 from log import log
 from settings import BLOCK_SIZE, DEBUG
-from shaders.shader import TextureShader
+from shaders.shader import View
 from utils.blit import blit_multiple
 from world import World
 
 
+def split_screen(size: tuple[int, int], count: int) -> list[pygame.rect.Rect]:
+    """Screen regions for each player, stacked for two and in a grid for more"""
+    width, height = size
+    if count <= 1:
+        return [pygame.rect.Rect(0, 0, width, height)]
+    if count == 2:
+        return [
+            pygame.rect.Rect(0, 0, width, height // 2),
+            pygame.rect.Rect(0, height // 2, width, height // 2),
+        ]
+    rows = ceil(count / 2)
+    return [
+        pygame.rect.Rect(
+            i % 2 * width // 2, i // 2 * height // rows, width // 2, height // rows
+        )
+        for i in range(count)
+    ]
+
+
 class Camera:
     def __init__(
         self,
-        ctx: Context,
         size: tuple[int, int],
         player: BaseCharacter,
         world: World,
         interface_elements: Iterable[BaseInterfaceElement] | None = None,
-        characters: list[BaseCharacter] | None = None,
+        screen_position: tuple[int, int] = (0, 0),
+        scene: pygame.surface.Surface | None = None,
+        overlay: pygame.surface.Surface | None = None,
     ) -> None:
-        self.ctx = ctx
         self.width, self.height = size
         self.rect = pygame.rect.Rect(0, 0, self.width, self.height)
+        # region of the shared display this camera draws into
+        self.viewport = pygame.rect.Rect(screen_position, size)
+        # drawn with a transparent sky, the background and lighting are added on
+        # the GPU, with the interface drawn over it unlit
+        self.scene = scene
+        self.overlay = overlay
         self.position = pygame.math.Vector2()
         self.player = player
         self.world = world
-        self.interface_elements = interface_elements or []
-        self.characters = pygame.sprite.Group()
-        if characters:
-            self.characters.add(*characters)
+        self.hud = Hud(interface_elements or [])
         self.background_resolver = BackgroundResolver()
-        self.shadow_caster = ShadowCaster(self.world.blocks, self.rect)
         self._setup()
-        self.shader = TextureShader(self.ctx)
 
     def _setup(self):
         self.highlight = pygame.surface.Surface(
@@ -55,12 +73,16 @@ class Camera:
             2,
             4,
         )
-        self.display_surface = pygame.display.get_surface()
+        scene = self.scene or pygame.display.get_surface()
+        self.display_surface = scene.subsurface(self.viewport)
+        self.overlay_surface = (self.overlay or scene).subsurface(self.viewport)
 
     def update(self):
         self._update_rect()
         self._update_position()
-        self._draw_background(self.player.position)
+        self.display_surface.fill(Color.TRANSPARENT)
+        if self.overlay is not None:
+            self.overlay_surface.fill(Color.TRANSPARENT)
         self._draw_player()
         self._draw_characters()
         self._draw_collectibles()
@@ -69,7 +91,6 @@ class Camera:
         self._draw_visible_area()
         self._draw_interface_elements()
         self._draw_player_cursor()
-        self.shader.render(self.display_surface)
 
     def _update_rect(self):
         self.rect.center = self.player.rect.center
@@ -91,9 +112,19 @@ class Camera:
     def _update_position(self):
         self.position.update(self.rect.topleft)
 
-    def _draw_background(self, position: pygame.math.Vector2):
-        background = self.background_resolver.resolve(Biome(), position)
-        self.display_surface.blit(background, (0, 0))
+    @property
+    def view(self):
+        x = self.player.position.x
+        biome, neighbour, fade = self.world.biomes.get_blend(x)
+        return View(
+            self.viewport,
+            x,
+            self.background_resolver.select(biome),
+            self.background_resolver.select(neighbour),
+            fade,
+            (self.position.x, self.position.y),
+            self.player.light,
+        )
 
     def _draw_visible_area(self):
         margin = 3
@@ -111,13 +142,6 @@ class Camera:
         ):
             if block := self.world.get_block(coords):
                 self.display_surface.blit(block.image, block.rect.move(-self.position))
-
-            self.shadow_caster.cast(
-                coords,
-                -self.position,
-                self.display_surface,
-                self.player.light.get_opacity(coords),
-            )
         if DEBUG:
             for photon in self.player.light.photons:
                 photon = photon[0] - self.position.x, photon[1] - self.position.y
@@ -137,6 +161,11 @@ class Camera:
         if self.player.image is None or self.player.cursor_image is None:
             raise self.player.UnloadedObject
 
+        for player in self.world.players.sprites():
+            if player is not self.player and self.rect.colliderect(player.rect):
+                self.display_surface.blit(
+                    player.image, player.rect.move(-self.position)
+                )
         self.display_surface.blit(
             self.player.image, self.player.rect.move(-self.position)
         )
@@ -161,7 +190,7 @@ class Camera:
     def _draw_block_cursor(self):
         if not self.player.cursor_position:
             return
-        self.display_surface.blit(
+        self.overlay_surface.blit(
             self.highlight,
             (self.player.position + self.player.cursor_position)
             // BLOCK_SIZE
@@ -182,19 +211,19 @@ class Camera:
         aim_min.from_polar((self.player.shooting_range, cursor_angle - angle_deviation))
         if aim_min and aim_max and self.player.cursor_position:
             pygame.draw.line(
-                self.display_surface,
+                self.overlay_surface,
                 InterfaceColor.AIM_ASSIST_LINE,
                 self.player.rect.move(-self.position).center,
                 self.rect.move(aim_max).move(-self.position).center,
             )
             pygame.draw.line(
-                self.display_surface,
+                self.overlay_surface,
                 InterfaceColor.AIM_ASSIST_LINE,
                 self.player.rect.move(-self.position).center,
                 self.rect.move(aim_min).move(-self.position).center,
             )
             pygame.draw.circle(
-                self.display_surface,
+                self.overlay_surface,
                 InterfaceColor.AIM_ASSIST_LINE,
                 self.player.rect.move(-self.position).center,
                 self.player.shooting_range,
@@ -203,8 +232,8 @@ class Camera:
 
     def _draw_characters(self):
         width, height = 50, 5
-        for character in self.characters.sprites():
-            if character.image is None:
+        for character in self.world.characters_buffer.sprites():
+            if character.image is None or not self.rect.colliderect(character.rect):
                 continue
             character_rect = character.rect.move(-self.position)
             self.display_surface.blit(character.image, character_rect)
@@ -227,5 +256,4 @@ class Camera:
         self.world.particle_manager.draw(self.display_surface, -self.position)
 
     def _draw_interface_elements(self):
-        for element in self.interface_elements:
-            element.draw()
+        self.hud.draw(self.overlay_surface)
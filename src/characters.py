@@ -4,14 +4,20 @@ import enum
 import math
 import random
 from abc import ABC, abstractmethod
-from itertools import product
-from typing import Optional
+from typing import Iterator, Optional
 
 import pygame
 
-from blocks import BaseBlock, BaseCollectible, BaseHazard, make_block
+from blocks import (
+    BaseBlock,
+    BaseCollectible,
+    BaseHazard,
+    CollisionShape,
+    make_block,
+)
 from colors import Color
 from commons import Damageable, Loadable, Storable
+from events import DestroyBlock, Event, EventBus, PlaceBlock, Shoot
 from input.constants import Controller
 from input.controllers import (
     AIPlayerController,
@@ -24,11 +30,17 @@ from input.controllers import (
 from inventory import BaseInventory, Inventory
 from lighting import RadialLight
 from log import log
+from pathfinding import FlowField
 from protocols import HasDamage
 from settings import BLOCK_SIZE, DEBUG
 from shooting import Bullet
 from sprites import GravitySprite
-from utils.collision import custom_collision_detection
+from utils.collision import (
+    circle_circle_contact,
+    circle_rect_contact,
+    overlap_centroid,
+    overlapping_tiles,
+)
 from utils.container import Container2d
 from utils.coords import Coords
 from utils.enum import CyclingIntEnum
@@ -54,11 +66,11 @@ class BaseCharacter(
     DEAD = pygame.event.custom_type()
     PAUSE = pygame.event.custom_type()
     OPEN_INVENTORY = pygame.event.custom_type()
-    DESTROY_BLOCK = pygame.event.custom_type()
-    PLACE_BLOCK = pygame.event.custom_type()
-    SHOOT = pygame.event.custom_type()
 
-    EVENTS = [DEAD, PAUSE, DESTROY_BLOCK, PLACE_BLOCK, OPEN_INVENTORY, SHOOT]
+    EVENTS = [DEAD, PAUSE, OPEN_INVENTORY]
+
+    # gameplay actions are posted here instead of SDL's queue
+    event_bus: EventBus | None = None
 
     rect: pygame.rect.Rect
     size: pygame.math.Vector2
@@ -111,12 +123,15 @@ class BaseCharacter(
         self.blocks = blocks
         position = position or pygame.display.get_surface().get_rect().center
         self.position = pygame.math.Vector2(*position)
-        self.collision_buffer = pygame.sprite.Group()
         self.enemies_buffer = pygame.sprite.Group()
         self.is_immune = False
         self._immunity_timer = Timer(0.5, self.reset_immunity)
         self.light = RadialLight(10, self.blocks)
 
+    @property
+    def radius(self):
+        return self.size.x / 2
+
     @property
     def hp_percentage(self):
         return self.health_points / self.max_health_points
@@ -135,16 +150,16 @@ class BaseCharacter(
 
     def destroy_block(self, _: float):
         if self.mode in (Mode.EXPLORATION, Mode.CONSTRUCTION):
-            event = pygame.event.Event(self.DESTROY_BLOCK)
-            event.power = self.destruction_power
-            event.coords = self.get_cursor_coords()
-            pygame.event.post(event)
+            self._post(
+                DestroyBlock,
+                coords=self.get_cursor_coords(),
+                power=self.destruction_power,
+            )
 
     def place_block(self, _: float):
         if self.mode == Mode.CONSTRUCTION and (cls := self.inventory.pop()):
-            event = pygame.event.Event(self.PLACE_BLOCK)
-            event.block = make_block(cls, self.get_cursor_coords())  # type: ignore
-            pygame.event.post(event)
+            coords = self.get_cursor_coords()
+            self._post(PlaceBlock, coords=coords, block=make_block(cls, coords))
 
     def shoot(self, _: float):
         if self.mode != Mode.COMBAT:
@@ -159,18 +174,24 @@ class BaseCharacter(
         if shooting_velocity is None:
             return
 
-        event = pygame.event.Event(self.SHOOT)
-        event.bullet = Bullet(
+        bullet = Bullet(
             source=self,
             position=self.position,
             velocity=shooting_velocity,
             damage=self.shooting_damage,
             max_range=self.shooting_range,
         )
-        pygame.event.post(event)
+        self._post(Shoot, bullet=bullet)
+
+    def _post(self, event_type: type[Event], **fields):
+        if self.event_bus is None:
+            raise Loadable.UnloadedObject
+        self.event_bus.post(event_type, **fields)
 
     def pause(self, _: float):
-        pygame.event.post(pygame.event.Event(self.PAUSE))
+        event = pygame.event.Event(self.PAUSE)
+        event.character = self
+        pygame.event.post(event)
 
     def dash_left(self, _: float):
         if self.mode != Mode.CONSTRUCTION:
@@ -191,7 +212,9 @@ class BaseCharacter(
             self.velocity.y -= self.glide_scalar_acceleration * dt
 
     def open_inventory(self, _: float):
-        pygame.event.post(pygame.event.Event(self.OPEN_INVENTORY))
+        event = pygame.event.Event(self.OPEN_INVENTORY)
+        event.character = self
+        pygame.event.post(event)
 
     def process_control_requests(self, dt: float):
         if self.controller is None:
@@ -203,7 +226,6 @@ class BaseCharacter(
         return (int(cursor_coords.x), int(cursor_coords.y))
 
     def pull_collectibles(self, collectibles_group: pygame.sprite.Group):
-        # TODO: avoid passing all collectibles
         for collectible in collectibles_group:
             collectible: BaseCollectible
             collectible_position = pygame.math.Vector2(collectible.rect.center)
@@ -224,7 +246,7 @@ class BaseCharacter(
         if DEBUG:
             log(f"Grabbing collectible: {collectible}")
         collectible.kill()
-        self.inventory.add(collectible.__class__)
+        self.inventory.add(collectible.__class__, collectible.count)
 
     def update_position(self, dt: float):
         self.position += self.velocity * dt * BLOCK_SIZE
@@ -238,24 +260,14 @@ class BaseCharacter(
             int(self.position.y + self.size.y / 2),
         )
 
-    def update_collision_buffer(self):
-        margin = 3
-        ref_x, ref_y = self.rect.center
-        ref_x, ref_y = ref_x // BLOCK_SIZE, ref_y // BLOCK_SIZE
-        self.collision_buffer.empty()
-        for x, y in product(
-            range(ref_x - margin, ref_x + margin), range(ref_y - margin, ref_y + margin)
-        ):
-            block = self.blocks.get_element((x, y))
-            if block is not None:
-                self.collision_buffer.add(block)
-
-        if self.enemies_buffer:
-            self.collision_buffer.add(self.enemies_buffer.sprites())
+    def get_colliding_blocks(self, rect: pygame.rect.Rect) -> Iterator[BaseBlock]:
+        for coords in overlapping_tiles(rect):
+            block = self.blocks.get_element(coords)
+            if block is not None and block.collision_shape != CollisionShape.NONE:
+                yield block
 
     def update(self, dt: float):
         super().update(dt)
-        self.update_collision_buffer()
         self.process_control_requests(dt)
         self.handle_collision()
         self._immunity_timer.inc(dt)
@@ -276,6 +288,9 @@ class BaseCharacter(
 class Player(BaseCharacter):
     controller: PlayerController | None
 
+    # angular resolution of the cached rotation frames
+    rotation_steps: int = 64
+
     def __init__(
         self,
         gravity: int,
@@ -307,14 +322,16 @@ class Player(BaseCharacter):
         )
         self._draw()
         self._create_collision_mask()
+        self._load_rotation_frames()
         self.inventory.setup()
 
-    def set_controller(self, controller_id: Controller):
-        self.inventory.set_controller(controller_id)
+    def set_controller(self, controller_id: Controller, gamepad_index: int = 0):
+        self.inventory.set_controller(controller_id, gamepad_index)
         if controller_id == Controller.GAMEPAD:
             self.controller = GamepadPlayerController(
                 self, self.max_jump_count, self.max_jump_time
             )
+            self.controller.gamepad_index = gamepad_index
         elif controller_id == Controller.KEYBOARD:
             self.controller = KeyboardPlayerController(
                 self, self.max_jump_count, self.max_jump_time
@@ -327,7 +344,7 @@ class Player(BaseCharacter):
         self.image = None
         self.mask = None
         self.controller = None
-        self.collision_buffer.empty()
+        self.event_bus = None
         self.enemies_buffer.empty()
         self.inventory.unload()
 
@@ -360,6 +377,22 @@ class Player(BaseCharacter):
             1,
         )
 
+    def _load_rotation_frames(self):
+        key = (self.__class__, self.rotation_steps)
+        if key in rotation_frames:
+            return
+        if self.original_image is None:
+            raise Loadable.UnloadedObject
+
+        frames = [
+            rotate(self.original_image, i * 360 / self.rotation_steps)
+            for i in range(self.rotation_steps)
+        ]
+        immune_frames = [frame.copy() for frame in frames]
+        for frame in immune_frames:
+            frame.set_alpha(100)
+        rotation_frames[key] = (frames, immune_frames)
+
     def _create_collision_mask(self):
         shell = pygame.surface.Surface(self.size).convert_alpha()
         shell.fill(Color.TRANSPARENT)
@@ -382,89 +415,79 @@ class Player(BaseCharacter):
         self.controller.reset_jump()
 
     def handle_collision(self):
-        collided_sprites = pygame.sprite.spritecollide(
-            self,
-            self.collision_buffer,
-            False,
-            collided=custom_collision_detection,
-        )
+        center = pygame.math.Vector2(self.rect.center)
 
-        if not collided_sprites:
-            return
+        # overlapping areas are combined into a single contact point
+        moment = pygame.math.Vector2()
+        total_area = 0
 
-        for sprite in collided_sprites:
-            if isinstance(sprite, (BaseHazard, Enemy)):
-                self.take_damage(sprite)
-
-        first_collided_sprite: BaseBlock = collided_sprites[0]
-        bounding_rect = first_collided_sprite.rect
-        for block in collided_sprites:
-            bounding_rect = bounding_rect.union(block.rect)
-
-        collided_overlap = pygame.mask.Mask(bounding_rect.size, False)
-        for block in collided_sprites:
-            collided_overlap.draw(
-                block.mask,
-                (
-                    block.rect.left - bounding_rect.left,
-                    block.rect.top - bounding_rect.top,
-                ),
+        for block in self.get_colliding_blocks(self.rect):
+            if block.collision_shape == CollisionShape.MASK:
+                centroid, area = self._get_mask_overlap(block)
+            elif circle_rect_contact(center, self.radius, block.rect) is not None:
+                centroid, area = overlap_centroid(self.rect, block.rect)
+            else:
+                continue
+            if not area:
+                continue
+            if isinstance(block, BaseHazard):
+                self.take_damage(block)
+            moment += centroid * area
+            total_area += area
+
+        for character in self.enemies_buffer:
+            character: BaseCharacter
+            contact = circle_circle_contact(
+                center,
+                self.radius,
+                pygame.math.Vector2(character.rect.center),
+                character.radius,
             )
+            if contact is None:
+                continue
+            if isinstance(character, Enemy):
+                self.take_damage(character)
+            centroid, area = overlap_centroid(self.rect, character.rect)
+            moment += centroid * area
+            total_area += area
+
+        if total_area:
+            self._remove_normal_velocity(moment / total_area - center)
+
+    def _get_mask_overlap(self, block: BaseBlock) -> tuple[pygame.math.Vector2, int]:
         if self.mask is None:
             raise Loadable.UnloadedObject
-        collided_overlap = collided_overlap.overlap_mask(
-            self.mask,
-            (
-                self.rect.left - bounding_rect.left,
-                self.rect.top - bounding_rect.top,
-            ),
-        )
 
-        collided_overlap.to_surface(pygame.display.get_surface())
-        centroid = collided_overlap.centroid()
-        centroid = pygame.math.Vector2(
-            centroid[0] + bounding_rect.left, centroid[1] + bounding_rect.top
-        )
+        offset = (block.rect.left - self.rect.left, block.rect.top - self.rect.top)
+        if self.mask.overlap(block.mask, offset) is None:
+            return pygame.math.Vector2(), 0
+        overlap = self.mask.overlap_mask(block.mask, offset)
+        x, y = overlap.centroid()
+        centroid = pygame.math.Vector2(x + self.rect.left, y + self.rect.top)
+        return centroid, overlap.count()
 
-        # compute normal
-        normal = centroid - pygame.math.Vector2(self.rect.centerx, self.rect.centery)
+    def _remove_normal_velocity(self, normal: pygame.math.Vector2):
         if abs(normal.x) <= 1:
             normal.x = 0
         if abs(normal.y) <= 1:
             normal.y = 0
 
-        # remove normal component
-        if normal.length():
-            if self.velocity.project(normal).angle_to(normal) == 0:
-                self.velocity -= self.velocity.project(normal)
+        if normal and self.velocity.dot(normal) > 0:
+            self.velocity -= self.velocity.project(normal)
 
     def update_angle(self, dt: float):
         if self.velocity.x:
             self.angle += -self.velocity.x * self.size.x * dt * math.pi
 
     def update_image(self):
-        img = self.rotate()
-        if img is None or self.image is None or self.original_image is None:
-            raise Loadable.UnloadedObject
-
-        rect = self.image.blit(img, self.original_image.get_rect())
-        self.image = img.subsurface(rect)
-        if self.is_immune:
-            self.image.set_alpha(100)
+        frames, immune_frames = rotation_frames[(self.__class__, self.rotation_steps)]
+        index = round(self.angle * self.rotation_steps / 360) % self.rotation_steps
+        self.image = immune_frames[index] if self.is_immune else frames[index]
 
     def should_fall(self):
-        if self.bottom_sprite is None:
-            raise Loadable.UnloadedObject
-
-        ground = pygame.sprite.spritecollide(
-            self.bottom_sprite,
-            self.collision_buffer,
-            False,
-            collided=custom_collision_detection,
-        )
-        if not ground:
+        ground = self._find_ground()
+        if ground is None:
             return True
-        ground = ground[0]
         if isinstance(ground, (BaseHazard, Enemy)):
             self.take_damage(ground)
 
@@ -473,6 +496,24 @@ class Player(BaseCharacter):
         self.reset_jump()
         return False
 
+    def _find_ground(self) -> BaseBlock | BaseCharacter | None:
+        if self.bottom_sprite is None:
+            raise Loadable.UnloadedObject
+
+        base = self.bottom_sprite
+        for block in self.get_colliding_blocks(base.rect):
+            if block.collision_shape == CollisionShape.MASK:
+                if not pygame.sprite.collide_mask(base, block):
+                    continue
+            return block
+
+        feet = pygame.math.Vector2(base.rect.center)
+        for character in self.enemies_buffer:
+            character: BaseCharacter
+            if feet.distance_squared_to(character.rect.center) < character.radius**2:
+                return character
+        return None
+
     def take_damage(self, hazard: HasDamage):
         # TODO: knockback
         self._immunity_timer.start()
@@ -485,24 +526,23 @@ class Player(BaseCharacter):
                 event.character = self
                 pygame.event.post(event)
 
-    def rotate(self):
-        if self.original_image is None:
-            return self.original_image
-        img = pygame.Surface(self.original_image.get_size())
-        img = pygame.transform.rotate(self.original_image, self.angle)
-        new_x, new_y = img.get_size()
-        new_x = new_x - self.original_image.get_size()[0]
-        new_y = new_y - self.original_image.get_size()[1]
-        img.scroll(-int(new_x / 2), -int(new_y / 2))
-        return img
-
 
 class Enemy(Player):
     damage = 20
+    flow_field: FlowField | None = None
 
-    def set_controller(self, controller_id: Controller):
+    def set_controller(self, controller_id: Controller, gamepad_index: int = 0):
         self.inventory.set_controller(controller_id)
-        self.controller = AIPlayerController(self)
+        self.controller = AIPlayerController(self, self.steer)
+
+    def steer(self):
+        if self.flow_field is None:
+            return None
+        steering = self.flow_field.steer(self.position)
+        if steering is None:
+            return None
+        direction, jump = steering
+        return direction, jump and self.grounded
 
     def _draw(self):
         size = self.size.x
@@ -523,3 +563,16 @@ class Enemy(Player):
             (BLOCK_SIZE, BLOCK_SIZE)
         ).convert_alpha()
         self.cursor_image.fill(Color.TRANSPARENT)
+
+
+# pre-rotated frames (regular and immune) shared by all instances of a class
+rotation_frames: dict[
+    tuple[type[Player], int],
+    tuple[list[pygame.surface.Surface], list[pygame.surface.Surface]],
+] = {}
+
+
+def rotate(image: pygame.surface.Surface, angle: float):
+    rotated = pygame.transform.rotate(image, angle)
+    rect = image.get_rect(center=rotated.get_rect().center)
+    return rotated.subsurface(rect).copy()
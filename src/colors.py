@@ -15,6 +15,13 @@ class Color(_Color, enum.Enum):
     MOUNTAIN_1 = _Color("#d5bdaf")
     MOUNTAIN_2 = _Color("#e3d5ca")
     MOUNTAIN_3 = _Color("#f5ebe0")
+    HILL_1 = _Color("#a3b18a")
+    HILL_2 = _Color("#c5d1ad")
+    HILL_3 = _Color("#dfe7cf")
+    DESERT_SKY = _Color("#fde2c4")
+    DUNE_1 = _Color("#dda15e")
+    DUNE_2 = _Color("#e9bc85")
+    DUNE_3 = _Color("#f2d4ac")
     ROCK_FILL = _Color("#8d99ae")
     ROCK_BORDER = _Color("#2b2d42")
     CURSOR = _Color("#ca6702")
@@ -23,3 +23,36 @@ def get_day_part(_time: time) -> DayPart:
     if _time < time(21):
         return DayPart.EVENING
     return DayPart.NIGHT
+
+
+# ambient light through the day as (hour, red, green, blue), dimmest at night
+DAYLIGHT_KEYS = (
+    (0, 0.3, 0.32, 0.5),
+    (5, 0.3, 0.32, 0.5),
+    (7, 1, 0.75, 0.6),
+    (9, 1, 1, 1),
+    (17, 1, 1, 1),
+    (19, 1, 0.65, 0.5),
+    (21, 0.3, 0.32, 0.5),
+    (24, 0.3, 0.32, 0.5),
+)
+DAYLIGHT_STEPS = 256
+
+
+def _interpolate_daylight(hour: float) -> tuple[float, float, float]:
+    for (start, *first), (end, *second) in zip(DAYLIGHT_KEYS, DAYLIGHT_KEYS[1:]):
+        if start <= hour <= end:
+            weight = (hour - start) / (end - start)
+            red, green, blue = (a + (b - a) * weight for a, b in zip(first, second))
+            return red, green, blue
+    raise ValueError(f"Hour out of range: {hour}")
+
+
+# computed once, so following the sun costs a lookup per frame
+_daylight = [
+    _interpolate_daylight(24 * step / DAYLIGHT_STEPS) for step in range(DAYLIGHT_STEPS)
+]
+
+
+def get_daylight(relative_time: float) -> tuple[float, float, float]:
+    return _daylight[int(relative_time * DAYLIGHT_STEPS) % DAYLIGHT_STEPS]
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from functools import cache
+from typing import TYPE_CHECKING, Any, Callable, TypeVar
+
+from utils.coords import Coords
+
+if TYPE_CHECKING:
+    from blocks import BaseBlock
+    from shooting import BaseBullet
+
+
+@dataclass(slots=True)
+class DestroyBlock:
+    coords: Coords = (0, 0)
+    power: float = 0
+
+
+@dataclass(slots=True)
+class PlaceBlock:
+    coords: Coords = (0, 0)
+    block: BaseBlock | None = None
+
+
+@dataclass(slots=True)
+class Shoot:
+    bullet: BaseBullet | None = None
+
+
+@dataclass(slots=True)
+class BlockBroken:
+    coords: Coords = (0, 0)
+
+
+@dataclass(slots=True)
+class BulletShatter:
+    position: tuple[float, float] = (0, 0)
+
+
+Event = TypeVar("Event", DestroyBlock, PlaceBlock, Shoot, BlockBroken, BulletShatter)
+Handler = Callable[[Any, float], None]
+
+
+@cache
+def _defaults(event_type: type) -> tuple[tuple[str, Any], ...]:
+    return tuple((field.name, field.default) for field in fields(event_type))
+
+
+class EventBus:
+    """In-process queue for gameplay events, dispatched once per tick"""
+
+    # records allocated up front for each subscribed event type
+    pool_size = 8
+
+    def __init__(self) -> None:
+        self._handlers: dict[type, list[Handler]] = {}
+        self._pools: dict[type, list[Any]] = {}
+        self._queue: list[Any] = []
+        self._dispatching: list[Any] = []
+
+    def subscribe(
+        self, event_type: type[Event], handler: Callable[[Event, float], None]
+    ):
+        self._handlers.setdefault(event_type, []).append(handler)
+        pool = self._pools.setdefault(event_type, [])
+        pool.extend(event_type() for _ in range(self.pool_size - len(pool)))
+
+    def post(self, event_type: type[Event], **fields):
+        pool = self._pools.get(event_type)
+        event = pool.pop() if pool else event_type()
+        for name, value in fields.items():
+            setattr(event, name, value)
+        self._queue.append(event)
+
+    def dispatch(self, dt: float):
+        # events posted by handlers are left for the next tick
+        self._queue, self._dispatching = self._dispatching, self._queue
+        for event in self._dispatching:
+            for handler in self._handlers.get(type(event), ()):
+                handler(event, dt)
+            # drops references to blocks and bullets
+            for name, value in _defaults(type(event)):
+                setattr(event, name, value)
+            self._pools.setdefault(type(event), []).append(event)
+        self._dispatching.clear()
+
+    def clear(self):
+        self._handlers.clear()
+        self._pools.clear()
+        self._queue.clear()
+        self._dispatching.clear()
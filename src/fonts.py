@@ -0,0 +1,144 @@
+import string
+from collections import OrderedDict
+from functools import cache
+from pathlib import Path
+
+import pygame
+import pygame.freetype
+
+from colors import Color, InterfaceColor
+
+ColorValue = Color | InterfaceColor | tuple[int, int, int] | tuple[int, int, int, int]
+# pygame colors are unhashable, so keys hold them as plain tuples
+TextKey = tuple[pygame.freetype.Font, str, tuple, tuple | None]
+
+ATLAS_CHARACTERS = string.digits + string.ascii_letters + string.punctuation + " "
+
+
+def _color_key(color: ColorValue | None):
+    return None if color is None else tuple(color)
+
+
+@cache
+def get_font(path: Path, size: int, antialiased: bool = True, pad: bool = False):
+    """Loads each font file once per size and style"""
+    font = pygame.freetype.Font(path, size)
+    font.antialiased = antialiased
+    font.pad = pad
+    return font
+
+
+class GlyphAtlas:
+    """Characters of a padded font rasterized once into a single strip"""
+
+    def __init__(
+        self, font: pygame.freetype.Font, fgcolor: ColorValue, bgcolor: ColorValue
+    ) -> None:
+        # padded glyphs span their advance, so they tile exactly along the baseline
+        glyphs = [font.render(c, fgcolor, bgcolor) for c in ATLAS_CHARACTERS]
+        self.bgcolor = bgcolor
+        self.areas: dict[str, pygame.rect.Rect] = {}
+        self.ascents: dict[str, int] = {}
+        width = sum(glyph.get_width() for glyph, _ in glyphs)
+        height = max(glyph.get_height() for glyph, _ in glyphs)
+        self.image = pygame.surface.Surface((width, height))
+        x = 0
+        metrics = font.get_metrics(ATLAS_CHARACTERS)
+        for character, (glyph, rect), metric in zip(ATLAS_CHARACTERS, glyphs, metrics):
+            # glyphs overhanging their advance are left to the font to render
+            if metric is not None and glyph.get_width() == round(metric[4]):
+                self.areas[character] = pygame.rect.Rect(x, 0, *glyph.get_size())
+                self.ascents[character] = rect.y
+            self.image.blit(glyph, (x, 0))
+            x += glyph.get_width()
+
+    def covers(self, text: str):
+        return all(character in self.areas for character in text)
+
+    def render(self, text: str):
+        baseline = max(self.ascents[character] for character in text)
+        x, height = 0, 0
+        blits = []
+        for character in text:
+            area = self.areas[character]
+            top = baseline - self.ascents[character]
+            blits.append((self.image, (x, top), area))
+            x += area.width
+            height = max(height, top + area.height)
+
+        image = pygame.surface.Surface((x, height))
+        image.fill(self.bgcolor)
+        image.blits(blits, doreturn=False)
+        return image
+
+
+class TextCache:
+    """Rendered strings kept until they are the least recently used ones"""
+
+    def __init__(self, max_size: int = 512) -> None:
+        self.max_size = max_size
+        self._surfaces: OrderedDict[TextKey, pygame.surface.Surface] = OrderedDict()
+        self._atlases: dict[tuple, GlyphAtlas] = {}
+
+    def render(
+        self,
+        font: pygame.freetype.Font,
+        text: str,
+        fgcolor: ColorValue,
+        bgcolor: ColorValue | None = None,
+    ) -> pygame.surface.Surface:
+        """Returns a shared surface, callers must not draw onto it"""
+        key = (font, text, _color_key(fgcolor), _color_key(bgcolor))
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            return surface
+
+        surface = self._rasterize(font, text, fgcolor, bgcolor)
+        if pygame.display.get_surface() is not None:
+            if bgcolor is None:
+                surface = surface.convert_alpha()
+            else:
+                surface = surface.convert()
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_size:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def _rasterize(
+        self,
+        font: pygame.freetype.Font,
+        text: str,
+        fgcolor: ColorValue,
+        bgcolor: ColorValue | None,
+    ):
+        # only opaque text boxes tile exactly, glyph edges blend otherwise
+        if bgcolor is None or not font.pad or not text:
+            return font.render(text, fgcolor, bgcolor)[0]
+
+        key = (font, _color_key(fgcolor), _color_key(bgcolor))
+        atlas = self._atlases.get(key)
+        if atlas is None:
+            atlas = self._atlases[key] = GlyphAtlas(font, fgcolor, bgcolor)
+        if not atlas.covers(text):
+            return font.render(text, fgcolor, bgcolor)[0]
+        return atlas.render(text)
+
+    def clear(self):
+        self._surfaces.clear()
+        self._atlases.clear()
+
+    def __len__(self):
+        return len(self._surfaces)
+
+
+text_cache = TextCache()
+
+
+def render_text(
+    font: pygame.freetype.Font,
+    text: str,
+    fgcolor: ColorValue,
+    bgcolor: ColorValue | None = None,
+):
+    return text_cache.render(font, text, fgcolor, bgcolor)
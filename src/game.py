@@ -1,16 +1,26 @@
-from typing import Callable
+from __future__ import annotations
+
+import os
+import random
+import time
+from functools import cached_property
+from typing import TYPE_CHECKING, Callable
 
 import moderngl as mgl
 import pygame
 import pygame._sdl2.controller
 
 import settings
-from characters import Player
 from input.constants import Controller
+from input.replay import InputRecorder, InputReplay
+from input.state import input_state
 from interface import ControllerDetection, Menu
-from level import Level
+from timings import timed
 from utils.open_gl import set_gl_attrs
 
+if TYPE_CHECKING:
+    from level import Level
+
 # pylint: disable=no-member
 
 
@@ -21,15 +31,34 @@ class Game:
 
     controller: Controller
     main_loop: Callable
-    level: Level
+    level: Level | None = None
     internal_events: list[int]
     clock: pygame.time.Clock
+    framebuffer: mgl.Framebuffer | None = None  # headless only
     controller_detection: ControllerDetection
-    menu: Menu
+
+    def __init__(
+        self,
+        replay: InputReplay | None = None,
+        recorder: InputRecorder | None = None,
+        headless: bool = False,
+    ) -> None:
+        self.replay = replay
+        self.recorder = recorder
+        self.headless = headless
+        self.frame_times: list[float] = []
+
+    @property
+    def deterministic(self):
+        return self.replay is not None or self.recorder is not None
 
     def run(self):
         print(f"Pygame version: {pygame.version.ver}")
         self.setup()
+        if self.replay is not None:
+            random.seed(self.replay.seed)
+        elif self.recorder is not None:
+            random.seed(self.recorder.seed)
 
         running = True
         while running:
@@ -37,18 +66,22 @@ class Game:
                 if event.type == pygame.QUIT:
                     running = False
 
-                elif event.type == Level.FINISHED:
+                elif self.level is not None and event.type == self.level.FINISHED:
+                    self.level.music.stop()
+                    self.level.sound_effects.stop()
                     self.main_loop = self.run_menu
 
                 elif event.type == self.NEW_GAME:
-                    self.level = Level(self.ctx, self.controller)
-                    self.internal_events = Player.EVENTS
-                    self.main_loop = self.run_level
+                    self.start_level()
 
                 elif event.type == self.LOAD_GAME:
-                    self.level = Level.from_storage(self.ctx, self.controller)
-                    self.internal_events = Player.EVENTS
-                    self.main_loop = self.run_level
+                    self.start_level(from_storage=True)
+
+                elif event.type in (
+                    pygame.CONTROLLERDEVICEADDED,
+                    pygame.CONTROLLERDEVICEREMOVED,
+                ):
+                    input_state.handle_device_event(event)
 
                 elif event.type == ControllerDetection.CONTROLLER_DETECTED:
                     self.controller = event.controller
@@ -58,16 +91,32 @@ class Game:
 
             dt = self.clock.tick() / 1000
             pygame.display.set_caption(f"{self.clock.get_fps():.0f}")
-
+            if self.replay is None:
+                input_state.poll()
+            else:
+                frame = self.replay.next_frame()
+                if frame is None:
+                    break
+                dt, snapshot = frame
+                input_state.set_snapshot(snapshot)
+            if self.recorder is not None:
+                self.recorder.write(dt, input_state.snapshot)
+
+            start = time.perf_counter()
             self.main_loop(dt)
-
             pygame.display.flip()
+            if self.replay is not None:
+                self.frame_times.append(time.perf_counter() - start)
 
         pygame.quit()
 
     def setup(self):
-        pygame.init()
-        pygame._sdl2.controller.init()  # pylint: disable=protected-access
+        if self.headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
+        with timed("pygame"):
+            pygame.init()
+            pygame._sdl2.controller.init()  # pylint: disable=protected-access
         set_gl_attrs()
 
         pygame.display.set_caption(settings.TITLE)
@@ -77,15 +126,30 @@ class Game:
         # if not settings.DEBUG:
         #     flags |= pygame.FULLSCREEN
 
-        pygame.display.set_mode(size, flags, vsync=1)
-
-        self.ctx = mgl.create_context()
+        with timed("display"):
+            if self.headless:
+                pygame.display.set_mode(size)
+                self.ctx = mgl.create_standalone_context(backend="egl")
+                # stands in for the window, so benchmarks pay for every draw
+                self.framebuffer = self.ctx.simple_framebuffer(size)
+                self.framebuffer.use()
+            else:
+                pygame.display.set_mode(size, flags, vsync=1)
+                self.ctx = mgl.create_context()
         self.ctx.gc_mode = "auto"
 
         self.clock = pygame.time.Clock()
         self.internal_events = []
 
-        self.menu = Menu(
+        with timed("controller detection"):
+            self.controller_detection = ControllerDetection(self.ctx)
+
+        self.main_loop = self.run_controller_detection
+
+    @cached_property
+    def menu(self):
+        # built once a controller is detected, off the path to the first screen
+        return Menu(
             {
                 "new game": self.NEW_GAME,
                 "load game": self.LOAD_GAME,
@@ -94,9 +158,22 @@ class Game:
             },
             self.ctx,
         )
-        self.controller_detection = ControllerDetection(self.ctx)
 
-        self.main_loop = self.run_controller_detection
+    def start_level(self, from_storage: bool = False):
+        # the game world is imported once a game starts, not at launch
+        from characters import Player
+        from level import Level
+
+        if from_storage:
+            self.level = Level.from_storage(
+                self.ctx, self.controller, self.deterministic
+            )
+        else:
+            self.level = Level(
+                self.ctx, self.controller, deterministic=self.deterministic
+            )
+        self.internal_events = Player.EVENTS
+        self.main_loop = self.run_level
 
     def run_controller_detection(self, dt: float):
         self.controller_detection.run(dt)
@@ -105,4 +182,5 @@ class Game:
         self.menu.run(dt)
 
     def run_level(self, dt: float):
-        self.level.run(dt)
+        if self.level is not None:
+            self.level.run(dt)
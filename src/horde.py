@@ -0,0 +1,203 @@
+import enum
+import random
+from typing import Sequence
+
+import numpy
+import pygame
+
+from blocks import BaseBlock
+from characters import Enemy
+from input.constants import Controller
+from pathfinding import FlowField
+from settings import BLOCK_SIZE
+from utils.container import Container2d
+
+
+class HordeState(enum.IntEnum):
+    DEAD = 0
+    WANDER = 1
+    CHASE = 2
+    PROMOTED = 3
+
+
+class Horde:
+    """Enemies simulated in batched arrays while far from the player"""
+
+    # in block size units
+    chase_radius = 80
+    promote_radius = 50  # must reach beyond the screen borders
+    demote_radius = 60
+    wander_range = 10
+
+    # spreads the cost of building full enemies over several frames
+    promotions_per_update = 4
+
+    linear_velocity = Enemy.linear_velocity / 2
+    radius = BLOCK_SIZE
+
+    def __init__(
+        self,
+        capacity: int,
+        gravity: int,
+        terminal_velocity: int,
+        blocks: Container2d[BaseBlock],
+        characters: pygame.sprite.Group,
+        players: pygame.sprite.Group,
+        flow_field: FlowField,
+    ) -> None:
+        self.gravity = gravity
+        self.terminal_velocity = terminal_velocity
+        self.blocks = blocks
+        self.characters = characters
+        self.players = players
+        self.flow_field = flow_field
+        self.capacity = capacity
+        self.count = 0
+
+        self.positions = numpy.zeros((capacity, 2), numpy.float32)
+        self.velocities = numpy.zeros((capacity, 2), numpy.float32)
+        self.states = numpy.full(capacity, HordeState.DEAD, numpy.int8)
+        self.homes = numpy.zeros(capacity, numpy.float32)
+        self.targets = numpy.zeros(capacity, numpy.float32)
+        self.health = numpy.zeros(capacity, numpy.float32)  # percentage
+
+        self._promoted: dict[int, Enemy] = {}
+        self._pool: list[Enemy] = []
+        self._rng = numpy.random.default_rng(random.getrandbits(32))
+
+    def spawn(self, position: tuple[float, float]) -> int:
+        if self.count >= self.capacity:
+            raise IndexError("Horde is full")
+
+        index = self.count
+        self.count += 1
+        self.positions[index] = position
+        self.velocities[index] = 0
+        self.states[index] = HordeState.WANDER
+        self.homes[index] = position[0]
+        self.targets[index] = position[0]
+        self.health[index] = 1
+        return index
+
+    def update(
+        self, dt: float, target: pygame.math.Vector2, ground: Sequence[int]
+    ) -> None:
+        self._sync_promoted(target)
+
+        count = self.count
+        states = self.states[:count]
+        positions = self.positions[:count]
+        velocities = self.velocities[:count]
+        targets = self.targets[:count]
+
+        active = (states == HordeState.WANDER) | (states == HordeState.CHASE)
+        distances = (
+            numpy.hypot(positions[:, 0] - target.x, positions[:, 1] - target.y)
+            / BLOCK_SIZE
+        )
+
+        chasing = active & (distances < self.chase_radius)
+        states[active] = numpy.where(
+            chasing[active], HordeState.CHASE, HordeState.WANDER
+        )
+        self._pick_wander_targets(active & ~chasing)
+        targets[chasing] = target.x
+
+        direction = numpy.sign(targets - positions[:, 0])
+        velocities[:, 0] = numpy.where(active, direction * self.linear_velocity, 0)
+        velocities[:, 1] = numpy.minimum(
+            velocities[:, 1] + self.gravity * dt, self.terminal_velocity
+        )
+        positions[active] += velocities[active] * dt * BLOCK_SIZE
+
+        self._land(positions, velocities, active, ground)
+        self._promote(active & (distances < self.promote_radius), distances)
+
+    def _pick_wander_targets(self, wandering: numpy.ndarray):
+        arrived = wandering & (
+            numpy.abs(self.targets[: self.count] - self.positions[: self.count, 0])
+            < BLOCK_SIZE / 2
+        )
+        if arrived.any():
+            offsets = self._rng.uniform(
+                -self.wander_range, self.wander_range, arrived.sum()
+            )
+            self.targets[: self.count][arrived] = (
+                self.homes[: self.count][arrived] + offsets * BLOCK_SIZE
+            )
+
+    def _land(
+        self,
+        positions: numpy.ndarray,
+        velocities: numpy.ndarray,
+        active: numpy.ndarray,
+        ground: Sequence[int],
+    ):
+        # far away enemies walk over the surface, ignoring caves and overhangs
+        surface = numpy.asarray(ground[: self.blocks.size[0]])
+        width = len(surface) * BLOCK_SIZE
+        positions[:, 0] = numpy.clip(positions[:, 0], 0, width - 1)
+
+        columns = (positions[:, 0] // BLOCK_SIZE).astype(numpy.intp)
+        floor = surface[columns] * BLOCK_SIZE - self.radius
+        landed = active & (positions[:, 1] >= floor)
+        positions[landed, 1] = floor[landed]
+        velocities[landed, 1] = 0
+
+    def _promote(self, nearby: numpy.ndarray, distances: numpy.ndarray):
+        indices = numpy.flatnonzero(nearby)
+        closest = numpy.argsort(distances[indices])[: self.promotions_per_update]
+        for index in indices[closest]:
+            enemy = self._pool.pop() if self._pool else self._make_enemy()
+            enemy.position.update(*self.positions[index])
+            enemy.velocity.update(*self.velocities[index])
+            enemy.health_points = round(self.health[index] * enemy.max_health_points)
+            enemy.reset_immunity()
+            enemy.update_position(0)
+
+            self.states[index] = HordeState.PROMOTED
+            self._promoted[int(index)] = enemy
+            self.characters.add(enemy)
+
+    def _sync_promoted(self, target: pygame.math.Vector2):
+        for index, enemy in list(self._promoted.items()):
+            if not enemy.alive():
+                self.states[index] = HordeState.DEAD
+            elif enemy.position.distance_to(target) / BLOCK_SIZE > self.demote_radius:
+                self._demote(index, enemy)
+            else:
+                continue
+            del self._promoted[index]
+            self._pool.append(enemy)
+
+    def _demote(self, index: int, enemy: Enemy):
+        self.positions[index] = enemy.position
+        self.velocities[index] = enemy.velocity
+        self.health[index] = enemy.hp_percentage
+        self.homes[index] = self.targets[index] = enemy.position.x
+        self.states[index] = HordeState.WANDER
+        enemy.kill()
+
+    def _make_enemy(self):
+        enemy = Enemy(
+            self.gravity,
+            self.terminal_velocity,
+            (0, 0),
+            self.blocks,
+        )
+        enemy.flow_field = self.flow_field
+        enemy.set_controller(Controller.AI)
+        enemy.enemies_buffer.add(self.players)
+        return enemy
+
+    def unload(self):
+        for index, enemy in self._promoted.items():
+            if enemy.alive():
+                self._demote(index, enemy)
+            else:
+                self.states[index] = HordeState.DEAD
+        self._promoted.clear()
+        self._pool.clear()
+
+    def __len__(self):
+        return int(numpy.count_nonzero(self.states[: self.count] != HordeState.DEAD))
@@ -5,6 +5,9 @@ ActionCommandType = Callable[..., None]
 
 
 class BaseAction(ABC):
+    # whether the action must be evaluated every frame, even with its input idle
+    ticks_when_idle = False
+
     def __init__(self, command: ActionCommandType) -> None:
         self.command = command
 
@@ -108,6 +111,8 @@ class CounterTimer(ResettableAction):
 
 
 class CooldownCounterTimer(CounterTimer):
+    ticks_when_idle = True
+
     def __init__(
         self,
         command: ActionCommandType,
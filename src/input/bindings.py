@@ -0,0 +1,142 @@
+import json
+from functools import cache
+from pathlib import Path
+from typing import Callable, Hashable, Iterable
+
+import pygame
+
+from input.actions import BaseAction
+from input.constants import Axis, Button, MouseButton
+from settings import INPUT_MAP, USER_INPUT_MAP
+
+ActionFactory = Callable[[], BaseAction]
+InputMap = dict[str, dict[str, dict[str, dict[str, list[str]]]]]
+
+
+class InvalidInputMap(Exception):
+    """Raises when a binding refers to unknown inputs or commands"""
+
+
+class BindingTable:
+    """Flat dispatch table from input codes to the actions bound to them"""
+
+    def __init__(self, bindings: Iterable[tuple[Hashable, BaseAction]]) -> None:
+        self.by_code: dict[Hashable, list[BaseAction]] = {}
+        # actions that keep counting time while their input is untouched
+        self.idle: list[tuple[Hashable, BaseAction]] = []
+        for code, action in bindings:
+            self.by_code.setdefault(code, []).append(action)
+            if action.ticks_when_idle:
+                self.idle.append((code, action))
+        self._pressed: frozenset | None = None
+
+    def evaluate(self, pressed: frozenset, dt: float):
+        if self._pressed is None:
+            # actions learn the initial state of every input they are bound to
+            changed = frozenset(self.by_code)
+        else:
+            changed = pressed ^ self._pressed
+        self._pressed = pressed
+        for code in (pressed | changed) & self.by_code.keys():
+            value = code in pressed
+            for action in self.by_code[code]:
+                action.execute(value, dt)
+        for code, action in self.idle:
+            if code not in pressed and code not in changed:
+                action.execute(False, dt)
+
+
+def parse_key(name: str) -> int:
+    try:
+        return pygame.key.key_code(name)
+    except ValueError as err:
+        raise InvalidInputMap(f"Unknown key: {name}") from err
+
+
+def _parse_enum(enum_class: type):
+    def parse(name: str):
+        try:
+            return enum_class[name]
+        except KeyError as err:
+            raise InvalidInputMap(f"Unknown {enum_class.__name__}: {name}") from err
+
+    return parse
+
+
+parse_button = _parse_enum(Button)
+parse_axis = _parse_enum(Axis)
+parse_mouse_button = _parse_enum(MouseButton)
+
+
+@cache
+def load_input_map() -> InputMap:
+    with open(INPUT_MAP, encoding="utf-8") as file:
+        input_map: InputMap = json.load(file)
+    if Path(USER_INPUT_MAP).exists():
+        # players rebind controls per section, keeping the defaults elsewhere
+        with open(USER_INPUT_MAP, encoding="utf-8") as file:
+            try:
+                overrides = json.load(file)
+            except json.JSONDecodeError as err:
+                raise InvalidInputMap(f"Malformed {USER_INPUT_MAP}: {err}") from err
+        for context, devices in overrides.items():
+            if context not in input_map:
+                raise InvalidInputMap(f"Unknown context: {context}")
+            for device, sections in devices.items():
+                if device not in input_map[context]:
+                    raise InvalidInputMap(f"Unknown device: {context}.{device}")
+                input_map[context][device].update(sections)
+    return input_map
+
+
+def get_bindings(context: str, device: str, section: str) -> dict[str, list[str]]:
+    return load_input_map()[context][device].get(section, {})
+
+
+def compile_table(
+    context: str,
+    device: str,
+    section: str,
+    parse: Callable[[str], Hashable],
+    actions: dict[str, ActionFactory],
+):
+    bindings = []
+    for name, commands in get_bindings(context, device, section).items():
+        code = parse(name)
+        for command in commands:
+            if command not in actions:
+                raise InvalidInputMap(f"Unknown command: {command}")
+            bindings.append((code, actions[command]()))
+    return BindingTable(bindings)
+
+
+def compile_axes(
+    context: str,
+    device: str,
+    section: str,
+    parse: Callable[[str], Hashable],
+    actions: dict[str, ActionFactory],
+    arity: int | None = None,
+) -> list[tuple[tuple, BaseAction]]:
+    """Binds commands to as many inputs as arity, like the four dpad directions"""
+    axes = []
+    for command, names in get_bindings(context, device, section).items():
+        if command not in actions:
+            raise InvalidInputMap(f"Unknown command: {command}")
+        if arity is not None and len(names) != arity:
+            raise InvalidInputMap(
+                f"{context}.{device}.{section}.{command} needs {arity} inputs"
+            )
+        axes.append((tuple(parse(name) for name in names), actions[command]()))
+    return axes
+
+
+def bound_keys() -> set[int]:
+    keys = set()
+    for devices in load_input_map().values():
+        keyboard = devices.get("keyboard", {})
+        for name in keyboard.get("keys", {}):
+            keys.add(parse_key(name))
+        for names in keyboard.get("axes", {}).values():
+            keys.update(parse_key(name) for name in names)
+    return keys
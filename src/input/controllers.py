@@ -1,35 +1,44 @@
 from abc import ABC, abstractmethod
+from typing import Callable
 
 import pygame
-import pygame._sdl2.controller
 
 from input.actions import (
-    BaseAction,
     ContinuousAction,
     CooldownCounterTimer,
     CounterTimer,
     OncePerPress,
     OncePerTimeout,
 )
-from input.constants import (
-    DPAD,
-    MAX_AXIS_VALUE,
-    Axis,
-    Button,
-    Controller,
-    Key,
-    MouseButton,
+from input.bindings import (
+    ActionFactory,
+    compile_axes,
+    compile_table,
+    parse_axis,
+    parse_button,
+    parse_key,
+    parse_mouse_button,
 )
+from input.constants import MAX_AXIS_VALUE, Controller
+from input.state import InputState, input_state
 from settings import BLOCK_SIZE
 
 # pylint: disable=no-member
 
 
 class BaseController(ABC):
+    # devices are read through the snapshot polled once per frame
+    state: InputState = input_state
+    gamepad_index = 0
+
     @abstractmethod
     def control(self, dt: float):
         ...
 
+    @property
+    def gamepad(self):
+        return self.state.snapshot.gamepad(self.gamepad_index)
+
 
 class PlayerController(BaseController):
     @abstractmethod
@@ -120,48 +129,43 @@ class InventoryControllable(BaseControllable):
         ...
 
 
-class GamepadInventoryController(BaseController):
-    def __init__(
-        self,
-        controllable: InventoryControllable,
-    ) -> None:
-        self._repeat_movement = 0.3
-        self.gamepad = pygame._sdl2.controller.Controller(0)
-
-        self.dpad_actions: list[
-            tuple[tuple[Button, Button, Button, Button], BaseAction]
-        ] = [(DPAD, OncePerTimeout(controllable.move, self._repeat_movement))]
-        self.stick_actions: list[tuple[tuple[Axis, Axis], BaseAction]] = [
-            (
-                (Axis.LEFT_X, Axis.LEFT_Y),
-                OncePerTimeout(controllable.move, self._repeat_movement),
-            ),
-        ]
+class GamepadGridController(BaseController):
+    """Moves over a grid of items with the dpad or the left stick"""
+
+    context: str
+
+    def __init__(self, actions: dict[str, ActionFactory]) -> None:
         self.stick_threshold = 0.7 * MAX_AXIS_VALUE
-        self.button_actions: list[tuple[Button, BaseAction]] = [
-            (Button.B, OncePerPress(controllable.close)),
-        ]
+        self.dpad_actions = compile_axes(
+            self.context, "gamepad", "dpad", parse_button, actions, 4
+        )
+        self.stick_actions = compile_axes(
+            self.context, "gamepad", "sticks", parse_axis, actions, 2
+        )
+        self.button_actions = compile_table(
+            self.context, "gamepad", "buttons", parse_button, actions
+        )
 
     def control(self, dt: float):
         self._process_dpad_actions(dt)
         self._process_stick_actions(dt)
-        self._process_button_actions(dt)
+        self.button_actions.evaluate(self.gamepad.buttons, dt)
 
     def _process_dpad_actions(self, dt: float):
         for d_keys, action in self.dpad_actions:
             up, down, left, right = d_keys
-            keys = {k: self.gamepad.get_button(k) for k in d_keys}
+            keys = self.gamepad.buttons
 
             y_axis = 0
-            if keys[up]:
+            if up in keys:
                 y_axis += 1
-            if keys[down]:
+            if down in keys:
                 y_axis -= 1
 
             x_axis = 0
-            if keys[left]:
+            if left in keys:
                 x_axis -= 1
-            if keys[right]:
+            if right in keys:
                 x_axis += 1
 
             action.execute(bool(x_axis or y_axis), dt, [x_axis, y_axis])
@@ -169,14 +173,14 @@ class GamepadInventoryController(BaseController):
     def _process_stick_actions(self, dt: float):
         for axes, action in self.stick_actions:
             x, y = axes
-            x_axis = self.gamepad.get_axis(x.value)
+            x_axis = self.gamepad.get_axis(x)
             if x_axis <= -self.stick_threshold:
                 x_axis = -1
             elif x_axis >= self.stick_threshold:
                 x_axis = 1
             else:
                 x_axis = 0
-            y_axis = self.gamepad.get_axis(y.value)
+            y_axis = self.gamepad.get_axis(y)
             if y_axis <= -self.stick_threshold:
                 y_axis = 1
             elif y_axis >= self.stick_threshold:
@@ -185,63 +189,93 @@ class GamepadInventoryController(BaseController):
                 y_axis = 0
             action.execute(bool(x_axis or y_axis), dt, [x_axis, y_axis])
 
-    def _process_button_actions(self, dt: float):
-        for button, action in self.button_actions:
-            value = self.gamepad.get_button(button)
-            action.execute(value, dt)
 
+class KeyboardGridController(BaseController):
+    """Moves over a grid of items with four keys"""
 
-class KeyboardInventoryController(BaseController):
-    def __init__(self, controllable: InventoryControllable) -> None:
-        self._repeat_movement = 0.3
-        udlr = (Key.E, Key.D, Key.S, Key.F)
+    context: str
 
-        self.dpad_actions: list[tuple[tuple[Key, Key, Key, Key], BaseAction]] = [
-            (udlr, OncePerTimeout(controllable.move, self._repeat_movement))
-        ]
-        self.key_actions: list[tuple[Key, BaseAction]] = [
-            (Key.T, OncePerPress(controllable.close)),
-        ]
+    def __init__(self, actions: dict[str, ActionFactory]) -> None:
+        self.dpad_actions = compile_axes(
+            self.context, "keyboard", "axes", parse_key, actions, 4
+        )
+        self.key_actions = compile_table(
+            self.context, "keyboard", "keys", parse_key, actions
+        )
 
     def control(self, dt: float):
+        keys = self.state.snapshot.keys
         for d_keys, action in self.dpad_actions:
             up, down, left, right = d_keys
-            keys = pygame.key.get_pressed()
 
-            if keys[up] and keys[down]:
-                y_axis = 0
-            elif keys[up]:
-                y_axis = 1
-            elif keys[down]:
-                y_axis = -1
-            else:
-                y_axis = 0
+            y_axis = 0
+            if up in keys:
+                y_axis += 1
+            if down in keys:
+                y_axis -= 1
 
-            if keys[left] and keys[right]:
-                x_axis = 0
-            elif keys[left]:
-                x_axis = -1
-            elif keys[right]:
-                x_axis = 1
-            else:
-                x_axis = 0
+            x_axis = 0
+            if left in keys:
+                x_axis -= 1
+            if right in keys:
+                x_axis += 1
 
             action.execute(bool(x_axis or y_axis), dt, [x_axis, y_axis])
 
-        for key, action in self.key_actions:
-            value = pygame.key.get_pressed()[key]
-            action.execute(value, dt)
+        self.key_actions.evaluate(keys, dt)
+
+
+class GamepadInventoryController(GamepadGridController):
+    context = "inventory"
+
+    def __init__(self, controllable: InventoryControllable) -> None:
+        self._repeat_movement = 0.3
+        super().__init__(
+            {
+                "move": lambda: OncePerTimeout(
+                    controllable.move, self._repeat_movement
+                ),
+                "close": lambda: OncePerPress(controllable.close),
+            }
+        )
+
+
+class KeyboardInventoryController(KeyboardGridController):
+    context = "inventory"
+
+    def __init__(self, controllable: InventoryControllable) -> None:
+        self._repeat_movement = 0.3
+        super().__init__(
+            {
+                "move": lambda: OncePerTimeout(
+                    controllable.move, self._repeat_movement
+                ),
+                "close": lambda: OncePerPress(controllable.close),
+            }
+        )
 
 
 class AIPlayerController(PlayerController):
+    speed = 0.5
+
     def __init__(
         self,
         controllable: PlayerControllable,
+        steering: Callable[[], tuple[float, bool] | None] | None = None,
     ) -> None:
         self.controllable = controllable
+        self.steering = steering
         self.timer = 0
 
     def control(self, dt: float):
+        steering = self.steering() if self.steering else None
+        if steering is not None:
+            direction, jump = steering
+            self.controllable.move(dt, direction * self.speed)
+            if jump:
+                self.controllable.jump(dt)
+            return
+
         self.timer += dt
         if self.timer < 0.8:
             self.controllable.move(dt, 0.5)
@@ -251,9 +285,32 @@ class AIPlayerController(PlayerController):
             self.timer = 0
 
     def reset_jump(self):
+
         ...
 
 
+def player_actions(
+    controllable: PlayerControllable, jump: CounterTimer
+) -> dict[str, ActionFactory]:
+    return {
+        "move": lambda: ContinuousAction(controllable.move),
+        "move_cursor": lambda: ContinuousAction(controllable.move_cursor),
+        "next_mode": lambda: OncePerPress(controllable.next_mode),
+        "pause": lambda: OncePerPress(controllable.pause),
+        "dash_left": lambda: CooldownCounterTimer(controllable.dash_left, 2, 0.2, 1),
+        "dash_right": lambda: CooldownCounterTimer(controllable.dash_right, 2, 0.2, 1),
+        "place_block": lambda: OncePerPress(controllable.place_block),
+        "destroy_block": lambda: ContinuousAction(controllable.destroy_block),
+        "shoot": lambda: OncePerTimeout(
+            controllable.shoot, 1 / controllable.shooting_frequency
+        ),
+        "boost": lambda: ContinuousAction(controllable.boost),
+        "jump": lambda: jump,
+        "glide": lambda: ContinuousAction(controllable.glide),
+        "open_inventory": lambda: OncePerPress(controllable.open_inventory),
+    }
+
+
 class GamepadPlayerController(PlayerController):
     def __init__(
         self,
@@ -261,49 +318,35 @@ class GamepadPlayerController(PlayerController):
         max_jump_count: int,
         max_jump_time: float,
     ) -> None:
-        self.gamepad = pygame._sdl2.controller.Controller(0)
-
         self._jump = CounterTimer(controllable.jump, max_jump_count, max_jump_time)
+        actions = player_actions(controllable, self._jump)
 
-        self.stick_actions: list[tuple[tuple[Axis, ...], BaseAction]] = [
-            ((Axis.LEFT_X,), ContinuousAction(controllable.move)),
-            ((Axis.RIGHT_X, Axis.RIGHT_Y), ContinuousAction(controllable.move_cursor)),
-        ]
-        self.trigger_actions: list[tuple[Axis, BaseAction]] = [
-            (Axis.TRIGGER_L, OncePerPress(controllable.next_mode)),
-            (Axis.TRIGGER_R, ContinuousAction(controllable.destroy_block)),
-            (
-                Axis.TRIGGER_R,
-                OncePerTimeout(controllable.shoot, 1 / controllable.shooting_frequency),
-            ),
-        ]
+        self.stick_actions = compile_axes(
+            "player", "gamepad", "sticks", parse_axis, actions
+        )
+        self.trigger_actions = compile_table(
+            "player", "gamepad", "triggers", parse_axis, actions
+        )
         self.trigger_threshold = 0.7 * MAX_AXIS_VALUE
-
-        self.button_actions: list[tuple[Button, BaseAction]] = [
-            (Button.START, OncePerPress(controllable.pause)),
-            (Button.LB, CooldownCounterTimer(controllable.dash_left, 2, 0.2, 1)),
-            (Button.RB, CooldownCounterTimer(controllable.dash_right, 2, 0.2, 1)),
-            (Button.RB, OncePerPress(controllable.place_block)),
-            (Button.Y, ContinuousAction(controllable.boost)),
-            (Button.B, self._jump),
-            (Button.B, ContinuousAction(controllable.glide)),
-            (Button.X, OncePerPress(controllable.open_inventory)),
-        ]
+        self.button_actions = compile_table(
+            "player", "gamepad", "buttons", parse_button, actions
+        )
 
     def control(self, dt: float):
+        gamepad = self.gamepad
         for trigger, action in self.stick_actions:
             axes_values = [
-                round(self.gamepad.get_axis(a) / MAX_AXIS_VALUE, 2) for a in trigger
+                round(gamepad.get_axis(a) / MAX_AXIS_VALUE, 2) for a in trigger
             ]
             action.execute(True, dt, axes_values)
 
-        for trigger, action in self.trigger_actions:
-            value = self.gamepad.get_axis(trigger) > self.trigger_threshold
-            action.execute(value, dt)
-
-        for button, action in self.button_actions:
-            value = self.gamepad.get_button(button)
-            action.execute(value, dt)
+        triggers = frozenset(
+            axis
+            for axis in self.trigger_actions.by_code
+            if gamepad.get_axis(axis) > self.trigger_threshold
+        )
+        self.trigger_actions.evaluate(triggers, dt)
+        self.button_actions.evaluate(gamepad.buttons, dt)
 
     def reset_jump(self):
         self._jump.reset()
@@ -317,58 +360,40 @@ class KeyboardPlayerController(PlayerController):
         max_jump_time: float,
     ) -> None:
         self._jump = CounterTimer(controllable.jump, max_jump_count, max_jump_time)
+        actions = player_actions(controllable, self._jump)
 
         self.cursor_range = controllable.cursor_range
         self.move_cursor = ContinuousAction(controllable.move_cursor)
 
-        self.dpad_actions: list[tuple[tuple[Key, Key], BaseAction]] = [
-            ((Key.S, Key.F), ContinuousAction(controllable.move)),
-        ]
-
-        self.key_actions: list[tuple[Key, BaseAction]] = [
-            (Key.Q, OncePerPress(controllable.next_mode)),
-            (Key.ESC, OncePerPress(controllable.pause)),
-            (Key.W, CooldownCounterTimer(controllable.dash_left, 2, 0.2, 1)),
-            (Key.R, CooldownCounterTimer(controllable.dash_right, 2, 0.2, 1)),
-            (Key.R, OncePerPress(controllable.place_block)),
-            (Key.V, ContinuousAction(controllable.boost)),
-            (Key.SPACE, self._jump),
-            (Key.SPACE, ContinuousAction(controllable.glide)),
-            (Key.T, OncePerPress(controllable.open_inventory)),
-        ]
-        self.mouse_button_actions: list[tuple[MouseButton, BaseAction]] = [
-            (MouseButton.MAIN, OncePerPress(controllable.place_block)),
-            (MouseButton.SECONDARY, ContinuousAction(controllable.destroy_block)),
-            (
-                MouseButton.SECONDARY,
-                OncePerTimeout(controllable.shoot, 1 / controllable.shooting_frequency),
-            ),
-        ]
+        self.dpad_actions = compile_axes(
+            "player", "keyboard", "axes", parse_key, actions, 2
+        )
+        self.key_actions = compile_table(
+            "player", "keyboard", "keys", parse_key, actions
+        )
+        self.mouse_button_actions = compile_table(
+            "player", "keyboard", "mouse_buttons", parse_mouse_button, actions
+        )
 
     def control(self, dt: float):
         self._perform_cursor_movement(dt)
 
+        keys = self.state.snapshot.keys
         for d_keys, action in self.dpad_actions:
             left, right = d_keys
-            keys = pygame.key.get_pressed()
             x_axis = 0
-            if keys[left]:
+            if left in keys:
                 x_axis -= 1
-            if keys[right]:
+            if right in keys:
                 x_axis += 1
             action.execute(True, dt, [x_axis])
 
-        for key, action in self.key_actions:
-            value = pygame.key.get_pressed()[key]
-            action.execute(value, dt)
-
-        for key, action in self.mouse_button_actions:
-            value = pygame.mouse.get_pressed()[key]
-            action.execute(value, dt)
+        self.key_actions.evaluate(keys, dt)
+        self.mouse_button_actions.evaluate(self.state.snapshot.mouse_buttons, dt)
 
     def _perform_cursor_movement(self, dt: float):
         # assuming player position on center
-        mouse_position = pygame.math.Vector2(pygame.mouse.get_pos())
+        mouse_position = pygame.math.Vector2(self.state.snapshot.mouse_position)
         middle_screen = pygame.math.Vector2(pygame.display.get_surface().get_size()) / 2
         rel = mouse_position - middle_screen
         rel = rel.clamp_magnitude(BLOCK_SIZE * self.cursor_range) / (
@@ -381,102 +406,31 @@ class KeyboardPlayerController(PlayerController):
         self._jump.reset()
 
 
-class GamepadMenuController(BaseController):
+class GamepadMenuController(GamepadGridController):
+    context = "menu"
+
     def __init__(self, controllable: MenuControllable) -> None:
         self._repeat_movement = 0.3
-        self.gamepad = pygame._sdl2.controller.Controller(0)
-        self.dpad_actions: list[
-            tuple[tuple[Button, Button, Button, Button], BaseAction]
-        ] = [(DPAD, OncePerTimeout(controllable.move, self._repeat_movement))]
-        self.stick_actions: list[tuple[tuple[Axis, Axis], BaseAction]] = [
-            (
-                (Axis.LEFT_X, Axis.LEFT_Y),
-                OncePerTimeout(controllable.move, self._repeat_movement),
-            )
-        ]
-        self.button_actions: list[tuple[Button, BaseAction]] = [
-            (Button.A, OncePerPress(controllable.select)),
-        ]
-        self.stick_threshold = 0.7 * MAX_AXIS_VALUE
-
-    def control(self, dt: float):
-        self._process_dpad_actions(dt)
-        self._process_stick_actions(dt)
-        self._process_button_actions(dt)
-
-    def _process_dpad_actions(self, dt: float):
-        for d_keys, action in self.dpad_actions:
-            up, down, left, right = (self.gamepad.get_button(k) for k in d_keys)
-
-            y_axis = 0
-            if up:
-                y_axis += 1
-            if down:
-                y_axis -= 1
-
-            x_axis = 0
-            if left:
-                x_axis -= 1
-            if right:
-                x_axis += 1
-
-            action.execute(bool(x_axis or y_axis), dt, [x_axis, y_axis])
-
-    def _process_stick_actions(self, dt: float):
-        for axes, action in self.stick_actions:
-            x, y = axes
-            x_axis = self.gamepad.get_axis(x.value)
-            if x_axis <= -self.stick_threshold:
-                x_axis = -1
-            elif x_axis >= self.stick_threshold:
-                x_axis = 1
-            else:
-                x_axis = 0
-            y_axis = self.gamepad.get_axis(y.value)
-            if y_axis <= -self.stick_threshold:
-                y_axis = 1
-            elif y_axis >= self.stick_threshold:
-                y_axis = -1
-            else:
-                y_axis = 0
-            action.execute(bool(x_axis or y_axis), dt, [x_axis, y_axis])
+        super().__init__(
+            {
+                "move": lambda: OncePerTimeout(
+                    controllable.move, self._repeat_movement
+                ),
+                "select": lambda: OncePerPress(controllable.select),
+            }
+        )
 
-    def _process_button_actions(self, dt: float):
-        for button, action in self.button_actions:
-            value = self.gamepad.get_button(button)
-            action.execute(value, dt)
 
+class KeyboardMenuController(KeyboardGridController):
+    context = "menu"
 
-class KeyboardMenuController(BaseController):
     def __init__(self, controllable: MenuControllable) -> None:
         self._repeat_movement = 0.3
-        udlr = (Key.E, Key.D, Key.S, Key.F)
-
-        self.dpad_actions: list[tuple[tuple[Key, Key, Key, Key], BaseAction]] = [
-            (udlr, OncePerTimeout(controllable.move, self._repeat_movement))
-        ]
-        self.key_actions: list[tuple[Key, BaseAction]] = [
-            (Key.SPACE, OncePerPress(controllable.select)),
-        ]
-
-    def control(self, dt: float):
-        for d_keys, action in self.dpad_actions:
-            up, down, left, right = d_keys
-            keys = pygame.key.get_pressed()
-
-            y_axis = 0
-            if keys[up]:
-                y_axis += 1
-            if keys[down]:
-                y_axis -= 1
-
-            x_axis = 0
-            if keys[left]:
-                x_axis -= 1
-            if keys[right]:
-                x_axis += 1
-            action.execute(bool(x_axis or y_axis), dt, [x_axis, y_axis])
-
-        for key, action in self.key_actions:
-            value = pygame.key.get_pressed()[key]
-            action.execute(value, dt)
+        super().__init__(
+            {
+                "move": lambda: OncePerTimeout(
+                    controllable.move, self._repeat_movement
+                ),
+                "select": lambda: OncePerPress(controllable.select),
+            }
+        )
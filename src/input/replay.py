@@ -0,0 +1,149 @@
+import struct
+from functools import cache
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from input.constants import Axis, Button, MouseButton
+from input.state import GamepadSnapshot, InputSnapshot, input_state
+
+MAGIC = b"PGIL"
+VERSION = 2
+
+# magic, version, seed, number of recorded keys (followed by their codes)
+HEADER = struct.Struct("<4sHIH")
+KEY_CODE = struct.Struct("<i")
+# pressed buttons mask, axes
+GAMEPAD = struct.Struct(f"<I{len(Axis)}h")
+
+ANY_KEY = 1 << 7
+
+
+def _to_mask(items: frozenset, order: list) -> int:
+    return sum(1 << index for index, item in enumerate(order) if item in items)
+
+
+def _from_mask(mask: int, order: list) -> frozenset:
+    return frozenset(item for index, item in enumerate(order) if mask >> index & 1)
+
+
+def _key_mask_size(key_count: int) -> int:
+    return (key_count + 7) // 8
+
+
+@cache
+def _frame_struct(key_count: int) -> struct.Struct:
+    # dt, mouse buttons mask (bit 7 is any key), mouse x, y, gamepads
+    # and the pressed keys mask, one bit per recorded key
+    return struct.Struct(f"<fBhhB{_key_mask_size(key_count)}s")
+
+
+class InputRecorder:
+    """Writes per-frame dt and input snapshots to a compact binary log
+
+    The log is open while the recorder is used as a context manager.
+    """
+
+    _file: BinaryIO
+
+    def __init__(self, path: Path, seed: int) -> None:
+        self.path = path
+        self.seed = seed
+        self.keys: list[int] = []
+        self.buttons = list(Button)
+        self.mouse_buttons = list(MouseButton)
+        self.frames = 0
+
+    def __enter__(self):
+        self._file = open(self.path, "wb")
+        return self
+
+    def __exit__(self, *exc_info):
+        # logs without frames still need a header to be replayed
+        if not self.frames:
+            self._write_header()
+        self._file.close()
+
+    def _write_header(self):
+        # key bindings are only known once pygame is initialized
+        self.keys = input_state.watched_keys
+        self._file.write(HEADER.pack(MAGIC, VERSION, self.seed, len(self.keys)))
+        for key in self.keys:
+            self._file.write(KEY_CODE.pack(key))
+
+    def write(self, dt: float, snapshot: InputSnapshot):
+        if not self.frames:
+            self._write_header()
+        mouse_buttons = _to_mask(snapshot.mouse_buttons, self.mouse_buttons)
+        if snapshot.any_key:
+            mouse_buttons |= ANY_KEY
+        keys = _to_mask(snapshot.keys, self.keys)
+        self._file.write(
+            _frame_struct(len(self.keys)).pack(
+                dt,
+                mouse_buttons,
+                *snapshot.mouse_position,
+                len(snapshot.gamepads),
+                keys.to_bytes(_key_mask_size(len(self.keys)), "little"),
+            )
+        )
+        for gamepad in snapshot.gamepads:
+            buttons = _to_mask(gamepad.buttons, self.buttons)
+            self._file.write(GAMEPAD.pack(buttons, *gamepad.axes))
+        self.frames += 1
+
+
+class InputReplay:
+    """Reads back a log written by InputRecorder, one frame at a time"""
+
+    class InvalidLog(Exception):
+        """Raises when the file is not a whole input log of the current version"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with open(path, "rb") as file:
+            data = file.read()
+
+        try:
+            magic, version, self.seed, key_count = HEADER.unpack_from(data)
+            if magic != MAGIC or version != VERSION:
+                raise self.InvalidLog(path)
+            offset = HEADER.size
+            self.keys = [
+                KEY_CODE.unpack_from(data, offset + i * KEY_CODE.size)[0]
+                for i in range(key_count)
+            ]
+        except struct.error as error:
+            raise self.InvalidLog(path) from error
+        self._data = data
+        self._offset = offset + key_count * KEY_CODE.size
+        self._frames = self._read_frames()
+
+    def _read_frames(self) -> Iterator[tuple[float, InputSnapshot]]:
+        buttons = list(Button)
+        mouse_buttons = list(MouseButton)
+        frame = _frame_struct(len(self.keys))
+        data, offset = self._data, self._offset
+        while offset < len(data):
+            try:
+                dt, mouse, x, y, gamepad_count, keys = frame.unpack_from(data, offset)
+                offset += frame.size
+                gamepads = [
+                    GAMEPAD.unpack_from(data, offset + i * GAMEPAD.size)
+                    for i in range(gamepad_count)
+                ]
+                offset += gamepad_count * GAMEPAD.size
+            except struct.error as error:
+                raise self.InvalidLog(self.path) from error
+            yield dt, InputSnapshot(
+                keys=_from_mask(int.from_bytes(keys, "little"), self.keys),
+                any_key=bool(mouse & ANY_KEY),
+                mouse_buttons=_from_mask(mouse, mouse_buttons),
+                mouse_position=(x, y),
+                gamepads=tuple(
+                    GamepadSnapshot(_from_mask(pressed, buttons), tuple(axes))
+                    for pressed, *axes in gamepads
+                ),
+            )
+
+    def next_frame(self):
+        return next(self._frames, None)
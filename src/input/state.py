@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+
+import pygame
+import pygame._sdl2.controller
+
+from input.bindings import bound_keys
+from input.constants import Axis, Button, Key, MouseButton
+
+# pylint: disable=no-member
+
+
+@dataclass(frozen=True, slots=True)
+class GamepadSnapshot:
+    buttons: frozenset[Button] = frozenset()
+    axes: tuple[int, ...] = (0,) * len(Axis)
+
+    def get_button(self, button: Button):
+        return button in self.buttons
+
+    def get_axis(self, axis: Axis):
+        return self.axes[axis]
+
+
+@dataclass(frozen=True, slots=True)
+class InputSnapshot:
+    """Keyboard, mouse and gamepad state at a single frame"""
+
+    keys: frozenset[int] = frozenset()
+    any_key: bool = False  # including keys not bound to anything
+    mouse_buttons: frozenset[MouseButton] = frozenset()
+    mouse_position: tuple[int, int] = (0, 0)
+    gamepads: tuple[GamepadSnapshot, ...] = ()
+
+    def gamepad(self, index: int):
+        if index < len(self.gamepads):
+            return self.gamepads[index]
+        return NO_GAMEPAD
+
+
+NO_GAMEPAD = GamepadSnapshot()
+
+
+class InputState:
+    """Polls every input device once per frame"""
+
+    def __init__(self) -> None:
+        self.snapshot = InputSnapshot()
+        self.recording: list[InputSnapshot] | None = None
+        # by instance id, in the order they were connected
+        self._gamepads: dict[int, pygame._sdl2.controller.Controller] = {}
+        self._watched_keys: list[int] | None = None
+
+    @property
+    def watched_keys(self):
+        """Keys bound to any action, the only ones kept in snapshots"""
+        if self._watched_keys is None:
+            self._watched_keys = sorted({*Key, *bound_keys()})
+        return self._watched_keys
+
+    def poll(self):
+        self.set_snapshot(self._read_devices())
+        return self.snapshot
+
+    def set_snapshot(self, snapshot: InputSnapshot):
+        self.snapshot = snapshot
+        if self.recording is not None:
+            self.recording.append(snapshot)
+
+    def start_recording(self):
+        self.recording = []
+
+    def stop_recording(self):
+        recording, self.recording = self.recording or [], None
+        return recording
+
+    def handle_device_event(self, event: pygame.event.Event):
+        """Opens and closes gamepads as they are connected and disconnected"""
+        if event.type == pygame.CONTROLLERDEVICEADDED:
+            gamepad = pygame._sdl2.controller.Controller(event.device_index)
+            self._gamepads.setdefault(_instance_id(gamepad), gamepad)
+        elif event.type == pygame.CONTROLLERDEVICEREMOVED:
+            gamepad = self._gamepads.pop(event.instance_id, None)
+            if gamepad is not None:
+                gamepad.quit()
+
+    def _read_devices(self):
+        pressed_keys = pygame.key.get_pressed()
+        pressed_mouse_buttons = pygame.mouse.get_pressed()
+        return InputSnapshot(
+            keys=frozenset(key for key in self.watched_keys if pressed_keys[key]),
+            # pygame refuses to iterate the keys, the tuple underneath scans in C
+            any_key=any(tuple.__iter__(pressed_keys)),
+            mouse_buttons=frozenset(
+                button for button in MouseButton if pressed_mouse_buttons[button]
+            ),
+            mouse_position=pygame.mouse.get_pos(),
+            gamepads=tuple(self._read_gamepads()),
+        )
+
+    def _read_gamepads(self):
+        for gamepad in self._gamepads.values():
+            yield GamepadSnapshot(
+                buttons=frozenset(b for b in Button if gamepad.get_button(b)),
+                axes=tuple(gamepad.get_axis(axis) for axis in Axis),
+            )
+
+
+def _instance_id(gamepad: pygame._sdl2.controller.Controller) -> int:
+    return gamepad.as_joystick().get_instance_id()
+
+
+input_state = InputState()
@@ -1,25 +1,31 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import TYPE_CHECKING, Any, Hashable, Iterable
 
 import pygame
-import pygame._sdl2.controller
-import pygame.freetype
 from moderngl import Context
 
-from characters import BaseCharacter
 from colors import Color, InterfaceColor
 from draw import FillBorderColors, draw_bordered_rect
-from input.constants import Button, Controller
+from fonts import get_font, render_text
+from input.constants import Controller
 from input.controllers import (
     BaseController,
     GamepadMenuController,
     KeyboardMenuController,
     MenuControllable,
 )
+from input.state import input_state
 from settings import CONSOLE_FONT, DEFAULT_FONT, MENU_FONT
 from shaders.shader import TextureShader
 from utils.timer import Timer
-from world import World
+
+if TYPE_CHECKING:
+    # the menus come up before the game world is imported
+    from characters import BaseCharacter, Mode
+    from quality import QualityGovernor
+    from world import World
 
 
 class ControllerDetection:
@@ -27,7 +33,6 @@ class ControllerDetection:
     EVENTS = [CONTROLLER_DETECTED]
 
     def __init__(self, ctx: Context) -> None:
-        self.gamepad_count = 0
         self.display = pygame.surface.Surface(pygame.display.get_surface().get_size())
         self.timer = Timer(0.2, self._toggle_animation_state)
         self.timer.start()
@@ -47,12 +52,11 @@ class ControllerDetection:
 
     def _draw_static(self):
         self.display.fill(InterfaceColor.MENU_BACKGROUND)
-        font = pygame.freetype.Font(MENU_FONT, 100)
-        font.antialiased = False
-        font.pad = True
-        self.text_surf, self.text_rect = font.render(
-            "Press any key/button", InterfaceColor.PRIMARY_FONT
+        font = get_font(MENU_FONT, 100, antialiased=False, pad=True)
+        self.text_surf = render_text(
+            font, "Press any key/button", InterfaceColor.PRIMARY_FONT
         )
+        self.text_rect = self.text_surf.get_rect()
         self.text_rect.center = self.display.get_rect().center
 
     def draw(self, _: float):
@@ -63,36 +67,21 @@ class ControllerDetection:
         self.shader.render(self.display)
 
     def detect_controller(self):
-        # pylint: disable=protected-access
-        # pylint: disable=no-member
-        gamepads = pygame._sdl2.controller.get_count()
-        if self.gamepad_count != gamepads:
-            self.gamepad_count = gamepads
-
-        if self.gamepad_count > 0:
-            if self.detect_gamepad():
-                return
-
+        if self.detect_gamepad():
+            return
         self.detect_keyboard_and_mouse()
 
     def detect_gamepad(self):
-        for id_ in range(self.gamepad_count):
-            # pylint: disable=protected-access
-            # pylint: disable=no-member
-            gamepad = pygame._sdl2.controller.Controller(id_)
-            for button in Button:
-                if gamepad.get_button(button):
-                    event = pygame.event.Event(self.CONTROLLER_DETECTED)
-                    event.controller = Controller.GAMEPAD
-                    pygame.event.post(event)
-                    return True
+        for gamepad in input_state.snapshot.gamepads:
+            if gamepad.buttons:
+                event = pygame.event.Event(self.CONTROLLER_DETECTED)
+                event.controller = Controller.GAMEPAD
+                pygame.event.post(event)
+                return True
         return False
 
     def detect_keyboard_and_mouse(self):
-        key_states = pygame.key.get_pressed()
-
-        # HACK: pygame prevents iterating directly over r
-        if any(key_states[i] for i in range(len(key_states))):
+        if input_state.snapshot.any_key:
             event = pygame.event.Event(self.CONTROLLER_DETECTED)
             event.controller = Controller.KEYBOARD
             pygame.event.post(event)
@@ -109,11 +98,10 @@ class Menu(MenuControllable):
             self.text = text
             self.event = pygame.event.Event(event_id)
 
-            font = pygame.freetype.Font(MENU_FONT, 100)
-            font.antialiased = False
-            font.pad = True
+            font = get_font(MENU_FONT, 100, antialiased=False, pad=True)
             _padding = 15
-            text_surf, text_rect = font.render(text, InterfaceColor.PRIMARY_FONT)
+            text_surf = render_text(font, text, InterfaceColor.PRIMARY_FONT)
+            text_rect = text_surf.get_rect()
             _image = pygame.surface.Surface(
                 (text_rect.width + 2 * _padding, text_rect.height + 2 * _padding)
             ).convert_alpha()
@@ -214,14 +202,55 @@ class Menu(MenuControllable):
 
 
 class BaseInterfaceElement(ABC):
+    """HUD element that keeps its rendered image until the value it shows changes"""
+
     line_positions: tuple[int, int]
     font_color: InterfaceColor = InterfaceColor.PRIMARY_FONT
     background_color: InterfaceColor = InterfaceColor.MENU_BACKGROUND
 
+    def __init__(self) -> None:
+        self.image: pygame.surface.Surface | None = None
+        self._value: Hashable = None
+
+    @abstractmethod
+    def get_value(self) -> Hashable:
+        ...
+
     @abstractmethod
-    def draw(self):
+    def render(self, value: Any) -> pygame.surface.Surface:
         ...
 
+    def refresh(self):
+        value = self.get_value()
+        if self.image is not None and value == self._value:
+            return False
+        self._value = value
+        self.image = self.render(value)
+        return True
+
+    def draw(self, display_surface: pygame.surface.Surface):
+        self.refresh()
+        display_surface.blit(self.image, self.line_positions)  # type: ignore
+
+
+class Hud:
+    """Interface elements composited onto a viewport with a single blits call"""
+
+    def __init__(self, elements: Iterable[BaseInterfaceElement]) -> None:
+        self.elements = list(elements)
+        self._blits: list[tuple[pygame.surface.Surface, tuple[int, int]]] = []
+
+    def draw(self, display_surface: pygame.surface.Surface):
+        changed = False
+        for element in self.elements:
+            changed |= element.refresh()
+        if changed:
+            self._blits = [
+                (element.image, element.line_positions)  # type: ignore
+                for element in self.elements
+            ]
+        display_surface.blits(self._blits, doreturn=False)
+
 
 class PlayerStats(BaseInterfaceElement):
     def __init__(self, player: BaseCharacter) -> None:
@@ -231,55 +260,84 @@ class PlayerStats(BaseInterfaceElement):
         self.width, self.height = 100, 10
         self.fill_color = InterfaceColor.HEALTH_POINTS
         self.border_color = InterfaceColor.BORDER
-        self.hp_bar = pygame.rect.Rect(*self.line_positions, self.width, self.height)
+        self.hp_bar = pygame.rect.Rect(0, 0, self.width, self.height)
         self.hp_bar_fill = self.hp_bar.copy()
 
-    def draw(self):
-        display_surface = pygame.display.get_surface()
-        self.hp_bar_fill.width = int(self.player.hp_percentage * self.width)
-        pygame.draw.rect(display_surface, self.fill_color, self.hp_bar_fill)
-        pygame.draw.rect(display_surface, self.border_color, self.hp_bar, 1)
+    def get_value(self):
+        return int(self.player.hp_percentage * self.width)
+
+    def render(self, value: int):
+        image = pygame.surface.Surface(self.hp_bar.size).convert_alpha()
+        image.fill(Color.TRANSPARENT)
+        self.hp_bar_fill.width = value
+        pygame.draw.rect(image, self.fill_color, self.hp_bar_fill)
+        pygame.draw.rect(image, self.border_color, self.hp_bar, 1)
+        return image
 
 
 class PlayerMode(BaseInterfaceElement):
     def __init__(self, player: BaseCharacter) -> None:
         super().__init__()
         self.player = player
-        self.font = pygame.freetype.Font(CONSOLE_FONT, 30)
-        self.font.antialiased = False
-        self.font.pad = True
-
-    def draw(self):
-        display_surface = pygame.display.get_surface()
-        self.font.render_to(
-            display_surface,
-            (10, 60),
-            self.player.mode.name,
-            self.font_color,
-            self.background_color,
+        self.line_positions = (10, 60)
+        self.font = get_font(CONSOLE_FONT, 30, antialiased=False, pad=True)
+
+    def get_value(self):
+        return self.player.mode
+
+    def render(self, value: Mode):
+        return render_text(
+            self.font, value.name, self.font_color, self.background_color
         )
 
 
-class TimeDisplay(BaseInterfaceElement):
+class LinesDisplay(BaseInterfaceElement):
+    """Element showing its value as lines of text, one under the other"""
+
+    line_height = 17
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.font = get_font(DEFAULT_FONT, 20, antialiased=False, pad=True)
+
+    def render(self, value: tuple[str, str]):
+        lines = [
+            render_text(self.font, line, self.font_color, self.background_color)
+            for line in value
+        ]
+        image = pygame.surface.Surface(
+            (
+                max(line.get_width() for line in lines),
+                self.line_height * (len(lines) - 1) + lines[-1].get_height(),
+            )
+        ).convert()
+        image.fill(self.background_color)
+        image.blits(
+            tuple((line, (0, i * self.line_height)) for i, line in enumerate(lines))
+        )
+        return image
+
+
+class TimeDisplay(LinesDisplay):
     def __init__(self, world: World) -> None:
+        super().__init__()
         self.world = world
-        self.font = pygame.freetype.Font(DEFAULT_FONT, 20)
-        self.font.antialiased = False
-        self.font.pad = True
-
-    def draw(self):
-        display_surface = pygame.display.get_surface()
-        self.font.render_to(
-            display_surface,
-            (10, 25),
-            self.world.time.strftime("%H:%M"),
-            self.font_color,
-            self.background_color,
-        )
-        self.font.render_to(
-            display_surface,
-            (10, 42),
-            self.world.day_part.value,
-            self.font_color,
-            self.background_color,
-        )
+        self.line_positions = (10, 25)
+
+    def get_value(self):
+        # the clock only changes once per in-game minute
+        return self.world.time.strftime("%H:%M"), self.world.day_part.value
+
+
+class ProfilerDisplay(LinesDisplay):
+    """Frame time and the quality level the governor settled on"""
+
+    def __init__(self, governor: QualityGovernor) -> None:
+        super().__init__()
+        self.governor = governor
+        self.line_positions = (10, 95)
+
+    def get_value(self):
+        # in half milliseconds, so the text is not drawn again every frame
+        frame_time = round(self.governor.frame_time * 2000) / 2
+        return f"{frame_time:.1f} ms", f"quality: {self.governor.level.name}"
@@ -8,6 +8,7 @@ from blocks import BaseCollectible, collectible_images
 from colors import Color, InterfaceColor
 from commons import Loadable
 from draw import FillBorderColors, draw_bordered_rect
+from fonts import get_font, render_text
 from input.constants import Controller
 from input.controllers import (
     BaseController,
@@ -25,11 +26,11 @@ class BaseInventory(Loadable, InventoryControllable):
     collectibles: dict[type[BaseCollectible], int]
     controller: BaseController | None = None
 
-    def add(self, collectible: type[BaseCollectible]):
+    def add(self, collectible: type[BaseCollectible], count: int = 1):
         if collectible in self.collectibles:
-            self.collectibles[collectible] += 1
+            self.collectibles[collectible] += count
         else:
-            self.collectibles[collectible] = 1
+            self.collectibles[collectible] = count
 
     def remove(self, collectible: type[BaseCollectible]):
         if collectible in self.collectibles:
@@ -59,9 +60,10 @@ class BaseInventory(Loadable, InventoryControllable):
     def close(self, _: float):
         pygame.event.post(pygame.event.Event(self.CLOSE))
 
-    def set_controller(self, controller_id: Controller):
+    def set_controller(self, controller_id: Controller, gamepad_index: int = 0):
         if controller_id == Controller.GAMEPAD:
             self.controller = GamepadInventoryController(self)
+            self.controller.gamepad_index = gamepad_index
         elif controller_id == Controller.KEYBOARD:
             self.controller = KeyboardInventoryController(self)
 
@@ -90,6 +92,8 @@ class Inventory(BaseInventory, Loadable):
         self.slot_rect = pygame.rect.Rect(0, 0, self.slot_size, self.slot_size)
         self.image: pygame.surface.Surface | None = None
         self._static_image: pygame.surface.Surface | None = None
+        # contents and selection the image was last drawn for
+        self._drawn_state: tuple | None = None
         self.setup()
 
     def is_empty(self) -> bool:
@@ -129,7 +133,7 @@ class Inventory(BaseInventory, Loadable):
 
     def setup(self):
         self._draw_static()
-        self.font = pygame.freetype.Font(CONSOLE_FONT, 32)
+        self.font = get_font(CONSOLE_FONT, 32)
         self.image = self._static_image.copy()  # type: ignore
 
     def _draw_static(self):
@@ -177,6 +181,7 @@ class Inventory(BaseInventory, Loadable):
     def unload(self):
         self._static_image = None
         self.image = None
+        self._drawn_state = None
         self.font = None
         self.controller = None
 
@@ -184,19 +189,22 @@ class Inventory(BaseInventory, Loadable):
         if self.controller is None:
             raise self.UnloadedObject
 
-        self._update_image()
         self.controller.control(dt)
 
-    def _update_image(self):
+    def refresh(self):
+        """Redraws the image if the contents or the selection changed"""
         if self._static_image is None or self.font is None:
             raise Loadable.UnloadedObject
 
+        state = (self.selected, tuple(self.collectibles.items()))
+        if state == self._drawn_state:
+            return False
+        self._drawn_state = state
         self.image = self._static_image.copy()
 
         self._draw_collectibles()
         self._highlight_selected()
-
-        pygame.display.get_surface().blit(self.image, (0, 0))
+        return True
 
     def _draw_collectibles(self):
         if self.image is None or self.font is None:
@@ -211,11 +219,9 @@ class Inventory(BaseInventory, Loadable):
                 cls, count = collectibles[i]
                 img = collectible_images[cls]
                 self.image.blit(img, self._get_slot_rel_coords((x, y), (10, 10)))
-                self.font.render_to(
-                    self.image,
+                self.image.blit(
+                    render_text(self.font, str(count), InterfaceColor.PRIMARY_FONT),
                     self._get_slot_rel_coords((x, y), (20, 20)),
-                    str(count),
-                    InterfaceColor.PRIMARY_FONT,
                 )
 
     def _get_slot_rel_coords(self, coords: Coords, offset: Coords = (0, 0)):
@@ -237,9 +243,7 @@ class Inventory(BaseInventory, Loadable):
         i = y * self.grid[0] + x
         if i < len(collectibles):
             cls, _ = collectibles[i]
-            self.font.render_to(
-                self.image,
+            self.image.blit(
+                render_text(self.font, cls.__name__, InterfaceColor.PRIMARY_FONT),
                 self._get_slot_rel_coords((x, y), (10, 10)),
-                cls.__name__,
-                InterfaceColor.PRIMARY_FONT,
             )
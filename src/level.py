@@ -1,22 +1,40 @@
 import enum
+import random
+import time
+from collections.abc import Sequence
 
 import pygame
 from moderngl import Context
 
-from blocks import draw_cached_images
-from camera import Camera
+from assets import load_assets
+from camera import Camera, split_screen
 from characters import Enemy, Player
+from colors import Color, InterfaceColor
+from day_cycle import get_daylight
 from input.constants import Controller
-from interface import Menu, PlayerMode, PlayerStats, TimeDisplay
+from input.state import input_state
+from interface import Menu, PlayerMode, PlayerStats, ProfilerDisplay, TimeDisplay
 from inventory import Inventory
+from lighting import ShadowCaster
+from quality import QualityGovernor
+from sequencer import Sequencer, load_pattern
 from settings import (
     BLOCK_SIZE,
     GRAVITY,
+    HORDE_SIZE,
+    MAX_PLAYERS,
+    MUSIC,
+    MUSIC_BEAT,
+    MUSIC_CHANNELS,
+    MUSIC_VOLUME,
     SCREEN_HEIGHT,
     SCREEN_WIDTH,
+    SHOW_PROFILER,
     TERMINAL_VELOCITY,
     WORLD_SIZE,
 )
+from sfx import SoundEffects
+from shaders.shader import SceneShader
 from storage import PlayerStorage, WorldStorage
 from world import Loader, World
 
@@ -35,22 +53,37 @@ class Level:
     EVENTS = [FINISHED, RESUME, SAVE]
 
     @classmethod
-    def from_storage(cls, ctx: Context, controller: Controller):
+    def from_storage(
+        cls, ctx: Context, controller: Controller, deterministic: bool = False
+    ):
         world = WorldStorage().get_newest()
-        player = PlayerStorage().get_newest()
-        return cls(ctx, controller, world, player)
+        storage = PlayerStorage()
+        # worlds saved before split screen only kept the newest player
+        players = [storage.get(_id) for _id in world.player_ids] or [
+            storage.get_newest()
+        ]
+        return cls(ctx, controller, world, players, deterministic)
 
     def __init__(
         self,
         ctx: Context,
         controller: Controller,
         world: World | None = None,
-        player: Player | None = None,
+        players: Sequence[Player] = (),
+        deterministic: bool = False,
     ) -> None:
         self.ctx = ctx
-        draw_cached_images()
+        self.deterministic = deterministic
+        load_assets()
         self.status = Level.Status.LOADING
         self.display_surface = pygame.display.get_surface()
+        # every viewport draws into the scene and the interface over it, both
+        # composited once per frame
+        self.scene = pygame.surface.Surface(
+            self.display_surface.get_size(), pygame.SRCALPHA
+        )
+        self.overlay = self.scene.copy()
+        self.shader = SceneShader(ctx)
         self.pause_menu = Menu(
             {
                 "resume": self.RESUME,
@@ -60,68 +93,181 @@ class Level:
             ctx,
         )
         self.pause_menu.set_controller(controller)
-        self.setup(controller, world, player)
+        self.music = Sequencer(MUSIC_CHANNELS, volume=MUSIC_VOLUME)
+        self.sound_effects = SoundEffects()
+        self.governor = QualityGovernor.from_settings(deterministic)
+        self.setup(controller, world, players)
 
     def setup(
         self,
         controller: Controller,
         world: World | None,
-        player: Player | None,
+        players: Sequence[Player],
     ):
         self.world = world or World(WORLD_SIZE, GRAVITY, TERMINAL_VELOCITY)
         if world:
             self.world.setup()
-        self.player = player or Player(
-            GRAVITY,
-            TERMINAL_VELOCITY,
-            ((WORLD_SIZE[0] - 20) * BLOCK_SIZE // 2, WORLD_SIZE[1] * BLOCK_SIZE // 2),
-            self.world.blocks,
-        )
-        self.player.set_controller(controller)
-        if player:
+        if players:
+            self.player = players[0]
             self.player.blocks = self.world.blocks
+        else:
+            self.player = Player(
+                GRAVITY,
+                TERMINAL_VELOCITY,
+                (
+                    (WORLD_SIZE[0] - 20) * BLOCK_SIZE // 2,
+                    WORLD_SIZE[1] * BLOCK_SIZE // 2,
+                ),
+                self.world.blocks,
+            )
+        self.player.set_controller(controller)
         self.player.enemies_buffer = self.world.characters_buffer
         self.world.set_player(self.player)
+        self.sound_effects.subscribe(self.world.event_bus, self.world.blocks)
+        self.players = [self.player]
+        # saved players rejoin as long as there is a gamepad for each of them
+        for index in range(1, self.count_players(controller)):
+            saved = players[index] if index < len(players) else None
+            self.players.append(self.join_player(controller, index, saved))
 
-        enemy = Enemy(
-            GRAVITY,
-            TERMINAL_VELOCITY,
-            ((WORLD_SIZE[0] - 100) * BLOCK_SIZE // 2, WORLD_SIZE[1] * BLOCK_SIZE // 2),
-            self.world.blocks,
-        )
-        enemy.set_controller(Controller.AI)
-        enemy.enemies_buffer.add(self.player)
-        self.world.characters_buffer.add(enemy)
+        self.spawn_horde()
 
-        self.camera = Camera(
+        self.shadow_caster = ShadowCaster(
+            self.world.blocks, self.display_surface.get_rect()
+        )
+        viewports = split_screen((SCREEN_WIDTH, SCREEN_HEIGHT), len(self.players))
+        self.cameras = [
+            Camera(
+                viewport.size,
+                player,
+                self.world,
+                [
+                    PlayerStats(player),
+                    PlayerMode(player),
+                    TimeDisplay(self.world),
+                    *([ProfilerDisplay(self.governor)] if SHOW_PROFILER else []),
+                ],
+                viewport.topleft,
+                self.scene,
+                self.overlay,
+            )
+            for player, viewport in zip(self.players, viewports)
+        ]
+        # an odd number of viewports leaves a region of the display uncovered,
+        # cleared before they are drawn clipped to their own region
+        if sum(v.width * v.height for v in viewports) < SCREEN_WIDTH * SCREEN_HEIGHT:
+            self.shader.clear_color = InterfaceColor.MENU_BACKGROUND.normalized
+        self.apply_quality()
+        self._streamed_camera = 0
+        self.loader = Loader(
             self.ctx,
-            (SCREEN_WIDTH, SCREEN_HEIGHT),
-            self.player,
             self.world,
-            [
-                PlayerStats(self.player),
-                PlayerMode(self.player),
-                TimeDisplay(self.world),
-            ],
-            self.world.characters_buffer.sprites(),
+            self.shadow_caster,
+            self.player.position,
+            self.deterministic,
         )
-        self.loader = Loader(self.ctx, self.world, self.camera.shadow_caster)
+        self.inventory_owner = self.player
+        self._frozen_frame = self.overlay.copy()
+        self._inventory_shown = False
+
+    @staticmethod
+    def count_players(controller: Controller):
+        if controller != Controller.GAMEPAD:
+            return 1
+        return max(1, min(len(input_state.snapshot.gamepads), MAX_PLAYERS))
+
+    def join_player(
+        self, controller: Controller, gamepad_index: int, player: Player | None = None
+    ):
+        if player is None:
+            player = Player(
+                GRAVITY,
+                TERMINAL_VELOCITY,
+                self.player.position + (3 * BLOCK_SIZE * gamepad_index, 0),
+                self.world.blocks,
+            )
+        else:
+            player.blocks = self.world.blocks
+        player.set_controller(controller, gamepad_index)
+        player.enemies_buffer = self.world.characters_buffer
+        self.world.add_player(player)
+        return player
+
+    def spawn_horde(self):
+        y = WORLD_SIZE[1] * BLOCK_SIZE // 2
+        self.world.horde.spawn(((WORLD_SIZE[0] - 100) * BLOCK_SIZE // 2, y))
+        for _ in range(HORDE_SIZE - 1):
+            self.world.horde.spawn((random.randrange(WORLD_SIZE[0]) * BLOCK_SIZE, y))
 
     def run(self, dt: float):
+        self.music.tick()
         if self.status == Level.Status.LOADING:
             self.loader.load()
         elif self.status == Level.Status.RUNNING:
+            sampled = self.governor.sample()
+            if sampled:
+                # work queued by the previous frames must not count toward this one
+                self.ctx.finish()
+            start = time.perf_counter()
+            self.stream()
+            self.world.set_focus(*(camera.rect for camera in self.cameras))
+            self.sound_effects.set_listeners(
+                *(camera.rect.center for camera in self.cameras)
+            )
+            self.sound_effects.update(dt)
             self.world.update(dt)
-            self.camera.update()
+            self.draw()
             self.check_player_dead()
+            if sampled:
+                # drawing only queues commands, waiting counts the GPU work too
+                self.ctx.finish()
+                if self.governor.record(time.perf_counter() - start):
+                    self.apply_quality()
         elif self.status == Level.Status.PAUSED:
             self.pause_menu.run(dt)
             self.handle_menu_commands()
         elif self.status == Level.Status.INVENTORY_OPEN:
-            self.player.inventory.update(dt)
+            self.draw_inventory(dt)
 
         self.check_status()
 
+    def stream(self):
+        # viewports take turns deciding which chunks are lit first
+        self._streamed_camera = (self._streamed_camera + 1) % len(self.cameras)
+        camera = self.cameras[self._streamed_camera]
+        self.loader.stream(camera.rect, camera.player.velocity)
+
+    def apply_quality(self):
+        level = self.governor.level
+        self.world.particle_manager.density = level.particle_density
+        for player in self.players:
+            player.light.set_quality(level.light_rays, level.light_interval)
+        self.shader.render_scale = level.render_scale
+        self.world.scheduler.band_interval = level.offscreen_interval
+
+    def draw(self):
+        for camera in self.cameras:
+            camera.update()
+        self.shader.set_views([camera.view for camera in self.cameras])
+        self.shader.set_lighting(
+            self.shadow_caster.opacity, get_daylight(self.world.relative_time)
+        )
+        self.shader.render(self.scene, overlay=self.overlay)
+
+    def draw_inventory(self, dt: float):
+        inventory = self.inventory_owner.inventory
+        inventory.update(dt)
+        changed = inventory.refresh() or not self._inventory_shown
+        if changed:
+            self._inventory_shown = True
+            # the interface stays frozen under the inventory, copied without blending
+            self.overlay.fill(Color.TRANSPARENT)
+            self.overlay.blit(
+                self._frozen_frame, (0, 0), special_flags=pygame.BLEND_RGBA_MAX
+            )
+            self.overlay.blit(inventory.image, (0, 0))  # type: ignore
+        self.shader.render(self.scene, upload=changed, overlay=self.overlay)
+
     def handle_menu_commands(self):
         events = pygame.event.get(self.SAVE)
         if events:
@@ -130,8 +276,11 @@ class Level:
                 self.save_game()
 
     def save_game(self):
+        self.world.player_ids = tuple(player.id for player in self.players)
         WorldStorage().store(self.world)
-        PlayerStorage().store(self.player)
+        storage = PlayerStorage()
+        for player in self.players:
+            storage.store(player)
 
     def check_player_dead(self):
         for event in pygame.event.get(Player.DEAD):
@@ -144,6 +293,7 @@ class Level:
         if self.status == self.Status.LOADING:
             if pygame.event.get(self.loader.LOADED):
                 self.status = self.Status.RUNNING
+                self.music.play(load_pattern(MUSIC), MUSIC_BEAT, loop=True)
         elif self.status == self.Status.PAUSED:
             if pygame.event.get(self.RESUME):
                 self.status = self.Status.RUNNING
@@ -152,8 +302,14 @@ class Level:
             if events:
                 event = events[0]
                 if event.type == Player.PAUSE:
+                    # the gamepad that paused drives the menu
+                    gamepad_index = event.character.controller.gamepad_index
+                    self.pause_menu.controller.gamepad_index = gamepad_index
                     self.status = self.Status.PAUSED
                 elif event.type == Player.OPEN_INVENTORY:
+                    self.inventory_owner = event.character
+                    self._frozen_frame = self.overlay.copy()
+                    self._inventory_shown = False
                     self.status = self.Status.INVENTORY_OPEN
         elif self.status == self.Status.INVENTORY_OPEN:
             if pygame.event.get(Inventory.CLOSE):
@@ -2,7 +2,7 @@ import copy
 import math
 from itertools import product
 from math import dist
-from typing import Callable
+from typing import Iterator, Sequence
 
 import pygame
 
@@ -14,17 +14,43 @@ from utils.coords import Coords, neighbors
 Entrance = tuple[Coords, Coords]
 
 
+class LightMap(Container2d[int]):
+    """Opacity of every tile, mirrored row by row into bytes for a texture
+
+    The copy on the GPU is only uploaded again after a write, which happens as
+    the world is lit and dug rather than every frame.
+    """
+
+    def __init__(self, size: tuple[int, int]) -> None:
+        self._width, self._height = size
+        self.data = bytearray(size[0] * size[1])
+        self.changed = True
+        super().__init__(size)
+
+    def set_element(self, coords: Coords, element: int | None):
+        # runs for every tile lit, so it avoids calls beyond the int conversion
+        x, y = coords
+        self._container[x][y] = element  # type: ignore
+        value = int(element) if element else 0
+        # past the index check, negative coords wrap around like the lists do
+        self.data[y % self._height * self._width + x % self._width] = (
+            value if 0 <= value < 256 else 255 if value > 0 else 0
+        )
+        self.changed = True
+
+    def empty(self):
+        self._container = [[0] * self.size[1] for _ in range(self.size[0])]
+        self.data[:] = bytes(len(self.data))
+        self.changed = True
+
+
 class ShadowCaster:
     def __init__(
         self,
         blocks: Container2d[BaseBlock],
         boundary: pygame.rect.Rect,
     ) -> None:
-        self.opacity: Container2d[int] = Container2d(blocks.size)
-        self.opacity._container = [
-            [0 for _ in range(self.opacity.size[1])]
-            for _ in range(self.opacity.size[0])
-        ]
+        self.opacity = LightMap(blocks.size)
         self.outer_layer: list[int] = [0 for _ in range(blocks.size[0] + 1)]
 
         self._blocks = blocks
@@ -36,16 +62,10 @@ class ShadowCaster:
         self._end_x: int
         self._end_y: int
         self._pad = -1
-        self._shadow_img: pygame.surface.Surface
 
         self.shadows: dict[Entrance, set[Coords]] = {}
 
-    def setup(self):
-        self._shadow_img = pygame.surface.Surface(
-            (BLOCK_SIZE, BLOCK_SIZE)
-        ).convert_alpha()
-
-    def _detect_outer_layer(self, progress_callback: Callable[[float], None]):
+    def detect_outer_layer(self) -> Iterator[float]:
         width, height = self.opacity.shape
 
         # scan from left to right
@@ -57,26 +77,16 @@ class ShadowCaster:
                     self.outer_layer[x] = y
                     break
 
-            # report progress
-            # since it's expensive, do it every 5%
-            step_progress = x / width
-            if int(step_progress * 100) % 5 == 0:
-                progress_callback(step_progress)
+            yield (x + 1) / width
 
-    def _generate_light_entrances_info(
-        self, progress_callback: Callable[[float], None]
-    ):
-        width, _ = self.opacity.shape
-
-        # scan from left to right
-        for x in range(width):
+    def light_columns(self, columns: Sequence[int]) -> Iterator[float]:
+        # outer layer must be detected beforehand
+        for index, x in enumerate(columns):
             self._scan_col(x)
+            for y in range(self.outer_layer[x] + 1):
+                self._penetrate_light((x, y), 1)
 
-            # report progress
-            # since it's expensive, do it every 5%
-            step_progress = x / width
-            if int(step_progress * 100) % 5 == 0:
-                progress_callback(step_progress)
+            yield (index + 1) / len(columns)
 
     def _scan_col(self, x: int):
         _curr = self.outer_layer[x]
@@ -94,30 +104,21 @@ class ShadowCaster:
             for entrance in entrances:
                 self._scan_entrance(entrance)
 
-    def _generate_opacity_info(self, progress_callback: Callable[[float], None]):
-        width, _ = self.opacity.shape
-        for x in range(width):
-            for y in range(self.outer_layer[x] + 1):
-                self._penetrate_light((x, y), 1)
-
-            # report progress
-            # since it's expensive, do it every 5%
-            step_progress = x / width
-            if int(step_progress * 100) % 5 == 0:
-                progress_callback(step_progress)
-
-        self._generate_opacity_for_entrances()
-
-    def _generate_opacity_for_entrances(self):
+    def generate_opacity_for_entrances(self, columns: range | None = None):
+        shadows = {
+            entrance: shadow
+            for entrance, shadow in self.shadows.items()
+            if columns is None or entrance[0][0] in columns
+        }
         max_opacity = 0.8
-        for entrance, shadow in self.shadows.items():
+        for entrance, shadow in shadows.items():
             for coords in shadow:
                 self.opacity[coords] = 0
                 for x, y in neighbors(coords):
                     if y > self.outer_layer[x] + 1:
                         self.opacity[x, y] = 0
 
-        for entrance, shadow in self.shadows.items():
+        for entrance, shadow in shadows.items():
             for coords in shadow:
                 opacity = max_opacity - self._get_distance_to_entrance(
                     coords, entrance
@@ -186,22 +187,6 @@ class ShadowCaster:
         _opacity += opacity
         self.set_opacity(coords, _opacity)
 
-    def cast(
-        self,
-        coords: Coords,
-        offset: pygame.math.Vector2,
-        display: pygame.surface.Surface,
-        opacity: int,
-    ):
-        _opacity = (self.opacity[coords] or 0) + opacity
-        if _opacity < 255:
-            _opacity = 255 - _opacity
-            self._shadow_img.set_alpha(_opacity)
-            display.blit(
-                self._shadow_img,
-                (coords[0] * BLOCK_SIZE + offset.x, coords[1] * BLOCK_SIZE + offset.y),
-            )
-
     def find_entrances(self, x: int, from_y: int, to_y: int):
         entrances: set[Entrance] = set()
         top: Coords | None = None
@@ -348,7 +333,7 @@ class ShadowCaster:
             for _y in range(self.outer_layer[x - 1 + i] + 1):
                 self._penetrate_light((x - 1 + i, _y), 1)
 
-        self._generate_opacity_for_entrances()
+        self.generate_opacity_for_entrances()
 
 
 class RadialLight:
@@ -356,6 +341,11 @@ class RadialLight:
         self._blocks = blocks
         self.length = length
         self.ray_count = self._get_ray_count()
+        # in full quality rays, which are one block apart at the edge of the light
+        self._ray_spacing = 1.0
+        self.update_interval = 1  # in updates, between recomputes of a moving light
+        self._since_update = 0
+        self._stale = False
         self.opacity: Container2d[int] = Container2d((2 * length + 1, 2 * length + 1))
 
         self._initial_rays_state = [True for _ in range(self.ray_count + 1)]
@@ -363,16 +353,55 @@ class RadialLight:
         self.position = pygame.math.Vector2()
         self._current_coords: Coords = (0, 0)
         self.photons: list[Coords] = []
+        # opacity around the light in rows of bytes, versioned for the GPU copy
+        self.data = bytes(self.opacity.size[0] * self.opacity.size[1])
+        self.version = 0
 
     def _get_ray_count(self):
         circle_length = 2 * math.pi * self.length * BLOCK_SIZE
         return int(circle_length // BLOCK_SIZE)
 
+    @property
+    def coords(self):
+        return self._current_coords
+
+    def set_quality(self, rays: float = 1, update_interval: int = 1):
+        """Casts only a share of the rays, recomputing at most every few updates"""
+        ray_count = max(int(self._get_ray_count() * rays), 1)
+        self.update_interval = update_interval
+        if ray_count == self.ray_count:
+            return
+        # fewer rays still go around the whole circle
+        self._ray_spacing = self._get_ray_count() / ray_count
+        self.ray_count = ray_count
+        self._initial_rays_state = [True for _ in range(self.ray_count + 1)]
+        self._stale = True
+        self._since_update = self.update_interval
+
     def update(self):
+        self._since_update += 1
+        if self._since_update < self.update_interval:
+            return
         coords = int(self.position.x // BLOCK_SIZE), int(self.position.y // BLOCK_SIZE)
-        if coords != self._current_coords:
+        if coords != self._current_coords or self._stale:
+            self._since_update = 0
+            self._stale = False
             self._current_coords = coords
             self._update_opacity()
+            self._update_data()
+
+    def _update_data(self):
+        offsets = range(-self.length, self.length + 1)
+        self.data = bytes(
+            (
+                min(max(int(self.opacity[x, y] or 0), 0), 255)
+                if self.in_range((x, y))
+                else 0
+            )
+            for y in offsets
+            for x in offsets
+        )
+        self.version += 1
 
     def _update_opacity(self):
         self.opacity.empty()
@@ -384,7 +413,7 @@ class RadialLight:
             # check for occlusion
             if rays[ray] is False:
                 continue
-            angle = (ray) / self.length
+            angle = ray * self._ray_spacing / self.length
             length = (layer + 1) * BLOCK_SIZE
 
             x, y = (length * math.sin(angle), length * math.cos(angle))
@@ -1,10 +1,16 @@
-from typing import Any
+from functools import cache
+from typing import Any, Callable
 
-try:
-    from rich import print as _print
-except ImportError:
-    pass
+
+@cache
+def _printer() -> Callable[[Any], None]:
+    # rich is slow to import and optional, so it is loaded by the first log
+    try:
+        from rich import print as rich_print
+    except ImportError:
+        return print
+    return rich_print
 
 
 def log(msg: Any):
-    _print(msg)
+    _printer()(msg)
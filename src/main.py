@@ -1,18 +1,86 @@
 import argparse
 import os
+import random
+import time
+from pathlib import Path
 from pickle import UnpicklingError
 
-from game import Game
 from log import log
-from sounds import Chord, Sample, play_samples, square_wave
-from storage import PlayerStorage, WorldStorage
+from timings import import_times, startup_times, timed
+
+LAUNCH = time.perf_counter()
+
+# actions import the game, audio and storage modules they need when they run
 
 
 def play():
+    from game import Game
+
     game = Game()
     game.run()
 
 
+def record(input_log: Path):
+    from game import Game
+    from input.replay import InputRecorder
+
+    with InputRecorder(input_log, random.randrange(2**32)) as recorder:
+        game = Game(recorder=recorder)
+        game.run()
+    log(f"Recorded {recorder.frames} frames to {input_log}")
+
+
+def replay(input_log: Path):
+    from game import Game
+    from input.replay import InputReplay
+
+    game = Game(replay=InputReplay(input_log))
+    game.run()
+
+
+def benchmark(input_log: Path):
+    from game import Game
+    from input.replay import InputReplay
+
+    game = Game(replay=InputReplay(input_log), headless=True)
+    game.run()
+
+    frame_times = sorted(game.frame_times)
+    if not frame_times:
+        log("No frames replayed")
+        return
+    total = sum(frame_times)
+    print(f"frames: {len(frame_times)}")
+    print(f"total: {total:.3f}s")
+    print(f"mean: {total / len(frame_times) * 1000:.2f}ms")
+    print(f"p95: {frame_times[int(len(frame_times) * 0.95)] * 1000:.2f}ms")
+    print(f"max: {frame_times[-1] * 1000:.2f}ms")
+
+
+def startup_profile():
+    with timed("import game"):
+        import pygame
+
+        from game import Game
+    game = Game(headless=True)
+    game.setup()
+    with timed("first frame"):
+        game.main_loop(0)
+        pygame.display.flip()
+    total = time.perf_counter() - LAUNCH
+    pygame.quit()
+
+    print("imports, in a fresh process:")
+    imports = import_times("game")
+    for name, seconds in imports.most_common(10):
+        print(f"  {name}: {seconds * 1000:.2f}ms")
+    print(f"  total: {sum(imports.values()) * 1000:.2f}ms")
+    print("startup:")
+    for step, seconds in startup_times.items():
+        print(f"  {step}: {seconds * 1000:.2f}ms")
+    print(f"launch to controller detection: {total * 1000:.2f}ms")
+
+
 def debug():
     os.environ["DEBUG"] = "1"
     play()
@@ -29,6 +97,8 @@ def world_builder():
 
 
 def clear_db():
+    from storage import PlayerStorage, WorldStorage
+
     try:
         WorldStorage().clear()
         PlayerStorage().clear()
@@ -37,6 +107,9 @@ def clear_db():
 
 
 def sound():
+    from sequencer import play_samples
+    from sounds import Chord, Sample, square_wave
+
     samples = [
         ("F G", 0.5),
         ("F G", 0.5),
@@ -99,10 +172,29 @@ if __name__ == "__main__":
         "builder": world_builder,
         "clear_db": clear_db,
         "sound": sound,
+        "startup-profile": startup_profile,
+    }
+    input_log_options = {
+        "record": record,
+        "replay": replay,
+        "benchmark": benchmark,
     }
 
     parser = argparse.ArgumentParser(description="Run game")
-    parser.add_argument("--action", choices=options.keys(), default=next(iter(options)))
+    parser.add_argument(
+        "--action",
+        choices=[*options.keys(), *input_log_options.keys()],
+        default=next(iter(options)),
+    )
+    parser.add_argument(
+        "--input-log",
+        type=Path,
+        default=Path("session.inputlog"),
+        help="input log written by record and read by replay and benchmark",
+    )
     args = parser.parse_args()
     action = args.action
-    options[args.action]()
+    if action in input_log_options:
+        input_log_options[action](args.input_log)
+    else:
+        options[action]()
@@ -11,6 +11,8 @@ from utils.timer import Timer
 class Manager:
     def __init__(self) -> None:
         self.emitters: set[Emitter] = set()
+        # share of particles emitters actually create, lowered under load
+        self.density = 1.0
 
     def add(self, emitter: Emitter):
         self.emitters.add(emitter)
@@ -52,6 +54,7 @@ class Emitter:
             )
             self._age_timer.start()
 
+        self._owed = 0.0
         self._emission_timer = Timer(1 / self.rate, self.emit)
         self._emission_timer.start()
         self._manager = manager
@@ -72,6 +75,10 @@ class Emitter:
     def emit(self):
         self._emission_timer.reset()
         self._emission_timer.start()
+        self._owed += self._manager.density
+        if self._owed < 1:
+            return
+        self._owed -= 1
         self._particles.add(Particle(self.origin, Color.BULLET, (2, 2), 100, 100))
 
     def draw(self, surf: pygame.surface.Surface, offset: pygame.math.Vector2):
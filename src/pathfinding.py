@@ -0,0 +1,240 @@
+import heapq
+from itertools import count
+
+import pygame
+
+from blocks import BaseBlock, CollisionShape
+from settings import BLOCK_SIZE
+from utils.container import Container2d
+from utils.coords import Coords
+
+# in block size units, reachable with a single jump (v² / 2g, minus head room)
+JUMP_HEIGHT = 3
+
+Node = Coords  # empty tile right above the ground, where a character stands
+
+
+class NavigationGrid:
+    """Walkable graph over the block grid, built lazily one column at a time"""
+
+    # searches giving up after this many expansions are cached as unreachable
+    max_expansions = 4000
+    max_cached_paths = 256
+
+    def __init__(self, blocks: Container2d[BaseBlock]) -> None:
+        self.blocks = blocks
+        self.width, self.height = blocks.size
+        self.version = 0
+        self._solid: dict[int, list[bool]] = {}
+        self._nodes: dict[int, list[int]] = {}
+        self._edges: dict[Node, dict[Node, float]] = {}
+        self._reverse_edges: dict[Node, dict[Node, float]] = {}
+        self._paths: dict[tuple[Node, Node], list[Node] | None] = {}
+
+    def clear(self):
+        self._solid.clear()
+        self._nodes.clear()
+        self._edges.clear()
+        self._reverse_edges.clear()
+        self._paths.clear()
+        self.version += 1
+
+    def invalidate(self, coords: Coords):
+        """Forget everything that depends on the given tile"""
+        x, _ = coords
+        self._solid.pop(x, None)
+        for column in range(x - 1, x + 2):
+            for y in self._nodes.pop(column, []):
+                node = (column, y)
+                for target in self._edges.pop(node, {}):
+                    self._reverse_edges.get(target, {}).pop(node, None)
+        self._paths = {
+            key: path
+            for key, path in self._paths.items()
+            if path is not None and not any(abs(n[0] - x) <= 1 for n in path)
+        }
+        self.version += 1
+
+    def is_solid(self, coords: Coords):
+        x, y = coords
+        if not 0 <= x < self.width:
+            return True
+        if y < 0:
+            return False
+        if y >= self.height:
+            return True
+        return self._get_solid_column(x)[y]
+
+    def _get_solid_column(self, x: int):
+        column = self._solid.get(x)
+        if column is None:
+            column = []
+            for y in range(self.height):
+                block = self.blocks.get_element((x, y))
+                column.append(
+                    block is not None and block.collision_shape != CollisionShape.NONE
+                )
+            self._solid[x] = column
+        return column
+
+    def is_free(self, coords: Coords):
+        x, y = coords
+        return not self.is_solid((x, y)) and not self.is_solid((x, y - 1))
+
+    def is_standable(self, coords: Coords):
+        x, y = coords
+        return self.is_free(coords) and self.is_solid((x, y + 1))
+
+    def nodes(self, x: int) -> list[int]:
+        if not 0 <= x < self.width:
+            return []
+        nodes = self._nodes.get(x)
+        if nodes is None:
+            nodes = [y for y in range(self.height) if self.is_standable((x, y))]
+            self._nodes[x] = nodes
+            for y in nodes:
+                self._add_edges((x, y))
+        return nodes
+
+    def neighbors(self, node: Node) -> dict[Node, float]:
+        self.nodes(node[0])
+        return self._edges.get(node, {})
+
+    def predecessors(self, node: Node) -> dict[Node, float]:
+        # edges into a column can only come from the adjacent ones
+        for column in range(node[0] - 1, node[0] + 2):
+            self.nodes(column)
+        return self._reverse_edges.get(node, {})
+
+    def _add_edges(self, node: Node):
+        edges = self._edges[node] = {}
+        for target, cost in self._find_edges(node):
+            edges[target] = cost
+            self._reverse_edges.setdefault(target, {})[node] = cost
+
+    def _find_edges(self, node: Node):
+        x, y = node
+        for dx in (-1, 1):
+            side = (x + dx, y)
+            if self.is_standable(side):
+                yield side, 1
+            elif self.is_free(side):
+                landing = self._find_landing(side)
+                if landing is not None:
+                    yield landing, 1 + (landing[1] - y) / 2
+
+            for height in range(1, JUMP_HEIGHT + 1):
+                if self.is_solid((x, y - height - 1)):
+                    break
+                target = (x + dx, y - height)
+                if self.is_standable(target):
+                    yield target, 1 + height
+
+    def _find_landing(self, coords: Coords) -> Node | None:
+        x, y = coords
+        while y < self.height:
+            if self.is_solid((x, y + 1)):
+                return x, y
+            y += 1
+        return None
+
+    def node_at(self, position: pygame.math.Vector2) -> Node | None:
+        """Node where a character at the given position would land"""
+        x, y = int(position.x // BLOCK_SIZE), int(position.y // BLOCK_SIZE)
+        if self.is_solid((x, y)):
+            return None
+        return self._find_landing((x, max(y, 0)))
+
+    def find_path(self, start: Node, goal: Node) -> list[Node] | None:
+        key = (start, goal)
+        if key not in self._paths:
+            if len(self._paths) >= self.max_cached_paths:
+                self._paths.clear()
+            self._paths[key] = self._search(start, goal)
+        return self._paths[key]
+
+    def _search(self, start: Node, goal: Node):
+        tie_breaker = count()
+        queue = [(self._heuristic(start, goal), next(tie_breaker), start)]
+        costs = {start: 0.0}
+        came_from: dict[Node, Node] = {}
+
+        for _ in range(self.max_expansions):
+            if not queue:
+                break
+            _, _, node = heapq.heappop(queue)
+            if node == goal:
+                path = [node]
+                while node in came_from:
+                    node = came_from[node]
+                    path.append(node)
+                return path[::-1]
+            for neighbor, cost in self.neighbors(node).items():
+                new_cost = costs[node] + cost
+                if new_cost < costs.get(neighbor, float("inf")):
+                    costs[neighbor] = new_cost
+                    came_from[neighbor] = node
+                    priority = new_cost + self._heuristic(neighbor, goal)
+                    heapq.heappush(queue, (priority, next(tie_breaker), neighbor))
+        return None
+
+    @staticmethod
+    def _heuristic(node: Node, goal: Node):
+        return abs(node[0] - goal[0]) + abs(node[1] - goal[1])
+
+
+class FlowField:
+    """Next step towards a shared goal for every node around it"""
+
+    def __init__(self, grid: NavigationGrid, radius: int) -> None:
+        self.grid = grid
+        self.radius = radius  # in block size units
+        self.goal: Node | None = None
+        self._version = -1
+        self._next: dict[Node, Node] = {}
+
+    def update(self, position: pygame.math.Vector2):
+        goal = self.grid.node_at(position)
+        if goal is None:
+            return
+        if goal == self.goal and self._version == self.grid.version:
+            return
+        self.goal = goal
+        self._version = self.grid.version
+        self._build(goal)
+
+    def _build(self, goal: Node):
+        left, right = goal[0] - self.radius, goal[0] + self.radius
+        costs = {goal: 0.0}
+        self._next = {}
+        queue = [(0.0, goal)]
+        while queue:
+            cost, node = heapq.heappop(queue)
+            if cost > costs[node]:
+                continue
+            for source, edge_cost in self.grid.predecessors(node).items():
+                if not left <= source[0] <= right:
+                    continue
+                new_cost = cost + edge_cost
+                if new_cost < costs.get(source, float("inf")):
+                    costs[source] = new_cost
+                    self._next[source] = node
+                    heapq.heappush(queue, (new_cost, source))
+
+    def next_node(self, node: Node):
+        return self._next.get(node)
+
+    def steer(self, position: pygame.math.Vector2) -> tuple[float, bool] | None:
+        """Horizontal direction and whether a jump is needed to follow the field"""
+        node = self.grid.node_at(position)
+        if node is None:
+            return None
+        if node == self.goal:
+            return 0, False
+        target = self.next_node(node)
+        if target is None:
+            return None
+
+        center = (target[0] + 0.5) * BLOCK_SIZE
+        direction = max(-1.0, min((center - position.x) / BLOCK_SIZE, 1.0))
+        return direction, target[1] < node[1]
@@ -0,0 +1,126 @@
+from collections import deque
+from dataclasses import dataclass
+
+from log import log
+from settings import FRAME_BUDGET, QUALITY
+
+
+@dataclass(frozen=True)
+class QualityLevel:
+    """How much detail the game can afford, each level giving up a bit more"""
+
+    name: str
+    particle_density: float = 1  # share of particles emitted
+    light_rays: float = 1  # share of rays cast by radial lights
+    light_interval: int = 1  # in frames, between radial light recomputes
+    render_scale: float = 1  # of the scene resolution, the interface stays sharp
+    offscreen_interval: float = 1 / 30  # in seconds, between off-screen AI ticks
+
+
+# features are degraded in order, from the least to the most visible
+QUALITY_LEVELS = (
+    QualityLevel("high"),
+    QualityLevel("fewer particles", particle_density=0.5),
+    QualityLevel("fewer rays", particle_density=0.5, light_rays=0.5),
+    QualityLevel(
+        "slower light", particle_density=0.25, light_rays=0.5, light_interval=4
+    ),
+    QualityLevel(
+        "half resolution",
+        particle_density=0.25,
+        light_rays=0.5,
+        light_interval=4,
+        render_scale=0.5,
+    ),
+    QualityLevel(
+        "low",
+        particle_density=0.25,
+        light_rays=0.5,
+        light_interval=4,
+        render_scale=0.5,
+        offscreen_interval=1 / 10,
+    ),
+)
+
+
+class QualityGovernor:
+    """Picks the quality level from the mean time of the last frames
+
+    A level is given up as soon as a full window of frames is over the budget,
+    but only restored after a longer wait with enough headroom, so the level
+    does not flip back and forth around the budget. Only one frame in
+    sample_interval is timed, as timing it waits for the GPU.
+    """
+
+    def __init__(
+        self,
+        budget: float = FRAME_BUDGET,
+        window: int = 8,  # in sampled frames
+        headroom: float = 0.7,
+        restore_after: int = 30,  # in sampled frames
+        index: int = 0,
+        adaptive: bool = True,
+        sample_interval: int = 4,
+    ) -> None:
+        self.budget = budget
+        self.sample_interval = sample_interval
+        self.headroom = headroom
+        self.restore_after = restore_after
+        self.adaptive = adaptive
+        self.index = index
+        self.frame_time = 0.0  # rolling mean, in seconds
+        self._frame_times: deque[float] = deque(maxlen=window)
+        self._total = 0.0
+        self._since_change = 0
+        self._frame = 0
+
+    @classmethod
+    def from_settings(cls, deterministic: bool = False):
+        if QUALITY != "auto" and not QUALITY.isdigit():
+            log(f"unknown QUALITY {QUALITY!r}, following the frame budget instead")
+        # replays must simulate the same world, so the level never adapts
+        if not QUALITY.isdigit():
+            return cls(adaptive=not deterministic)
+        # levels past the last one pin the lowest quality
+        index = min(int(QUALITY), len(QUALITY_LEVELS) - 1)
+        return cls(index=index, adaptive=False)
+
+    @property
+    def level(self):
+        return QUALITY_LEVELS[self.index]
+
+    def sample(self) -> bool:
+        """Counts a frame, returns whether it is one to time and record"""
+        self._frame = (self._frame + 1) % self.sample_interval
+        return self._frame == 0
+
+    def record(self, frame_time: float) -> bool:
+        """Adds the time a frame took, returns whether the level changed"""
+        frame_times = self._frame_times
+        if len(frame_times) == frame_times.maxlen:
+            self._total -= frame_times[0]
+        frame_times.append(frame_time)
+        self._total += frame_time
+        self.frame_time = self._total / len(frame_times)
+        self._since_change += 1
+        if not self.adaptive or len(frame_times) < frame_times.maxlen:  # type: ignore
+            return False
+
+        if self.frame_time > self.budget and self.index < len(QUALITY_LEVELS) - 1:
+            self._set_index(self.index + 1)
+            return True
+        if (
+            self.frame_time < self.budget * self.headroom
+            and self.index > 0
+            and self._since_change >= self.restore_after
+        ):
+            self._set_index(self.index - 1)
+            return True
+        return False
+
+    def _set_index(self, index: int):
+        self.index = index
+        # frames of the previous level say nothing about the new one
+        self._frame_times.clear()
+        self._total = 0.0
+        self._since_change = 0
@@ -0,0 +1,42 @@
+import pygame
+
+from settings import BLOCK_SIZE
+
+
+class LodScheduler:
+    """Ticks sprites less often the further they are from the focus area"""
+
+    margin = 16 * BLOCK_SIZE
+    # sprites in the margin band are updated at this interval, with the elapsed dt
+    band_interval = 1 / 30
+
+    def __init__(self) -> None:
+        # one area per camera in split screen
+        self.focus: list[pygame.rect.Rect] | None = None
+        self._elapsed: dict[pygame.sprite.Sprite, float] = {}
+
+    def set_focus(self, *rects: pygame.rect.Rect):
+        self.focus = list(rects)
+
+    def update(self, sprites: pygame.sprite.AbstractGroup, dt: float):
+        if self.focus is None:
+            sprites.update(dt)
+            return
+
+        band = [rect.inflate(2 * self.margin, 2 * self.margin) for rect in self.focus]
+        elapsed: dict[pygame.sprite.Sprite, float] = {}
+        for sprite in sprites.sprites():
+            if sprite.rect.collidelist(self.focus) != -1:
+                sprite.update(dt + self._elapsed.get(sprite, 0))
+            elif sprite.rect.collidelist(band) != -1:
+                pending = self._elapsed.get(sprite, 0) + dt
+                if pending >= self.band_interval:
+                    sprite.update(pending)
+                else:
+                    elapsed[sprite] = pending
+            # sprites beyond the band are frozen
+        self._elapsed = elapsed
+
+    def clear(self):
+        self.focus = None
+        self._elapsed.clear()
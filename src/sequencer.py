@@ -0,0 +1,155 @@
+from collections.abc import Collection, Sequence
+from pathlib import Path
+
+import pygame
+
+from sounds import WAVEFORMS, Sample, mixer_ready, notation_to_frequency
+
+REST = "."
+HOLD = "-"
+CHORD = "+"
+
+Track = list[Sample]
+
+
+class InvalidPattern(Exception):
+    """Raises when a pattern has unknown instruments, ragged rows or too many
+    tracks for the sequencer's channels"""
+
+
+class Pattern:
+    """Tracker style grid with a column per track and a row per beat
+
+    The first row names each column's waveform. Cells hold notes, joined with
+    "+" for chords, "." for a rest or "-" to hold the previous cell.
+    """
+
+    def __init__(self, tracks: Sequence[Track]) -> None:
+        self.tracks = tracks
+
+    @classmethod
+    def from_string(cls, text: str):
+        rows = [
+            line.split()
+            for line in text.splitlines()
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+        if not rows:
+            raise InvalidPattern("Empty pattern")
+        header, *rows = rows
+        if any(len(row) != len(header) for row in rows):
+            raise InvalidPattern("Every row needs a cell for each track")
+
+        tracks = []
+        for column, name in enumerate(header):
+            if name not in WAVEFORMS:
+                raise InvalidPattern(f"Unknown waveform: {name}")
+            tracks.append(cls._parse_track([row[column] for row in rows], name))
+        return cls(tracks)
+
+    @staticmethod
+    def _parse_track(cells: list[str], waveform: str):
+        track: Track = []
+        for cell in cells:
+            if cell == HOLD and track:
+                track[-1].duration += 1
+                continue
+            notes = () if cell in (REST, HOLD) else cell.split(CHORD)
+            try:
+                frequencies = [notation_to_frequency(note) for note in notes]
+            except ValueError as err:
+                raise InvalidPattern(err) from err
+            track.append(Sample(frequencies, WAVEFORMS[waveform]))
+        return track
+
+
+def load_pattern(path: Path):
+    with open(path, encoding="utf-8") as file:
+        return Pattern.from_string(file.read())
+
+
+class Voice:
+    """Plays a track on its own channel, keeping the next sample queued"""
+
+    def __init__(
+        self, channel: pygame.mixer.Channel, track: Track, beat: float, loop: bool
+    ) -> None:
+        self.channel = channel
+        self.loop = loop
+        # synthesized up front so ticks only hand buffers to the mixer
+        self.sounds = [sample.render(beat) for sample in track]
+        self._index = 0
+
+    def _next_sound(self):
+        if self._index == len(self.sounds):
+            if not self.loop:
+                return None
+            self._index = 0
+        sound = self.sounds[self._index]
+        self._index += 1
+        return sound
+
+    def feed(self):
+        if not self.channel.get_busy():
+            if (sound := self._next_sound()) is None:
+                return
+            self.channel.play(sound)
+        if self.channel.get_queue() is None:
+            if (sound := self._next_sound()) is not None:
+                self.channel.queue(sound)
+
+    @property
+    def playing(self):
+        return self.channel.get_busy() or self._index < len(self.sounds)
+
+
+class Sequencer:
+    """Schedules tracks onto reserved mixer channels, ticked once per frame
+
+    Each channel holds the playing sample and the next one, so playback stays
+    gapless as long as a frame is shorter than a beat.
+    """
+
+    def __init__(self, channels: int = 4, volume: float = 1) -> None:
+        self.enabled = mixer_ready()
+        self.volume = volume
+        self.channels = channels
+        self.voices: list[Voice] = []
+        self._channels: list[pygame.mixer.Channel] = []
+        if self.enabled:
+            # sound effects picking free channels never take these
+            pygame.mixer.set_reserved(channels)
+            self._channels = [pygame.mixer.Channel(i) for i in range(channels)]
+
+    def play(self, pattern: Pattern, beat: float, loop: bool = False):
+        if len(pattern.tracks) > self.channels:
+            raise InvalidPattern(
+                f"{len(pattern.tracks)} tracks for {self.channels} channels"
+            )
+        self.stop()
+        for channel, track in zip(self._channels, pattern.tracks):
+            channel.set_volume(self.volume)
+            self.voices.append(Voice(channel, track, beat, loop))
+        self.tick()
+
+    def tick(self):
+        for voice in self.voices:
+            voice.feed()
+
+    def stop(self):
+        for voice in self.voices:
+            voice.channel.stop()
+        self.voices.clear()
+
+    @property
+    def playing(self):
+        return any(voice.playing for voice in self.voices)
+
+
+def play_samples(samples: Collection[Sample], beat: float = 0.3):
+    """Plays the samples one after another, blocking until the last one ends"""
+    sequencer = Sequencer(channels=1)
+    sequencer.play(Pattern([list(samples)]), beat)
+    while sequencer.playing:
+        sequencer.tick()
+        pygame.time.wait(10)
@@ -20,6 +20,11 @@ if DEBUG:
     WORLD_SIZE = 2 * 80, 2 * 45
 
 # WORLD_SIZE = 50 * 80, 50 * 45
+
+# in columns, runs are at least twice the fade so borders never overlap
+BIOME_WIDTH = 100, 240
+BIOME_FADE = 24
+
 DAY_DURATION = 10
 # DAY_DURATION = 15 * 60
 
@@ -28,9 +33,29 @@ MAX_SURROUNDING_LENGTH = (SCREEN_WIDTH + SCREEN_HEIGHT) * 2 // BLOCK_SIZE
 GRAVITY = 50
 TERMINAL_VELOCITY = 30
 
+HORDE_SIZE = 100
+
+MAX_PLAYERS = 4  # split screen, one per connected gamepad
+
+# "auto" follows the frame budget, a level number pins it, 0 being the best
+QUALITY = os.getenv("QUALITY", "auto")
+FRAME_BUDGET = 1 / 60  # in seconds of work per frame
+SHOW_PROFILER = DEBUG or bool(os.getenv("PROFILER", ""))
+
 
 PROJECT_DIR = Path(os.path.dirname(os.path.realpath(__file__)))
 
 DEFAULT_FONT = PROJECT_DIR / "assets" / "pixeldroidBoticRegular.ttf"
 CONSOLE_FONT = PROJECT_DIR / "assets" / "pixeldroidConsoleRegular.ttf"
 MENU_FONT = PROJECT_DIR / "assets" / "pixeldroidMenuRegular.ttf"
+
+MUSIC = PROJECT_DIR / "assets" / "theme.pattern"
+MUSIC_BEAT = 0.15  # in seconds
+MUSIC_VOLUME = 0.2
+MUSIC_CHANNELS = 4
+SFX_CHANNELS = 12
+SFX_VOLUME = 0.5
+HEARING_DISTANCE = SCREEN_WIDTH  # in pixels
+
+INPUT_MAP = PROJECT_DIR / "assets" / "input_map.json"
+USER_INPUT_MAP = "input_map.json"  # rebound controls, next to the save files
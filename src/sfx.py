@@ -0,0 +1,203 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+from math import cos, hypot, pi, sin
+
+import pygame
+
+from events import BlockBroken, BulletShatter, DestroyBlock, EventBus, PlaceBlock, Shoot
+from settings import (
+    BLOCK_SIZE,
+    HEARING_DISTANCE,
+    MUSIC_CHANNELS,
+    SFX_CHANNELS,
+    SFX_VOLUME,
+)
+from sounds import mixer_ready, noise_sound, sweep_sound, triangle_wave
+from utils.container import Container2d
+from utils.coords import Coords
+
+Position = tuple[float, float]
+
+
+@dataclass(frozen=True)
+class Effect:
+    """A sound with limits on how many copies play at once and how often"""
+
+    name: str
+    make_sound: Callable[[], pygame.mixer.Sound]
+    voices: int = 2
+    priority: int = 0
+    coalesce: float = 0.05  # in seconds
+    volume: float = 1
+
+
+SHOT = Effect(
+    "shot",
+    lambda: sweep_sound(1400, 300, 0.08),
+    voices=4,
+    priority=2,
+    coalesce=0.03,
+    volume=0.4,
+)
+DIG = Effect(
+    "dig", lambda: noise_sound(0.05, seed=1), voices=2, coalesce=0.12, volume=0.3
+)
+BREAK = Effect("break", lambda: noise_sound(0.25, seed=2), voices=3, priority=3)
+PLACE = Effect("place", lambda: sweep_sound(200, 400, 0.05, triangle_wave), priority=1)
+SHATTER = Effect(
+    "shatter",
+    lambda: sweep_sound(900, 150, 0.1, triangle_wave),
+    voices=3,
+    priority=1,
+    coalesce=0.04,
+    volume=0.5,
+)
+EFFECTS = (SHOT, DIG, BREAK, PLACE, SHATTER)
+
+
+def _block_center(coords: Coords) -> Position:
+    return (coords[0] + 0.5) * BLOCK_SIZE, (coords[1] + 0.5) * BLOCK_SIZE
+
+
+class SoundEffects:
+    """Plays gameplay events on a fixed pool of channels, ticked once per frame
+
+    Repeats of an effect within its coalesce window are dropped and each effect
+    has a voice limit, so heavy combat costs at most a play per effect per window.
+    """
+
+    def __init__(
+        self,
+        channels: int = SFX_CHANNELS,
+        first_channel: int = MUSIC_CHANNELS,
+        volume: float = SFX_VOLUME,
+        hearing_distance: float = HEARING_DISTANCE,
+    ) -> None:
+        self.enabled = mixer_ready()
+        self.volume = volume
+        self.hearing_distance = hearing_distance
+        self.time = 0.0
+        self.listeners: tuple[Position, ...] = ()
+        self.blocks: Container2d | None = None
+        self._channels: list[pygame.mixer.Channel] = []
+        self._voices: list[Effect | None] = [None] * channels
+        self._started = [0.0] * channels
+        self._last_played: dict[Effect, float] = {}
+        self._sounds: dict[Effect, pygame.mixer.Sound] = {}
+        if self.enabled:
+            # channels below first_channel are reserved for the music
+            total = max(pygame.mixer.get_num_channels(), first_channel + channels)
+            pygame.mixer.set_num_channels(total)
+            self._channels = [
+                pygame.mixer.Channel(first_channel + i) for i in range(channels)
+            ]
+            # synthesized up front so gameplay only hands buffers to the mixer
+            for effect in EFFECTS:
+                self._sound(effect)
+
+    def subscribe(self, event_bus: EventBus, blocks: Container2d | None = None):
+        # handlers run after the world's, so a broken block is already gone
+        self.blocks = blocks
+        event_bus.subscribe(Shoot, self._on_shoot)
+        event_bus.subscribe(DestroyBlock, self._on_dig)
+        event_bus.subscribe(BlockBroken, self._on_break)
+        event_bus.subscribe(PlaceBlock, self._on_place)
+        event_bus.subscribe(BulletShatter, self._on_shatter)
+
+    def set_listeners(self, *positions: Position):
+        self.listeners = positions
+
+    def update(self, dt: float):
+        self.time += dt
+
+    def play(self, effect: Effect, position: Position) -> bool:
+        if not self.enabled:
+            return False
+        last_played = self._last_played.get(effect)
+        if last_played is not None and self.time - last_played < effect.coalesce:
+            return False
+        left, right = self._stereo_volume(position)
+        if not left and not right:
+            return False
+        index = self._pick_channel(effect)
+        if index is None:
+            return False
+
+        channel = self._channels[index]
+        channel.play(self._sound(effect))
+        # playing resets the stereo volume of a channel
+        volume = effect.volume * self.volume
+        channel.set_volume(left * volume, right * volume)
+        self._voices[index] = effect
+        self._started[index] = self.time
+        self._last_played[effect] = self.time
+        return True
+
+    def stop(self):
+        for channel in self._channels:
+            channel.stop()
+
+    def _sound(self, effect: Effect):
+        sound = self._sounds.get(effect)
+        if sound is None:
+            sound = self._sounds[effect] = effect.make_sound()
+        return sound
+
+    def _stereo_volume(self, position: Position) -> tuple[float, float]:
+        if not self.listeners:
+            return 1, 1
+        x, y = position
+        # split screen players each hear the world around their own camera
+        dx, dy = min(
+            ((x - listener[0], y - listener[1]) for listener in self.listeners),
+            key=lambda offset: offset[0] ** 2 + offset[1] ** 2,
+        )
+        gain = 1 - hypot(dx, dy) / self.hearing_distance
+        if gain <= 0:
+            return 0, 0
+        pan = max(-1, min(1, 2 * dx / self.hearing_distance))
+        # equal power panning keeps the loudness steady across the screen
+        angle = (pan + 1) * pi / 4
+        return gain * cos(angle), gain * sin(angle)
+
+    def _pick_channel(self, effect: Effect) -> int | None:
+        playing: list[tuple[int, Effect]] = []
+        free = None
+        for index, channel in enumerate(self._channels):
+            voice = self._voices[index]
+            if voice is not None and channel.get_busy():
+                playing.append((index, voice))
+            elif free is None:
+                free = index
+
+        same = [index for index, voice in playing if voice is effect]
+        if len(same) >= effect.voices:
+            return min(same, key=self._started.__getitem__)
+        if free is not None:
+            return free
+        # steals the oldest voice of the least important effect
+        candidates = [
+            (voice.priority, self._started[index], index)
+            for index, voice in playing
+            if voice.priority <= effect.priority
+        ]
+        return min(candidates)[2] if candidates else None
+
+    def _on_shoot(self, event: Shoot, _: float):
+        if event.bullet is not None:
+            self.play(SHOT, tuple(event.bullet.position))
+
+    def _on_dig(self, event: DestroyBlock, _: float):
+        if self.blocks is not None and self.blocks.get_element(event.coords) is None:
+            return
+        self.play(DIG, _block_center(event.coords))
+
+    def _on_break(self, event: BlockBroken, _: float):
+        self.play(BREAK, _block_center(event.coords))
+
+    def _on_place(self, event: PlaceBlock, _: float):
+        if event.block is not None:
+            self.play(PLACE, _block_center(event.coords))
+
+    def _on_shatter(self, event: BulletShatter, _: float):
+        self.play(SHATTER, event.position)
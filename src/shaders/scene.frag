@@ -0,0 +1,88 @@
+#version 330
+// Draws the parallax background of a viewport under the scene, which pygame
+// leaves transparent wherever the sky shows through, lights both and puts the
+// interface on top.
+
+#define LAYERS 3
+
+// Scene drawn by pygame, on texture channel 0
+uniform sampler2D surface;
+// Background layers of every biome, on texture channel 1
+uniform sampler2DArray layers;
+// Interface drawn by pygame over the lit scene, on texture channel 2
+uniform sampler2D overlay;
+// Static opacity of every tile in the world, on texture channel 3
+uniform sampler2D opacity;
+// Opacity of the viewport's player light around its tile, on texture channel 4
+uniform sampler2D light;
+// Screen size in pixels
+uniform vec2 screen;
+
+// Viewport x, y, width and height in pixels from the top left of the screen
+uniform vec4 viewport;
+// Horizontal scroll of the viewport, in pixels
+uniform float offset;
+// How far each layer moves with the scroll
+uniform vec3 displacements;
+// Index of the first layer of the viewport's background and of the one
+// fading in near a biome border, with how much of it shows
+uniform ivec2 first_layers;
+uniform vec3 skies[2];
+uniform float fade;
+
+// Top left corner of the viewport in the world, in pixels
+uniform vec2 camera;
+uniform float block_size;
+// Daylight reaching the tiles open to the sky
+uniform vec3 ambient;
+// Tile of the player light and how many tiles it reaches
+uniform ivec2 light_origin;
+uniform int light_radius;
+
+out vec4 f_color;
+in vec2 uv;
+
+vec3 background(vec2 local, int first_layer, vec3 sky) {
+  // layers keep their bottom edge at the bottom of the viewport
+  int y = int(local.y - viewport.w) + textureSize(layers, 0).y;
+  if (y < 0) {
+    return sky;
+  }
+  // back to front, each layer covering the ones behind where it is opaque
+  vec3 color = sky;
+  for (int layer = 0; layer < LAYERS; layer++) {
+    int x = int(local.x + displacements[layer] * offset);
+    vec4 texel = texelFetch(layers, ivec3(x, y, first_layer + layer), 0);
+    color = mix(color, texel.rgb, texel.a);
+  }
+  return color;
+}
+
+vec3 lighting(vec2 local) {
+  ivec2 tile = ivec2(floor((local + camera) / block_size));
+  tile = clamp(tile, ivec2(0), textureSize(opacity, 0) - 1);
+  vec3 color = texelFetch(opacity, tile, 0).r * ambient;
+  ivec2 offset = tile - light_origin;
+  if (all(lessThanEqual(abs(offset), ivec2(light_radius)))) {
+    color += texelFetch(light, offset + light_radius, 0).r;
+  }
+  return min(color, 1.0);
+}
+
+void main() {
+  vec2 flipped = uv * vec2(1.0, -1.0);
+  vec4 scene = texture(surface, flipped);
+  vec2 local = floor(vec2(uv.x, 1.0 - uv.y) * screen) - viewport.xy;
+  vec3 color = scene.rgb;
+  // terrain and sprites hide the background under most of the screen
+  if (scene.a < 1.0) {
+    color = background(local, first_layers[0], skies[0]);
+    // the same for every pixel of a viewport, so away from borders it is free
+    if (fade > 0.0) {
+      color = mix(color, background(local, first_layers[1], skies[1]), fade);
+    }
+    color = mix(color, scene.rgb, scene.a);
+  }
+  vec4 hud = texture(overlay, flipped);
+  f_color = vec4(mix(color * lighting(local), hud.rgb, hud.a), 1.0);
+}
@@ -1,14 +1,31 @@
+from __future__ import annotations
+
 from array import array
-from typing import Any
+from typing import TYPE_CHECKING, Any, NamedTuple
+from weakref import WeakKeyDictionary
 
 import moderngl as mgl
 import pygame
 from moderngl import TRIANGLE_STRIP, Context, Program
 
-from settings import BASE_DIR, SCREEN_HEIGHT, SCREEN_WIDTH
+from background import Background, background_images
+from settings import BASE_DIR, BLOCK_SIZE, SCREEN_HEIGHT, SCREEN_WIDTH
+
+if TYPE_CHECKING:
+    from lighting import LightMap, RadialLight
+
+# compiled once per context and shared by every shader using the same sources
+_programs: WeakKeyDictionary[Context, dict[str, Program]] = WeakKeyDictionary()
 
 
 def load_program(ctx: Context, name: str):
+    programs = _programs.setdefault(ctx, {})
+    if name not in programs:
+        programs[name] = _compile_program(ctx, name)
+    return programs[name]
+
+
+def _compile_program(ctx: Context, name: str):
     dir = BASE_DIR / "shaders"
     with open(dir / f"{name}.vert") as file:
         vertex_shader = file.read()
@@ -41,21 +58,210 @@ class Shader:
         self.vao.render(mode=mode or TRIANGLE_STRIP)  # type: ignore
 
 
+def screen_quad():
+    upper_left = (-1.0, 1.0, 0.0, 1.0)
+    lower_left = (-1.0, -1.0, 0.0, 0.0)
+    upper_right = (1.0, 1.0, 1.0, 1.0)
+    lower_right = (1.0, -1.0, 1.0, 0.0)
+    return array("f", upper_left + lower_left + upper_right + lower_right)
+
+
 class TextureShader(Shader):
-    def __init__(self, ctx: Context) -> None:
-        upper_left = (-1.0, 1.0, 0.0, 1.0)
-        lower_left = (-1.0, -1.0, 0.0, 0.0)
-        upper_right = (1.0, 1.0, 1.0, 1.0)
-        lower_right = (1.0, -1.0, 1.0, 0.0)
-        data = array("f", upper_left + lower_left + upper_right + lower_right)
-        super().__init__(ctx, "def", data, "2f 2f", ["in_vert", "in_texcoord"])
+    def __init__(self, ctx: Context, name: str = "def") -> None:
+        data = screen_quad()
+        super().__init__(ctx, name, data, "2f 2f", ["in_vert", "in_texcoord"])
         self.prog["surface"] = 0
 
         self.pg_texture = self.ctx.texture((SCREEN_WIDTH, SCREEN_HEIGHT), 4)
         self.pg_texture.filter = (mgl.NEAREST, mgl.NEAREST)  # type: ignore
         self.pg_texture.swizzle = "BGRA"
 
-    def render(self, surface: pygame.surface.Surface):
+    def render(self, surface: pygame.surface.Surface, upload: bool = True):
+        """Draws the surface, reusing the last uploaded texture if it did not change"""
         self.pg_texture.use(location=0)
-        self.pg_texture.write(surface.get_view("1"))
+        if upload:
+            self.pg_texture.write(surface.get_view("1"))
         super().render()
+
+
+class View(NamedTuple):
+    rect: pygame.rect.Rect  # region of the screen
+    offset: float  # horizontal scroll, in pixels
+    background: Background
+    # background of the biome across the nearest border, and how much it shows
+    neighbour: Background | None = None
+    fade: float = 0
+    position: tuple[float, float] = (0, 0)  # top left corner in the world
+    light: RadialLight | None = None
+
+
+class SceneShader(TextureShader):
+    """Composites the scene over the parallax background of each viewport
+
+    The layers of every biome are uploaded once, so drawing them costs the same
+    whatever the resolution, number of viewports and biomes in sight. Lighting
+    is applied here too, from tile opacity that is only uploaded as it changes
+    and daylight that is a single uniform. Below full render scale the scene is
+    lit at a lower resolution and scaled up under the sharp interface.
+    """
+
+    def __init__(self, ctx: Context) -> None:
+        super().__init__(ctx, "scene")
+        self.prog["layers"] = 1
+        self.prog["overlay"] = 2
+        self.prog["opacity"] = 3
+        self.prog["light"] = 4
+        self.prog["screen"] = (SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.prog["block_size"] = BLOCK_SIZE
+        self.prog["ambient"] = (1, 1, 1)
+        self.views: list[View] = []
+        self._first_layers: dict[type[Background], int] = {}
+        self.layers = self._upload_layers()
+
+        # interface drawn over the lit scene, transparent until the first upload
+        empty = bytes(4 * SCREEN_WIDTH * SCREEN_HEIGHT)
+        self.overlay = self.ctx.texture((SCREEN_WIDTH, SCREEN_HEIGHT), 4, empty)
+        self.overlay.swizzle = "BGRA"
+        self.overlay.filter = (mgl.NEAREST, mgl.NEAREST)  # type: ignore
+        # fully lit until the world's lighting is set
+        self.opacity = self._single_channel_texture((1, 1), b"\xff")
+        self._lights: dict[int, tuple[RadialLight, int, mgl.Texture]] = {}
+        # bound instead of the interface while the scene is lit at a lower scale
+        self.no_overlay = self.ctx.texture((1, 1), 4, bytes(4))
+
+        # share of the screen resolution the scene is lit at
+        self.render_scale = 1.0
+        # screen outside every viewport, left alone if None
+        self.clear_color: tuple[float, float, float, float] | None = None
+        self.upscale = Shader(
+            ctx, "upscale", screen_quad(), "2f 2f", ["in_vert", "in_texcoord"]
+        )
+        self.upscale.prog["scene"] = 5
+        self.upscale.prog["overlay"] = 2
+        self._low_resolution: tuple[float, mgl.Framebuffer] | None = None
+
+    def _upload_layers(self):
+        # every biome is uploaded up front, crossing a border never stalls
+        images = []
+        for background_class, layers in background_images.items():
+            self._first_layers[background_class] = len(images)
+            images.extend(layers[index] for index in background_class.displacements)
+        width, height = images[0].get_size()
+        data = b"".join(
+            pygame.image.tobytes(image.convert_alpha(), "RGBA") for image in images
+        )
+        layers = self.ctx.texture_array((width, height, len(images)), 4, data)
+        layers.filter = (mgl.NEAREST, mgl.NEAREST)  # type: ignore
+        return layers
+
+    def _single_channel_texture(self, size: tuple[int, int], data: bytes):
+        texture = self.ctx.texture(size, 1, data)
+        texture.filter = (mgl.NEAREST, mgl.NEAREST)  # type: ignore
+        return texture
+
+    def set_views(self, views: list[View]):
+        self.views = views
+
+    def set_lighting(self, opacity: LightMap, ambient: tuple[float, float, float]):
+        """Uploads the tile opacity if it changed since the last frame"""
+        if self.opacity.size != opacity.size:
+            self.opacity.release()
+            self.opacity = self._single_channel_texture(opacity.size, opacity.data)
+        elif opacity.changed:
+            self.opacity.write(opacity.data)
+        opacity.changed = False
+        self.prog["ambient"] = ambient
+
+    def _use_light(self, index: int, light: RadialLight):
+        # each viewport keeps a small texture of its light, replaced when it moves
+        uploaded = self._lights.get(index)
+        if uploaded is None or uploaded[:2] != (light, light.version):
+            if uploaded is not None:
+                uploaded[2].release()
+            texture = self._single_channel_texture(light.opacity.size, light.data)
+            self._lights[index] = light, light.version, texture
+        self._lights[index][2].use(location=4)
+        self.prog["light_origin"] = light.coords
+        self.prog["light_radius"] = light.length
+
+    def _low_resolution_target(self):
+        # kept until the scale changes, which only happens as the load does
+        if self._low_resolution is None or (
+            self._low_resolution[0] != self.render_scale
+        ):
+            if self._low_resolution is not None:
+                self._low_resolution[1].color_attachments[0].release()
+                self._low_resolution[1].release()
+            size = (
+                max(round(SCREEN_WIDTH * self.render_scale), 1),
+                max(round(SCREEN_HEIGHT * self.render_scale), 1),
+            )
+            texture = self.ctx.texture(size, 4)
+            texture.filter = (mgl.NEAREST, mgl.NEAREST)  # type: ignore
+            framebuffer = self.ctx.framebuffer(color_attachments=[texture])
+            self._low_resolution = self.render_scale, framebuffer
+        return self._low_resolution[1]
+
+    def render(
+        self,
+        surface: pygame.surface.Surface,
+        upload: bool = True,
+        overlay: pygame.surface.Surface | None = None,
+    ):
+        """Draws each viewport in its own pass, clipped to its part of the screen"""
+        if upload and overlay is not None:
+            self.overlay.write(overlay.get_view("1"))
+        if self.render_scale == 1:
+            if self.clear_color is not None:
+                self.ctx.clear(*self.clear_color)
+            self.overlay.use(location=2)
+            self._render_views(surface, upload)
+            return
+
+        # the window, or the framebuffer standing in for it when headless
+        screen = self.ctx.fbo
+        target = self._low_resolution_target()
+        target.use()
+        if self.clear_color is not None:
+            target.clear(*self.clear_color)
+        # the interface is put on at full resolution when scaling up
+        self.no_overlay.use(location=2)
+        self._render_views(surface, upload, self.render_scale)
+        screen.use()
+        target.color_attachments[0].use(location=5)
+        self.overlay.use(location=2)
+        self.upscale.render()
+
+    def _render_views(
+        self, surface: pygame.surface.Surface, upload: bool, scale: float = 1
+    ):
+        self.layers.use(location=1)
+        self.opacity.use(location=3)
+        for index, view in enumerate(self.views):
+            background = view.background
+            neighbour = view.neighbour or background
+            self.prog["viewport"] = tuple(view.rect)
+            self.prog["offset"] = view.offset % SCREEN_WIDTH
+            self.prog["displacements"] = tuple(background.displacements.values())
+            self.prog["first_layers"] = (
+                self._first_layers[type(background)],
+                self._first_layers[type(neighbour)],
+            )
+            self.prog["skies"] = [
+                background.color.normalized[:3],
+                neighbour.color.normalized[:3],
+            ]
+            self.prog["fade"] = view.fade if view.neighbour else 0
+            self.prog["camera"] = tuple(view.position)
+            if view.light is not None:
+                self._use_light(index, view.light)
+            else:
+                self.prog["light_radius"] = -1
+            # the framebuffer counts rows from the bottom of the screen
+            left, top = round(view.rect.left * scale), round(view.rect.top * scale)
+            right = round(view.rect.right * scale)
+            bottom = round(view.rect.bottom * scale)
+            height = round(SCREEN_HEIGHT * scale)
+            self.ctx.scissor = (left, height - bottom, right - left, bottom - top)
+            super().render(surface, upload and index == 0)
+        self.ctx.scissor = None
@@ -0,0 +1,16 @@
+#version 330
+// Scales the scene lit at a lower resolution up to the screen and puts the
+// interface, which pygame draws at full resolution, on top.
+
+// Lit scene, rendered with rows from the bottom, on texture channel 5
+uniform sampler2D scene;
+// Interface drawn by pygame, on texture channel 2
+uniform sampler2D overlay;
+
+out vec4 f_color;
+in vec2 uv;
+
+void main() {
+  vec4 hud = texture(overlay, uv * vec2(1.0, -1.0));
+  f_color = vec4(mix(texture(scene, uv).rgb, hud.rgb, hud.a), 1.0);
+}
@@ -4,6 +4,7 @@ import pygame
 
 from colors import Color
 from commons import Damageable
+from events import BulletShatter, EventBus
 from particle.emitters import Emitter, Manager
 from protocols import HasRect
 from settings import BLOCK_SIZE
@@ -33,6 +34,7 @@ class BaseBullet(pygame.sprite.Sprite):
         self.blocks: Container2d[HasRect] | None = None
         self.characters = pygame.sprite.Group()
         self.particle_manager: Manager | None = None
+        self.event_bus: EventBus | None = None
         self.setup()
 
     def setup(self):
@@ -80,27 +82,30 @@ class BaseBullet(pygame.sprite.Sprite):
         super().kill()
         if shatter:
             Emitter(self.position, 0.3, 50, self.particle_manager)
+            if self.event_bus is not None:
+                self.event_bus.post(BulletShatter, position=tuple(self.position))
 
     def add_world_context(
         self,
         blocks: Container2d[HasRect],
         characters: pygame.sprite.Group,
         particle_manager: Manager,
+        event_bus: EventBus | None = None,
     ):
         self.blocks = blocks
         self.particle_manager = particle_manager
         self.characters = characters
+        self.event_bus = event_bus
 
 
 class Bullet(BaseBullet):
     ...
 
 
-bullet_images: dict[type[BaseBullet], pygame.surface.Surface] = {
-    Bullet: pygame.surface.Surface((3, 3)),
-}
+bullet_images: dict[type[BaseBullet], pygame.surface.Surface] = {}
 
 
-def load_bullet_images():
-    img = bullet_images[Bullet]
+def draw_bullet_images() -> dict[type[BaseBullet], pygame.surface.Surface]:
+    img = pygame.surface.Surface((3, 3))
     pygame.draw.rect(img, Color.BULLET, img.get_rect(), 2)
+    return {Bullet: img}
@@ -1,13 +1,14 @@
 from collections.abc import Callable, Collection
+from functools import cache, lru_cache
 
 import numpy
 import pygame
-import scipy
 from numpy.typing import ArrayLike
 
 SAMPLE_RATE = 44100
 
-pygame.mixer.init(SAMPLE_RATE, -16, 2, 512)
+# applies to the mixer started by pygame.init or mixer_ready
+pygame.mixer.pre_init(SAMPLE_RATE, -16, 2, 512)
 
 SAMPLE_LENGTH = 4096
 
@@ -15,7 +16,24 @@ REFERENCE_PITCH = 440
 REFERENCE_OCTAVE = 4
 NOTES = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
 
+# samples in one period of each wavetable
+TABLE_SIZE = 2048
+SOUND_CACHE_SIZE = 128
 
+Waveform = Callable[[float, int], ArrayLike]
+
+
+def mixer_ready() -> bool:
+    """Starts the mixer on first use, False when there is no audio device"""
+    if not pygame.mixer.get_init():
+        try:
+            pygame.mixer.init()
+        except pygame.error:
+            return False
+    return True
+
+
+@cache
 def notation_to_frequency(notation: str) -> float:
     note, octave = notation_to_note_octave(notation)
 
@@ -41,25 +59,108 @@ def notation_to_note_octave(note: str) -> tuple[str, int]:
     return note, octave
 
 
-def frequencies_to_sound(
-    frequencies: Collection[float], waveform: Callable[[float, int], ArrayLike]
-) -> pygame.mixer.Sound:
-    arr = sum(waveform(f, SAMPLE_LENGTH) for f in frequencies)  # type: ignore
-    arr = numpy.c_[arr, arr]
-    return pygame.sndarray.make_sound(arr)
+_TABLE_PHASES = numpy.arange(TABLE_SIZE) / TABLE_SIZE
+WAVETABLES = {
+    "sine": numpy.sin(2 * numpy.pi * _TABLE_PHASES).astype(numpy.float32),
+    "square": numpy.where(_TABLE_PHASES < 0.5, 1, -1).astype(numpy.float32),
+    "triangle": (1 - 4 * numpy.abs(_TABLE_PHASES - 0.5)).astype(numpy.float32),
+}
+
+
+def render_wave(
+    table: numpy.ndarray,
+    frequency: float | numpy.ndarray,
+    length: int,
+    peak: float,
+    phase: float = 0,
+) -> numpy.ndarray:
+    """Looks the wave up in a one period table, frequency may change per sample"""
+    steps = numpy.broadcast_to(
+        numpy.asarray(frequency, dtype=numpy.float64) * (TABLE_SIZE / SAMPLE_RATE),
+        (length,),
+    )
+    phases = phase + numpy.cumsum(steps) - steps
+    indices = phases.astype(numpy.int64) % TABLE_SIZE
+    return peak * table[indices]
+
+
+def _one_second(table: numpy.ndarray, frequency: float, peak: int):
+    return render_wave(table, frequency, SAMPLE_RATE, peak).astype(numpy.int16)
 
 
 def sine_wave(frequency: float, peak: int):
-    length = SAMPLE_RATE / frequency
-    arr = numpy.arange(int(length)) * (2 * numpy.pi / length)
-    wave = peak * numpy.sin(arr)
-    return numpy.resize(wave, (SAMPLE_RATE,)).astype(numpy.int16)
+    return _one_second(WAVETABLES["sine"], frequency, peak)
 
 
 def square_wave(frequency: float, peak: int):
-    arr = numpy.linspace(0, 1, int(500 * 440 / frequency), endpoint=False)
-    wave = peak * scipy.signal.square(2 * numpy.pi * 5 * arr)
-    return numpy.resize(wave, (SAMPLE_RATE,)).astype(numpy.int16)
+    return _one_second(WAVETABLES["square"], frequency, peak)
+
+
+def triangle_wave(frequency: float, peak: int):
+    return _one_second(WAVETABLES["triangle"], frequency, peak)
+
+
+WAVEFORMS: dict[str, Waveform] = {
+    "sine": sine_wave,
+    "square": square_wave,
+    "triangle": triangle_wave,
+}
+
+_WAVEFORM_TABLES: dict[Waveform, numpy.ndarray] = {
+    sine_wave: WAVETABLES["sine"],
+    square_wave: WAVETABLES["square"],
+    triangle_wave: WAVETABLES["triangle"],
+}
+
+
+def _to_sound(wave: numpy.ndarray) -> pygame.mixer.Sound:
+    wave = numpy.clip(wave, -32768, 32767).astype(numpy.int16)
+    return pygame.sndarray.make_sound(numpy.c_[wave, wave])
+
+
+def frequencies_to_sound(
+    frequencies: Collection[float], waveform: Waveform, duration: float = 1
+) -> pygame.mixer.Sound:
+    return _cached_sound(tuple(frequencies), waveform, duration)
+
+
+@lru_cache(maxsize=SOUND_CACHE_SIZE)
+def _cached_sound(
+    frequencies: tuple[float, ...], waveform: Waveform, duration: float
+) -> pygame.mixer.Sound:
+    length = int(SAMPLE_RATE * duration)
+    table = _WAVEFORM_TABLES.get(waveform)
+    wave = numpy.zeros(length)  # no frequencies make a rest
+    for frequency in frequencies:
+        if table is None:
+            # custom waveforms render a second at a time
+            wave += numpy.resize(waveform(frequency, SAMPLE_LENGTH), (length,))
+        else:
+            wave += render_wave(table, frequency, length, SAMPLE_LENGTH)
+    return _to_sound(wave)
+
+
+@lru_cache(maxsize=SOUND_CACHE_SIZE)
+def sweep_sound(
+    start: float,
+    end: float,
+    duration: float,
+    waveform: Waveform = square_wave,
+    peak: int = SAMPLE_LENGTH,
+) -> pygame.mixer.Sound:
+    """Sound effect gliding from one frequency to another while fading out"""
+    length = int(SAMPLE_RATE * duration)
+    frequency = numpy.geomspace(start, end, length)
+    wave = render_wave(_WAVEFORM_TABLES[waveform], frequency, length, peak)
+    return _to_sound(wave * numpy.linspace(1, 0, length))
+
+
+@lru_cache(maxsize=SOUND_CACHE_SIZE)
+def noise_sound(duration: float, seed: int = 0, peak: int = SAMPLE_LENGTH):
+    """Decaying noise burst, the same for a given seed"""
+    length = int(SAMPLE_RATE * duration)
+    noise = numpy.random.default_rng(seed).uniform(-1, 1, length)
+    return _to_sound(peak * noise * numpy.linspace(1, 0, length) ** 2)
 
 
 class Note:
@@ -85,17 +186,19 @@ class Sample:
         self,
         frequencies: Collection[float],
         waveform: Callable[[float, int], ArrayLike] = square_wave,
-        duration: float = 1,
+        duration: float = 1,  # in beats
     ) -> None:
-        self.sound = frequencies_to_sound(frequencies, waveform)
+        self.frequencies = tuple(frequencies)
+        self.waveform = waveform
         self.duration = duration
 
+    @property
+    def sound(self):
+        """A second of the sample, meant to be looped"""
+        return frequencies_to_sound(self.frequencies, self.waveform)
 
-def play_samples(samples: Collection[Sample]):
-    millis = 300
-    pygame.time.delay(80)
-    for sample in samples:
-        sample.sound.play(-1)
-        pygame.time.delay(int(sample.duration * millis))
-        sample.sound.fadeout(50)
-        pygame.time.delay(80)
+    def render(self, beat: float):
+        """The sample lasting exactly its duration"""
+        return frequencies_to_sound(
+            self.frequencies, self.waveform, self.duration * beat
+        )
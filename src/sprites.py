@@ -1,9 +1,15 @@
 from abc import ABC, abstractmethod
+from itertools import product
 
 import pygame
 
+from utils.coords import Coords
+
 
 class GravitySprite(ABC, pygame.sprite.Sprite):
+    # seconds at rest before the sprite can be put to sleep
+    sleep_delay: float = 0.5
+
     def __init__(
         self, gravity: int, terminal_velocity: int, *groups: pygame.sprite.Group
     ) -> None:
@@ -15,12 +21,15 @@ class GravitySprite(ABC, pygame.sprite.Sprite):
         self.velocity = pygame.math.Vector2()
         self.acceleration = pygame.math.Vector2(0, gravity)
         self.terminal_velocity = terminal_velocity
+        self.grounded = False
+        self.rest_time = 0.0
 
     def update(self, dt: float) -> None:
         self.fall(dt)
 
     def fall(self, dt: float):
-        if self.should_fall():
+        self.grounded = not self.should_fall()
+        if not self.grounded:
             self.velocity.y += self.acceleration.y * dt
             if abs(self.velocity.y) > self.terminal_velocity:
                 self.velocity.y = self.terminal_velocity * (
@@ -30,3 +39,54 @@ class GravitySprite(ABC, pygame.sprite.Sprite):
     @abstractmethod
     def should_fall(self) -> bool:
         ...
+
+    def is_resting(self) -> bool:
+        return self.grounded and not self.velocity
+
+    def update_rest_time(self, dt: float):
+        if self.is_resting():
+            self.rest_time += dt
+        else:
+            self.rest_time = 0
+
+    @property
+    def is_asleep(self):
+        return self.rest_time >= self.sleep_delay
+
+    def wake(self):
+        self.rest_time = 0
+
+
+class SleepingSprites:
+    """Sprites at rest, indexed by the coords of the block supporting them"""
+
+    def __init__(self) -> None:
+        self._sprites: dict[Coords, list[GravitySprite]] = {}
+
+    def __len__(self):
+        return sum(len(sprites) for sprites in self._sprites.values())
+
+    def add(self, coords: Coords, sprite: GravitySprite):
+        self._sprites.setdefault(coords, []).append(sprite)
+
+    def get(self, coords: Coords) -> list[GravitySprite]:
+        return self._sprites.get(coords, [])
+
+    def wake(self, coords: Coords) -> list[GravitySprite]:
+        sprites = self._sprites.pop(coords, [])
+        for sprite in sprites:
+            sprite.wake()
+        return sprites
+
+    def wake_around(self, coords: Coords, radius: int) -> list[GravitySprite]:
+        x, y = coords
+        sprites = []
+        for _coords in product(
+            range(x - radius, x + radius + 1), range(y - radius, y + radius + 1)
+        ):
+            if _coords in self._sprites:
+                sprites.extend(self.wake(_coords))
+        return sprites
+
+    def empty(self):
+        self._sprites.clear()
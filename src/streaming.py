@@ -0,0 +1,90 @@
+import heapq
+import math
+from typing import Iterable, Iterator
+
+import pygame
+
+from lighting import ShadowCaster
+from settings import BLOCK_SIZE
+
+CHUNK_WIDTH = 16  # in blocks
+
+
+class ChunkStreamer:
+    """Lights world chunks in the order the camera is expected to reach them"""
+
+    # how far ahead (in seconds) the camera movement is extrapolated
+    LOOKAHEAD = 1.5
+
+    def __init__(self, shadow_caster: ShadowCaster) -> None:
+        self._shadow_caster = shadow_caster
+        self._width, _ = shadow_caster.opacity.shape
+        self._pending = set(range(math.ceil(self._width / CHUNK_WIDTH)))
+        self._queue: list[tuple[int, int]] = []
+        self._prediction: tuple[int, int] | None = None
+
+    @property
+    def pending(self):
+        return frozenset(self._pending)
+
+    def columns(self, chunk: int):
+        return range(chunk * CHUNK_WIDTH, min((chunk + 1) * CHUNK_WIDTH, self._width))
+
+    def chunks_in(self, view: pygame.rect.Rect):
+        first = max(view.left // BLOCK_SIZE // CHUNK_WIDTH, 0)
+        last = view.right // BLOCK_SIZE // CHUNK_WIDTH
+        return [chunk for chunk in range(first, last + 1) if chunk in self._pending]
+
+    def prioritize(self, view: pygame.rect.Rect, velocity: pygame.math.Vector2):
+        left = view.left // BLOCK_SIZE
+        right = view.right // BLOCK_SIZE
+        shift = int(velocity.x * self.LOOKAHEAD)
+        swept = (min(left, left + shift), max(right, right + shift))
+
+        # rebuilding the queue is only needed when the prediction changes
+        prediction = (swept[0] // CHUNK_WIDTH, swept[1] // CHUNK_WIDTH)
+        if prediction == self._prediction:
+            return
+        self._prediction = prediction
+
+        self._queue = [
+            (self._distance(chunk, swept, view.centerx // BLOCK_SIZE), chunk)
+            for chunk in self._pending
+        ]
+        heapq.heapify(self._queue)
+
+    def _distance(self, chunk: int, swept: tuple[int, int], center: int):
+        columns = self.columns(chunk)
+        first, last = columns.start, columns.stop - 1
+        gap = max(swept[0] - last, first - swept[1], 0)
+        # chunks along the predicted path come first, closest to the camera first
+        return gap * self._width + abs((first + last) // 2 - center)
+
+    def light(self, chunks: Iterable[int]) -> Iterator[float]:
+        chunks = [chunk for chunk in chunks if chunk in self._pending]
+        for index, chunk in enumerate(chunks):
+            for progress in self._light_chunk(chunk):
+                yield (index + progress) / len(chunks)
+
+    def stream(self) -> Iterator[float]:
+        total = len(self._pending)
+        while self._pending:
+            if not self._queue:
+                self._queue = [(0, chunk) for chunk in sorted(self._pending)]
+            _, chunk = heapq.heappop(self._queue)
+            if chunk not in self._pending:
+                continue
+            for progress in self._light_chunk(chunk):
+                yield (total - len(self._pending) - 1 + progress) / total
+
+        # shadows of neighboring chunks may overlap, so they are settled at once
+        self._shadow_caster.generate_opacity_for_entrances()
+
+    def _light_chunk(self, chunk: int):
+        self._pending.discard(chunk)
+        columns = self.columns(chunk)
+        yield from self._shadow_caster.light_columns(columns)
+        # entrances of the last column may be found at the next one
+        self._shadow_caster.generate_opacity_for_entrances(
+            range(columns.start, columns.stop + 1)
+        )
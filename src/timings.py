@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# seconds spent in each step of the way to the first screen
+startup_times: dict[str, float] = {}
+
+
+@contextmanager
+def timed(step: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_times[step] = startup_times.get(step, 0) + time.perf_counter() - start
+
+
+def import_times(module: str) -> Counter[str]:
+    """Seconds spent importing each top level package, measured in a fresh process"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        # the child finds modules where this process does
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+    times: Counter[str] = Counter()
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or line.endswith("imported package"):
+            continue
+        self_time, _, name = line.removeprefix("import time:").split("|")
+        times[name.strip().split(".")[0]] += int(self_time) / 1e6
+    return times
@@ -1,7 +1,55 @@
-from typing import Any
+from itertools import product
+from typing import Any, Iterator
 
 import pygame
 
+from settings import BLOCK_SIZE
+from utils.coords import Coords
+
 
 def custom_collision_detection(sprite_left: Any, sprite_right: Any):
     return pygame.sprite.collide_mask(sprite_left, sprite_right) is not None
+
+
+def overlapping_tiles(rect: pygame.rect.Rect) -> Iterator[Coords]:
+    yield from product(
+        range(rect.left // BLOCK_SIZE, (rect.right - 1) // BLOCK_SIZE + 1),
+        range(rect.top // BLOCK_SIZE, (rect.bottom - 1) // BLOCK_SIZE + 1),
+    )
+
+
+def circle_rect_contact(
+    center: pygame.math.Vector2, radius: float, rect: pygame.rect.Rect
+) -> pygame.math.Vector2 | None:
+    """Vector from center to the closest point of rect, if it's inside the circle"""
+    closest = pygame.math.Vector2(
+        pygame.math.clamp(center.x, rect.left, rect.right),
+        pygame.math.clamp(center.y, rect.top, rect.bottom),
+    )
+    contact = closest - center
+    if contact.length_squared() >= radius**2:
+        return None
+    return contact
+
+
+def overlap_centroid(
+    rect: pygame.rect.Rect, other: pygame.rect.Rect
+) -> tuple[pygame.math.Vector2, int]:
+    overlap = rect.clip(other)
+    centroid = pygame.math.Vector2(
+        overlap.x + overlap.width / 2, overlap.y + overlap.height / 2
+    )
+    return centroid, overlap.width * overlap.height
+
+
+def circle_circle_contact(
+    center: pygame.math.Vector2,
+    radius: float,
+    other_center: pygame.math.Vector2,
+    other_radius: float,
+) -> pygame.math.Vector2 | None:
+    """Vector between centers, if circles overlap"""
+    contact = other_center - center
+    if contact.length_squared() >= (radius + other_radius) ** 2:
+        return None
+    return contact
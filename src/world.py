@@ -1,23 +1,32 @@
 from __future__ import annotations
 
-from collections.abc import Callable
+import random
+import time
+from collections.abc import Iterator
+from uuid import UUID
 
 import pygame
-import pygame.freetype
 from moderngl import Context
 
-from background import Background, Mountains
+from biome import Biome, BiomeMap
 from blocks import BaseBlock, BaseCollectible, Rock, Spike, Tree, make_block
 from characters import BaseCharacter, Player
 from colors import InterfaceColor
 from commons import Loadable, Storable
 from day_cycle import convert_to_time, get_day_part
 from draw import BorderOptions, FillBorderColors, draw_bordered_rect
+from events import BlockBroken, DestroyBlock, EventBus, PlaceBlock, Shoot
+from fonts import get_font, render_text
+from horde import Horde
 from lighting import ShadowCaster
 from particle.emitters import Manager
-from settings import BLOCK_SIZE, DAY_DURATION, MENU_FONT, WORLD_SIZE
+from pathfinding import FlowField, NavigationGrid
+from scheduling import LodScheduler
+from settings import BLOCK_SIZE, DAY_DURATION, HORDE_SIZE, MENU_FONT, WORLD_SIZE
 from shaders.shader import TextureShader
 from shooting import BaseBullet
+from sprites import SleepingSprites
+from streaming import ChunkStreamer
 from utils.container import Container2d
 from utils.coords import Coords
 
@@ -25,74 +34,110 @@ from utils.coords import Coords
 class Loader:
     LOADED = pygame.event.custom_type()
 
-    def __init__(self, ctx: Context, world: World, shadow_caster: ShadowCaster) -> None:
+    # seconds of work per frame, while showing progress and while playing
+    FRAME_BUDGET = 1 / 60
+    BACKGROUND_FRAME_BUDGET = 1 / 250
+
+    # extra columns lit on each side of the screen before the game starts
+    SPAWN_MARGIN = 8
+
+    def __init__(
+        self,
+        ctx: Context,
+        world: World,
+        shadow_caster: ShadowCaster,
+        spawn: pygame.math.Vector2,
+        deterministic: bool = False,
+    ) -> None:
         self.world = world
-        self._font = pygame.freetype.Font(MENU_FONT, 50)
-        self._font.antialiased = False
-        self._font.pad = True
+        # loading takes the same number of frames regardless of machine speed
+        self.deterministic = deterministic
+        self._font = get_font(MENU_FONT, 50, antialiased=False, pad=True)
         self.display = pygame.surface.Surface(pygame.display.get_surface().get_size())
 
-        self._step_progress = 0
+        screen_rect = pygame.display.get_surface().get_rect()
+        self._spawn_view = screen_rect.inflate(2 * self.SPAWN_MARGIN * BLOCK_SIZE, 0)
+        self._spawn_view.center = (int(spawn.x), int(spawn.y))
+        self._step_index = 0
+        self._step_progress = 0.0
         self._steps = [
-            ("Indexing surface outer layer", self._step_1),
-            ("Scanning for light entrances", self._step_2),
-            ("Generating opacity info", self._step_3),
+            "Indexing surface outer layer",
+            "Lighting surroundings",
         ]
         self.shadow_caster = shadow_caster
+        self.streamer = ChunkStreamer(shadow_caster)
         self.world.set_shadow_caster(shadow_caster)
         self.shader = TextureShader(ctx)
 
+        self._pipeline: Iterator[tuple[int, float]] | None = None
+        self.finished = False
+
     def load(self):
-        self.shadow_caster.setup()
-        self._draw_static()
-        self._load_world()
-        self._finish()
+        if self._pipeline is None:
+            self._pipeline = self._load_world()
+
+        if self.deterministic:
+            self._advance_to(len(self._steps))
+        else:
+            self._advance(self.FRAME_BUDGET)
+        if self._step_index < len(self._steps):
+            self._draw_static()
+            self._update_progress_and_message(
+                self._step_progress, self._step_index, self._steps[self._step_index]
+            )
+        self.shader.render(self.display)
+
+    def stream(self, view: pygame.rect.Rect, velocity: pygame.math.Vector2):
+        if self._pipeline is None or self.finished:
+            return
+        self.streamer.prioritize(view, velocity)
+        self._advance(self.BACKGROUND_FRAME_BUDGET)
+
+    def _advance(self, budget: float):
+        if self._pipeline is None:
+            return
+
+        deadline = time.perf_counter() + budget
+        for self._step_index, self._step_progress in self._pipeline:
+            if time.perf_counter() >= deadline:
+                return
+        self.finished = True
+
+    def _advance_to(self, step_index: int):
+        if self._pipeline is None:
+            return
+
+        for self._step_index, self._step_progress in self._pipeline:
+            if self._step_index >= step_index:
+                return
+        self.finished = True
 
     def _draw_static(self):
         self.display.fill(InterfaceColor.MENU_BACKGROUND)
-        # pygame.display.flip()
-
-    def _load_world(self):
-        for _, step in enumerate(self._steps):
-            _, step = step
-            self._step_progress = 0
-            step()
 
-    def _step_1(self):
-        self.shadow_caster._detect_outer_layer(
-            lambda x: self._update_progress_and_message(x, 0, self._steps[0][0])
-        )
+    def _load_world(self) -> Iterator[tuple[int, float]]:
+        for progress in self.shadow_caster.detect_outer_layer():
+            yield 0, progress
 
-    def _step_2(self):
-        self.shadow_caster._generate_light_entrances_info(
-            lambda x: self._update_progress_and_message(x, 1, self._steps[1][0])
-        )
+        for progress in self.streamer.light(self.streamer.chunks_in(self._spawn_view)):
+            yield 1, progress
+        self._finish()
 
-    def _step_3(self):
-        self.shadow_caster._generate_opacity_info(
-            lambda x: self._update_progress_and_message(x, 2, self._steps[2][0])
-        )
+        # the rest of the world is lit in the background while playing
+        for progress in self.streamer.stream():
+            yield 2, progress
 
     def _update_progress_and_message(
         self, step_progress: float, step_index: int, message: str
     ):
         progress_per_step = 1 / len(self._steps)
         progress = step_progress * progress_per_step + (step_index * progress_per_step)
-        self._font.render_to(
-            self.display,
-            (0, 0),
-            message,
-            InterfaceColor.PRIMARY_FONT,
-            InterfaceColor.MENU_BACKGROUND,
-        )
-
-        text = f"Progress: {progress:.0%}"
-        self._font.render_to(
-            self.display,
-            (0, 50),
-            text,
-            InterfaceColor.PRIMARY_FONT,
-            InterfaceColor.MENU_BACKGROUND,
+        self.display.blits(
+            (
+                (self._render_text(message), (0, 0)),
+                (self._render_text(f"Progress: {progress:.0%}"), (0, 50)),
+            ),
+            doreturn=False,
         )
         progress_bar_rect = pygame.rect.Rect((0, 120), (1000, 20))
         progress_bar_fill_rect = pygame.rect.Rect(
@@ -110,7 +155,14 @@ class Loader:
             FillBorderColors(InterfaceColor.HEALTH_POINTS, InterfaceColor.BORDER),
             BorderOptions(1, 0),
         )
-        self.shader.render(self.display)
+
+    def _render_text(self, text: str):
+        return render_text(
+            self._font,
+            text,
+            InterfaceColor.PRIMARY_FONT,
+            InterfaceColor.MENU_BACKGROUND,
+        )
 
     def _finish(self):
         event = pygame.event.Event(self.LOADED)
@@ -119,6 +171,9 @@ class Loader:
 
 class World(Storable, Loadable):
     DAY_DURATION = DAY_DURATION
+    # split screen players saved along with the world, the first one leading
+    player_ids: tuple[UUID, ...] = ()
+    FLOW_FIELD_RADIUS = 64  # in block size units, beyond the horde demotion radius
 
     def __init__(
         self,
@@ -134,29 +189,36 @@ class World(Storable, Loadable):
         self.age = 0  # in seconds
         self.time_of_day = 0  # cycling counter
         self.player: Player | None = None
-        self.event_handlers: dict[int, Callable[[pygame.event.Event, float], None]] = {
-            Player.DESTROY_BLOCK: self._handle_block_destruction,
-            Player.PLACE_BLOCK: self._handle_block_placement,
-            Player.SHOOT: self._handle_shooting,
-        }
-        self._background: Background | None = None
         self.particle_manager = Manager()
         self._global_light = ...
         self.shadow_caster: ShadowCaster
+        # one biome per column, generated once and stored with the world
+        self.biomes = BiomeMap.generate(int(self.size.x))
         self.setup()
 
     def set_player(self, player: Player):
         self.player = player
-        self.players.add(player)
+        self.add_player(player)
         # Emitter(self.player.position, None, 5, self.particle_manager)
 
+    def add_player(self, player: Player):
+        """Joins a split screen player, the horde keeps chasing the first one"""
+        player.event_bus = self.event_bus
+        self.players.add(player)
+
     def set_shadow_caster(self, shadow_caster: ShadowCaster):
         self.shadow_caster = shadow_caster
 
+    def set_focus(self, *rects: pygame.rect.Rect):
+        self.scheduler.set_focus(*rects)
+
     def setup(self):
         self.blocks: Container2d[BaseBlock] = Container2d(WORLD_SIZE)
         self.changing_blocks = pygame.sprite.Group()
         self.collectibles = pygame.sprite.Group()
+        self.active_collectibles = pygame.sprite.Group()
+        self.sleeping_collectibles = SleepingSprites()
+        self._pull_coords: dict[Player, Coords] = {}
         self.collision_buffer = pygame.sprite.Group()
         self.characters_buffer: pygame.sprite.Group[
             BaseCharacter  # type: ignore
@@ -165,14 +227,36 @@ class World(Storable, Loadable):
             BaseBullet  # type: ignore
         ] = pygame.sprite.Group()
         self.players = pygame.sprite.Group()
-        self._background = Mountains()
+        self.navigation = NavigationGrid(self.blocks)
+        self.flow_field = FlowField(self.navigation, self.FLOW_FIELD_RADIUS)
+        self.scheduler = LodScheduler()
+        self.event_bus = EventBus()
+        self.event_bus.subscribe(DestroyBlock, self._handle_block_destruction)
+        self.event_bus.subscribe(PlaceBlock, self._handle_block_placement)
+        self.event_bus.subscribe(Shoot, self._handle_shooting)
+        self.horde = Horde(
+            HORDE_SIZE,
+            int(self.gravity.y),
+            self.terminal_velocity,
+            self.blocks,
+            self.characters_buffer,
+            self.players,
+            self.flow_field,
+        )
         populate_world(self)
 
     def unload(self):
         self.blocks.empty()
         self.changing_blocks.empty()
         self.collectibles.empty()
+        self.active_collectibles.empty()
+        self.sleeping_collectibles.empty()
+        self._pull_coords.clear()
         self.collision_buffer.empty()
+        self.horde.unload()
+        self.navigation.clear()
+        self.scheduler.clear()
+        self.event_bus.clear()
         self.characters_buffer.empty()
         self.players.empty()
         self.bullets.empty()
@@ -196,18 +280,54 @@ class World(Storable, Loadable):
             raise self.UnloadedObject
 
         self.players.update(dt)
-        self.characters_buffer.update(dt)
-
-        self.player.pull_collectibles(self.collectibles)
-        self.collectibles.update(dt)
+        self.flow_field.update(self.player.position)
+        self.horde.update(dt, self.player.position, self.shadow_caster.outer_layer)
+        self.scheduler.update(self.characters_buffer, dt)
+
+        for player in self.players.sprites():
+            self._wake_pulled_collectibles(player)
+            player.pull_collectibles(self.active_collectibles)
+        self.active_collectibles.update(dt)
+        self._put_collectibles_to_sleep()
         self.bullets.update(dt)
 
+    def _wake_pulled_collectibles(self, player: Player):
+        coords = (player.rect.centerx // BLOCK_SIZE, player.rect.centery // BLOCK_SIZE)
+        if coords == self._pull_coords.get(player):
+            return
+        self._pull_coords[player] = coords
+        self.active_collectibles.add(
+            self.sleeping_collectibles.wake_around(
+                coords, player.collectible_pull_radius + 1
+            )
+        )
+
+    def _put_collectibles_to_sleep(self):
+        for collectible in self.active_collectibles.sprites():
+            collectible: BaseCollectible
+            if not collectible.is_asleep:
+                continue
+
+            coords = collectible.support_coords
+            stack = next(
+                (
+                    sleeping
+                    for sleeping in self.sleeping_collectibles.get(coords)
+                    if sleeping.can_merge(collectible)  # type: ignore
+                ),
+                None,
+            )
+            if stack is not None:
+                stack.merge(collectible)  # type: ignore
+            else:
+                self.active_collectibles.remove(collectible)
+                self.sleeping_collectibles.add(coords, collectible)
+
+    def wake_collectibles(self, coords: Coords):
+        self.active_collectibles.add(self.sleeping_collectibles.wake(coords))
+
     def _handle_events(self, dt: float):
-        for event in pygame.event.get(list(self.event_handlers.keys())):
-            try:
-                self.event_handlers[event.type](event, dt)
-            except KeyError as err:
-                raise NotImplementedError("Missing event handler") from err
+        self.event_bus.dispatch(dt)
 
     @property
     def relative_time(self):
@@ -221,16 +341,10 @@ class World(Storable, Loadable):
     def day_part(self):
         return get_day_part(self.time)
 
-    @property
-    def background(self):
-        if self._background is None:
-            raise self.UnloadedObject
-        return self._background
-
     def get_block(self, coords: Coords):
         return self.blocks.get_element(coords)
 
-    def _handle_block_destruction(self, event: pygame.event.Event, dt: float):
+    def _handle_block_destruction(self, event: DestroyBlock, dt: float):
         if self.player is None:
             raise self.UnloadedObject
 
@@ -242,41 +356,75 @@ class World(Storable, Loadable):
         if block.integrity <= 0:
             self.blocks.set_element(coords, None)
             self.shadow_caster.update_region(coords, False)
+            self.navigation.invalidate(coords)
+            self.wake_collectibles(coords)
+            self.event_bus.post(BlockBroken, coords=coords)
 
             for collectible_class, count in block.collectibles.items():
                 collectible_class: type[BaseCollectible]
-                for _ in range(count):
-                    collectible = collectible_class(
-                        coords,
-                        gravity=int(self.gravity.y),
-                        terminal_velocity=self.terminal_velocity,
-                        blocks=self.blocks,
-                    )
-                    self.collectibles.add(collectible)
-
-    def _handle_block_placement(self, event: pygame.event.Event, _: float):
-        if self.player is None:
-            raise self.UnloadedObject
+                collectible = collectible_class(
+                    coords,
+                    gravity=int(self.gravity.y),
+                    terminal_velocity=self.terminal_velocity,
+                    blocks=self.blocks,
+                    count=count,
+                )
+                self.collectibles.add(collectible)
+                self.active_collectibles.add(collectible)
+
+    def _handle_block_placement(self, event: PlaceBlock, _: float):
         if not isinstance(event.block, BaseBlock):
             return
-        coords = self.player.get_cursor_coords()
+        coords = event.coords
         self.blocks.set_element(coords, event.block)
         self.shadow_caster.update_region(coords, True)
+        self.navigation.invalidate(coords)
 
-    def _handle_shooting(self, event: pygame.event.Event, _: float):
-        bullet: BaseBullet = event.bullet
+    def _handle_shooting(self, event: Shoot, _: float):
+        bullet = event.bullet
+        if bullet is None:
+            return
         bullet.add_world_context(
-            self.blocks, self.characters_buffer, self.particle_manager  # type: ignore
+            self.blocks,
+            self.characters_buffer,  # type: ignore
+            self.particle_manager,
+            self.event_bus,
         )
         self.bullets.add(bullet)
 
 
+# columns between the trees growing on the surface, dunes stay bare
+TREE_SPACING = {Biome.HILLS: (4, 10), Biome.MOUNTAINS: (15, 40)}
+# columns around the center kept as they are built below
+BUILT_AREA = 50
+
+
+def plant_trees(world: World):
+    """Spaces trees along the surface as the biome of each column wants"""
+    # seeded by the biome map, leaving the global random sequence untouched
+    rng = random.Random(bytes(world.biomes.biomes))
+    center = int(world.size.x) // 2
+    y = int(world.size.y) // 2
+    x = 0
+    while x < world.size.x:
+        spacing = TREE_SPACING.get(world.biomes.get_biome(x * BLOCK_SIZE))
+        if spacing is None:
+            x += 1
+            continue
+        if abs(x - center) > BUILT_AREA:
+            block = make_block(Tree, (x, y))
+            world.blocks.set_element((x, y), block)
+            world.changing_blocks.add(block)
+        x += rng.randint(*spacing)
+
+
 def populate_world(world: World):
     for y in range(int(world.size.y)):
         for x in range(int(world.size.x)):
             if y > (world.size.y / 2):
                 block = make_block(Rock, (x, y))
                 world.blocks.set_element((x, y), block)
+    plant_trees(world)
     x, y = WORLD_SIZE
     x, y = x // 2, y // 2
 
@@ -0,0 +1,19 @@
+from itertools import combinations
+
+import pytest
+
+from assets import pack
+
+
+@pytest.mark.parametrize("width", [16, 64, 256])
+def test_packed_rectangles_fit_without_overlapping(width: int):
+    sizes = [(16, 16), (8, 8), (80, 144), (3, 3), (48, 96), (16, 16), (48, 80)]
+
+    rects, (total_width, total_height) = pack(sizes, width)
+
+    assert [rect.size for rect in rects] == sizes
+    assert total_width == max(width, 80)
+    for rect in rects:
+        assert rect.right <= total_width and rect.bottom <= total_height
+    for first, second in combinations(rects, 2):
+        assert not first.colliderect(second)
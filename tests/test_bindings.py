@@ -0,0 +1,67 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from input.actions import ContinuousAction, CooldownCounterTimer, OncePerPress
+from input.bindings import (
+    BindingTable,
+    InvalidInputMap,
+    compile_axes,
+    load_input_map,
+    parse_key,
+)
+from settings import USER_INPUT_MAP
+
+
+def test_only_pressed_and_changed_inputs_are_evaluated():
+    held, pressed_once = MagicMock(), MagicMock()
+    table = BindingTable([(1, ContinuousAction(held)), (2, OncePerPress(pressed_once))])
+
+    table.evaluate(frozenset(), 0)
+    for _ in range(3):
+        table.evaluate(frozenset({1, 2}), 0)
+
+    assert held.call_count == 3
+    pressed_once.assert_called_once()
+
+
+def test_cooldown_actions_tick_while_idle():
+    dash = CooldownCounterTimer(MagicMock(), 2, 0.2, 1)
+    table = BindingTable([(1, dash)])
+
+    for _ in range(10):
+        table.evaluate(frozenset(), 0.1)
+
+    assert table.idle == [(1, dash)]
+    assert dash.cooldown_timer > 0
+
+
+@pytest.mark.parametrize(
+    "overrides, message",
+    [
+        ('{"plyer": {}}', "Unknown context: plyer"),
+        ('{"player": {"keybord": {}}}', "Unknown device: player.keybord"),
+        ('{"player": ', "Malformed"),
+    ],
+)
+def test_user_input_map_errors_name_the_problem(
+    tmp_path, monkeypatch, overrides: str, message: str
+):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / USER_INPUT_MAP).write_text(overrides)
+    load_input_map.cache_clear()
+
+    with pytest.raises(InvalidInputMap, match=message):
+        load_input_map()
+
+
+def test_axes_need_one_input_per_direction(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / USER_INPUT_MAP).write_text(
+        '{"menu": {"keyboard": {"axes": {"move": ["e", "d", "s"]}}}}'
+    )
+    load_input_map.cache_clear()
+
+    with pytest.raises(InvalidInputMap, match="menu.keyboard.axes.move needs 4"):
+        compile_axes("menu", "keyboard", "axes", parse_key, {"move": MagicMock}, 4)
+    load_input_map.cache_clear()
@@ -0,0 +1,52 @@
+import pickle
+
+from biome import Biome, BiomeMap
+from settings import BLOCK_SIZE
+from world import BUILT_AREA, World, plant_trees
+
+
+def test_generated_runs_never_repeat_a_biome():
+    biome_map = BiomeMap.generate(1000, width=(50, 80), fade=10, seed=3)
+
+    biomes = biome_map.biomes
+    borders = [0, *(x for x in range(1, 1000) if biomes[x] != biomes[x - 1]), 1000]
+    runs = [end - start for start, end in zip(borders, borders[1:])]
+    assert len(runs) >= 13
+    assert min(runs[:-1]) >= 50 and max(runs) <= 80
+
+
+def test_neighbour_fades_in_towards_a_border():
+    biomes = [Biome.HILLS] * 40 + [Biome.DUNES] * 40
+    biome_map = BiomeMap(biomes, fade=10)
+
+    assert biome_map.get_blend(0) == (Biome.HILLS, Biome.HILLS, 0)
+    weights = [biome_map.get_blend(x * BLOCK_SIZE)[2] for x in range(28, 40)]
+    assert weights == sorted(weights) and 0 == weights[0] < weights[-1] < 0.5
+    biome, neighbour, weight = biome_map.get_blend(40 * BLOCK_SIZE)
+    assert (biome, neighbour) == (Biome.DUNES, Biome.HILLS)
+    assert weight == weights[-1]
+    assert biome_map.get_biome(-BLOCK_SIZE) == Biome.HILLS
+    assert biome_map.get_biome(10_000) == Biome.DUNES
+
+
+def test_loaded_worlds_keep_their_biomes():
+    world = World((100, 100), 10, 10)
+    biomes = bytes(world.biomes.biomes)
+
+    world.unload()
+    loaded = pickle.loads(pickle.dumps(world))
+    loaded.setup()
+
+    assert bytes(loaded.biomes.biomes) == biomes
+
+
+def test_trees_grow_where_the_biome_wants_them():
+    world = World((300, 100), 10, 10)
+    world.biomes = BiomeMap([Biome.DUNES] * 100 + [Biome.HILLS] * 200, fade=1)
+    world.blocks.empty()
+    world.changing_blocks.empty()
+
+    plant_trees(world)
+
+    columns = [block.coords[0] for block in world.changing_blocks]
+    assert columns and all(x >= 100 and abs(x - 150) > BUILT_AREA for x in columns)
@@ -3,7 +3,7 @@ from unittest.mock import MagicMock, patch
 import pygame
 import pytest
 
-from camera import Camera
+from camera import Camera, split_screen
 from characters import BaseCharacter
 from world import World
 
@@ -103,3 +103,15 @@ class TestCamera:
         mocked_setup.assert_called()
         assert camera.rect.bottom == 100
         assert camera.rect.right == 100
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 4])
+def test_split_screen_viewports_do_not_overlap(count: int):
+    screen = pygame.rect.Rect(0, 0, 1280, 720)
+
+    viewports = split_screen(screen.size, count)
+
+    assert len(viewports) == count
+    for i, viewport in enumerate(viewports):
+        assert screen.contains(viewport)
+        assert viewport.collidelist(viewports[i + 1 :]) == -1
@@ -0,0 +1,44 @@
+import pygame
+
+from characters import Player, rotate, rotation_frames
+
+
+class UnloadedPlayer(Player):
+    def __init__(self, image: pygame.surface.Surface) -> None:
+        self.original_image = image
+        self.angle = 0
+        self.is_immune = False
+
+
+def make_image():
+    image = pygame.surface.Surface((20, 20), pygame.SRCALPHA)
+    pygame.draw.rect(image, "red", (0, 0, 10, 20))
+    return image
+
+
+def test_players_share_rotation_frames():
+    first, second = UnloadedPlayer(make_image()), UnloadedPlayer(make_image())
+    first._load_rotation_frames()
+    frames = rotation_frames[(UnloadedPlayer, Player.rotation_steps)]
+    second._load_rotation_frames()
+
+    assert rotation_frames[(UnloadedPlayer, Player.rotation_steps)] is frames
+    assert len(frames[0]) == len(frames[1]) == Player.rotation_steps
+
+
+def test_images_are_the_precomputed_frame_of_the_angle():
+    player = UnloadedPlayer(make_image())
+    player._load_rotation_frames()
+    frames, immune_frames = rotation_frames[(UnloadedPlayer, Player.rotation_steps)]
+
+    player.angle = 90 + 360
+    player.update_image()
+    assert player.image is frames[Player.rotation_steps // 4]
+    expected = rotate(player.original_image, 90)
+    assert pygame.image.tobytes(player.image, "RGBA") == pygame.image.tobytes(
+        expected, "RGBA"
+    )
+
+    player.is_immune = True
+    player.update_image()
+    assert player.image is immune_frames[Player.rotation_steps // 4]
@@ -0,0 +1,116 @@
+from unittest.mock import MagicMock
+
+import pygame
+import pytest
+
+from blocks import Rock, Wood
+from characters import Player
+from events import DestroyBlock
+from inventory import Inventory
+from world import World
+
+SURFACE = 50  # the world below is filled with rock from row 51
+
+
+@pytest.fixture
+def world():
+    world = World((100, 100), 10, 10)
+    world.player = MagicMock()
+    world.set_shadow_caster(MagicMock())
+    return world
+
+
+def drop(world: World, x: int, cls=Rock, count: int = 1):
+    collectible = cls((x, SURFACE), 10, 10, world.blocks, count)
+    world.collectibles.add(collectible)
+    world.active_collectibles.add(collectible)
+    return collectible
+
+
+def settle(world: World, seconds: float = 2, dt: float = 0.1):
+    for _ in range(int(seconds / dt)):
+        world.active_collectibles.update(dt)
+        world._put_collectibles_to_sleep()
+
+
+def test_grounded_collectibles_sleep_after_the_delay(world: World):
+    collectible = drop(world, 10)
+
+    settle(world, collectible.sleep_delay / 2)
+    assert collectible in world.active_collectibles
+
+    settle(world)
+    assert collectible not in world.active_collectibles
+    assert world.sleeping_collectibles.get(collectible.support_coords) == [collectible]
+
+
+def test_sleeping_collectibles_are_neither_updated_nor_lost(world: World):
+    collectible = drop(world, 10)
+    settle(world)
+    collectible.update = MagicMock()
+    rect = collectible.rect.copy()
+
+    settle(world)
+
+    collectible.update.assert_not_called()
+    assert collectible.rect == rect
+    assert collectible.alive() and len(world.sleeping_collectibles) == 1
+
+
+def test_destroying_the_support_wakes_collectibles(world: World):
+    collectible = drop(world, 10)
+    settle(world)
+
+    world._handle_block_destruction(
+        DestroyBlock(coords=collectible.support_coords, power=10**6), 1
+    )
+
+    assert collectible in world.active_collectibles
+    assert not collectible.is_asleep
+    assert len(world.sleeping_collectibles) == 0
+
+
+def test_pulling_players_wake_collectibles(world: World):
+    collectible = drop(world, 10)
+    far = drop(world, 40)
+    settle(world)
+    player = MagicMock(collectible_pull_radius=2)
+    player.rect = pygame.rect.Rect(0, 0, 16, 32)
+    player.rect.midbottom = collectible.rect.midbottom
+
+    world._wake_pulled_collectibles(player)
+
+    assert collectible in world.active_collectibles
+    assert far not in world.active_collectibles
+
+
+def test_stacks_on_the_same_support_merge(world: World):
+    stack = drop(world, 10, count=2)
+    collectible = drop(world, 10, count=3)
+    settle(world)
+
+    assert world.sleeping_collectibles.get(stack.support_coords) == [stack]
+    assert stack.count == 5
+    assert not collectible.alive()
+
+
+def test_different_classes_or_supports_do_not_merge(world: World):
+    rock = drop(world, 10)
+    wood = drop(world, 10, Wood)
+    other_rock = drop(world, 20)
+    settle(world)
+
+    assert not rock.can_merge(wood) and not rock.can_merge(rock)
+    assert (rock.count, wood.count, other_rock.count) == (1, 1, 1)
+    assert len(world.sleeping_collectibles) == 3
+
+
+def test_picking_up_a_stack_adds_its_count(world: World):
+    # the inventory images need a display, its counts do not
+    inventory = Inventory.__new__(Inventory)
+    inventory.collectibles = {}
+    player = MagicMock(inventory=inventory)
+    Player.grab_collectible(player, drop(world, 10, count=4))
+    Player.grab_collectible(player, drop(world, 10))
+
+    assert player.inventory.collectibles == {Rock: 5}
@@ -0,0 +1,29 @@
+import pygame
+
+from settings import BLOCK_SIZE
+from utils.collision import circle_rect_contact, overlap_centroid, overlapping_tiles
+
+
+def test_overlapping_tiles():
+    rect = pygame.rect.Rect(BLOCK_SIZE - 1, 0, 2, BLOCK_SIZE)
+    assert list(overlapping_tiles(rect)) == [(0, 0), (1, 0)]
+
+
+def test_circle_resting_on_tile_does_not_collide():
+    center = pygame.math.Vector2(BLOCK_SIZE // 2, -BLOCK_SIZE)
+    tile = pygame.rect.Rect(0, 0, BLOCK_SIZE, BLOCK_SIZE)
+    assert circle_rect_contact(center, BLOCK_SIZE, tile) is None
+
+
+def test_circle_sinking_into_tile_collides_downwards():
+    center = pygame.math.Vector2(BLOCK_SIZE // 2, -BLOCK_SIZE + 1)
+    tile = pygame.rect.Rect(0, 0, BLOCK_SIZE, BLOCK_SIZE)
+    assert circle_rect_contact(center, BLOCK_SIZE, tile) == (0, BLOCK_SIZE - 1)
+
+
+def test_overlap_centroid():
+    centroid, area = overlap_centroid(
+        pygame.rect.Rect(0, 0, 10, 10), pygame.rect.Rect(6, 8, 10, 10)
+    )
+    assert centroid == (8, 9)
+    assert area == 8
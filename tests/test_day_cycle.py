@@ -1,6 +1,6 @@
 from datetime import time
 
-from day_cycle import DayPart, convert_to_time, get_day_part
+from day_cycle import DayPart, convert_to_time, get_day_part, get_daylight
 
 
 def test_convert_to_time():
@@ -34,3 +34,13 @@ def test_get_day_part():
     for k, v in m.items():
         dp = get_day_part(k)
         assert dp == v
+
+
+def test_get_daylight():
+    assert get_daylight(0.5) == (1, 1, 1)
+    night = get_daylight(0)
+    assert all(channel < 0.6 for channel in night)
+    assert get_daylight(1) == night
+    # dawn gets brighter every step of the table
+    dawn = [sum(get_daylight(hour / 24)) for hour in (5, 6, 7, 8, 9)]
+    assert dawn == sorted(dawn)
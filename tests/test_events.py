@@ -0,0 +1,41 @@
+from events import DestroyBlock, EventBus, PlaceBlock, Shoot
+
+
+def test_events_are_dispatched_by_type_on_tick():
+    bus = EventBus()
+    received = []
+    bus.subscribe(DestroyBlock, lambda event, dt: received.append((event.coords, dt)))
+
+    bus.post(DestroyBlock, coords=(1, 2), power=10)
+    bus.post(PlaceBlock, coords=(3, 4))
+    assert not received
+
+    bus.dispatch(0.5)
+    assert received == [((1, 2), 0.5)]
+
+
+def test_event_records_are_reused():
+    bus = EventBus()
+    records = []
+    bus.subscribe(DestroyBlock, lambda event, _: records.append(event))
+
+    for _ in range(3):
+        bus.post(DestroyBlock, coords=(1, 2))
+        bus.dispatch(0)
+
+    assert len({id(record) for record in records}) == 1
+    assert records[0].coords == (0, 0)
+
+
+def test_reused_records_drop_their_references():
+    bus = EventBus()
+    records = []
+    bus.subscribe(Shoot, lambda event, _: records.append(event.bullet))
+    bullet = object()
+
+    bus.post(Shoot, bullet=bullet)
+    bus.dispatch(0)
+    bus.post(Shoot)
+    bus.dispatch(0)
+
+    assert records == [bullet, None]
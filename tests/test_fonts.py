@@ -0,0 +1,37 @@
+import pygame
+import pygame.freetype
+
+from fonts import GlyphAtlas, TextCache, get_font
+from settings import DEFAULT_FONT
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+
+
+def test_text_cache_evicts_least_recently_used():
+    pygame.freetype.init()
+    font = get_font(DEFAULT_FONT, 20)
+    cache = TextCache(max_size=2)
+
+    first = cache.render(font, "a", WHITE)
+    cache.render(font, "b", WHITE)
+    assert cache.render(font, "a", WHITE) is first
+
+    cache.render(font, "c", WHITE)
+    assert len(cache) == 2
+    assert cache.render(font, "a", WHITE) is first
+
+
+def test_glyph_atlas_matches_font_rendering():
+    pygame.freetype.init()
+    font = get_font(DEFAULT_FONT, 20, antialiased=False, pad=True)
+    atlas = GlyphAtlas(font, WHITE, BLACK)
+
+    for text in ("12:45", "Afternoon"):
+        expected, _ = font.render(text, WHITE, BLACK)
+        rendered = atlas.render(text)
+
+        assert rendered.get_size() == expected.get_size()
+        assert pygame.image.tobytes(rendered, "RGB") == pygame.image.tobytes(
+            expected, "RGB"
+        )
@@ -0,0 +1,39 @@
+import pygame
+import pytest
+
+from horde import Horde, HordeState
+from pathfinding import FlowField, NavigationGrid
+from settings import BLOCK_SIZE
+from utils.container import Container2d
+
+
+@pytest.fixture
+def horde():
+    blocks = Container2d((200, 20))
+    flow_field = FlowField(NavigationGrid(blocks), 10)
+    return Horde(
+        4, 50, 30, blocks, pygame.sprite.Group(), pygame.sprite.Group(), flow_field
+    )
+
+
+def test_far_members_land_on_surface(horde: Horde):
+    ground = [10] * 201
+    horde.spawn((0, 0))
+    far = pygame.math.Vector2(199 * BLOCK_SIZE, 0)
+
+    for _ in range(60):
+        horde.update(1 / 60, far, ground)
+
+    assert horde.positions[0][1] == 10 * BLOCK_SIZE - horde.radius
+    assert not horde.characters
+
+
+def test_members_chase_nearby_target(horde: Horde):
+    ground = [10] * 201
+    horde.spawn((100 * BLOCK_SIZE, 0))
+    target = pygame.math.Vector2(170 * BLOCK_SIZE, 10 * BLOCK_SIZE)
+
+    horde.update(1 / 60, target, ground)
+
+    assert horde.states[0] == HordeState.CHASE
+    assert horde.velocities[0][0] > 0
@@ -0,0 +1,53 @@
+from unittest.mock import MagicMock
+
+import pygame
+import pygame._sdl2.controller
+
+from input.constants import Button, Key
+from input.controllers import KeyboardMenuController
+from input.state import InputSnapshot, InputState
+
+
+def test_controller_reads_polled_snapshot():
+    controllable = MagicMock()
+    controller = KeyboardMenuController(controllable)
+    controller.state = InputState()
+
+    controller.control(0)
+    controller.state.set_snapshot(InputSnapshot(keys=frozenset({Key.SPACE})))
+    controller.control(0)
+
+    controllable.select.assert_called_once()
+
+
+def test_snapshots_are_recorded():
+    state = InputState()
+    snapshot = InputSnapshot(keys=frozenset({Key.Q}))
+
+    state.start_recording()
+    state.set_snapshot(snapshot)
+
+    assert state.stop_recording() == [snapshot]
+    assert state.recording is None
+
+
+def test_gamepads_follow_their_instance_when_one_disconnects(monkeypatch):
+    def open_gamepad(device_index: int):
+        gamepad = MagicMock()
+        gamepad.as_joystick().get_instance_id.return_value = 100 + device_index
+        gamepad.get_button.side_effect = lambda button: button == device_index
+        gamepad.get_axis.return_value = 0
+        return gamepad
+
+    monkeypatch.setattr(pygame._sdl2.controller, "Controller", open_gamepad)
+    state = InputState()
+    for device_index in range(3):
+        state.handle_device_event(
+            pygame.event.Event(pygame.CONTROLLERDEVICEADDED, device_index=device_index)
+        )
+    state.handle_device_event(
+        pygame.event.Event(pygame.CONTROLLERDEVICEREMOVED, instance_id=101)
+    )
+
+    pressed = [gamepad.buttons for gamepad in state._read_gamepads()]
+    assert pressed == [frozenset({Button(0)}), frozenset({Button(2)})]
@@ -0,0 +1,32 @@
+import pygame
+
+from interface import BaseInterfaceElement, Hud
+
+
+class CountingElement(BaseInterfaceElement):
+    def __init__(self) -> None:
+        super().__init__()
+        self.line_positions = (0, 0)
+        self.value = 0
+        self.renders = 0
+
+    def get_value(self):
+        return self.value
+
+    def render(self, value: int):
+        self.renders += 1
+        return pygame.surface.Surface((4, 4))
+
+
+def test_hud_renders_elements_only_when_their_value_changes():
+    element = CountingElement()
+    hud = Hud([element])
+    display = pygame.surface.Surface((10, 10))
+
+    hud.draw(display)
+    hud.draw(display)
+    assert element.renders == 1
+
+    element.value = 1
+    hud.draw(display)
+    assert element.renders == 2
@@ -0,0 +1,14 @@
+from lighting import LightMap
+
+
+def test_light_map_mirrors_opacity_into_rows_of_bytes():
+    light_map = LightMap((4, 3))
+    light_map.changed = False
+
+    light_map[1, 2] = 127.5
+    light_map[-1, 0] = 300
+    light_map[0, 1] = -20
+
+    assert light_map.changed
+    assert light_map[1, 2] == 127.5
+    assert light_map.data == bytes([0, 0, 0, 255, 0, 0, 0, 0, 0, 127, 0, 0])
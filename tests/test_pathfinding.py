@@ -0,0 +1,46 @@
+import pygame
+import pytest
+
+from blocks import Rock, make_block
+from pathfinding import FlowField, NavigationGrid
+from settings import BLOCK_SIZE
+from utils.container import Container2d
+
+
+@pytest.fixture
+def blocks():
+    blocks = Container2d((10, 6))
+    for x in range(10):
+        blocks.set_element((x, 5), make_block(Rock, (x, 5)))
+    return blocks
+
+
+def test_path_jumps_over_wall(blocks: Container2d):
+    blocks.set_element((5, 4), make_block(Rock, (5, 4)))
+    grid = NavigationGrid(blocks)
+
+    path = grid.find_path((0, 4), (9, 4))
+
+    assert path is not None
+    assert (5, 3) in path
+
+
+def test_path_is_invalidated_by_block_placement(blocks: Container2d):
+    grid = NavigationGrid(blocks)
+    assert grid.find_path((0, 4), (9, 4)) is not None
+
+    for y in range(5):
+        blocks.set_element((5, y), make_block(Rock, (5, y)))
+        grid.invalidate((5, y))
+
+    assert grid.find_path((0, 4), (9, 4)) is None
+
+
+def test_flow_field_points_towards_goal(blocks: Container2d):
+    flow_field = FlowField(NavigationGrid(blocks), 10)
+    flow_field.update(pygame.math.Vector2(8.5 * BLOCK_SIZE, 4 * BLOCK_SIZE))
+
+    assert flow_field.next_node((2, 4)) == (3, 4)
+    direction, jump = flow_field.steer(pygame.math.Vector2(2.5 * BLOCK_SIZE, 60))
+    assert direction > 0
+    assert not jump
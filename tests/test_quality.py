@@ -0,0 +1,55 @@
+import quality
+from quality import QUALITY_LEVELS, QualityGovernor
+
+
+def test_degrades_over_budget_and_restores_with_headroom():
+    governor = QualityGovernor(budget=0.01, window=4, restore_after=8)
+    for _ in range(3):
+        assert not governor.record(0.02)
+    assert governor.record(0.02)
+    assert governor.level is QUALITY_LEVELS[1]
+
+    # just under the budget leaves no headroom to restore
+    for _ in range(20):
+        assert not governor.record(0.009)
+    assert governor.index == 1
+
+    governor = QualityGovernor(budget=0.01, window=4, restore_after=8, index=1)
+    # a full window of fast frames is not enough before the restore wait
+    for _ in range(7):
+        assert not governor.record(0.005)
+    assert governor.record(0.005)
+    assert governor.index == 0
+
+
+def test_bounded_by_the_levels_and_pinned_when_not_adaptive():
+    governor = QualityGovernor(budget=0.01, window=1)
+    for _ in range(2 * len(QUALITY_LEVELS)):
+        governor.record(1)
+    assert governor.index == len(QUALITY_LEVELS) - 1
+
+    pinned = QualityGovernor(budget=0.01, window=1, index=2, adaptive=False)
+    for _ in range(10):
+        assert not pinned.record(1)
+    assert pinned.index == 2
+    assert pinned.frame_time == 1
+
+
+def test_levels_set_past_the_last_one_pin_the_lowest(monkeypatch):
+    monkeypatch.setattr(quality, "QUALITY", "9")
+    governor = QualityGovernor.from_settings()
+    assert governor.index == len(QUALITY_LEVELS) - 1
+    assert not governor.adaptive
+
+
+def test_unknown_levels_follow_the_budget(monkeypatch, capsys):
+    monkeypatch.setattr(quality, "QUALITY", "best")
+    governor = QualityGovernor.from_settings()
+    assert governor.adaptive and governor.index == 0
+    assert "unknown QUALITY 'best'" in capsys.readouterr().out
+    assert not QualityGovernor.from_settings(deterministic=True).adaptive
+
+
+def test_samples_one_frame_in_the_interval():
+    governor = QualityGovernor(sample_interval=4)
+    assert [governor.sample() for _ in range(8)] == [False, False, False, True] * 2
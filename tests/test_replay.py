@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import pytest
+
+from input.constants import Axis, Button, Key, MouseButton
+from input.replay import InputRecorder, InputReplay
+from input.state import GamepadSnapshot, InputSnapshot, input_state
+
+
+def test_recorded_frames_are_replayed(tmp_path: Path):
+    gamepad = GamepadSnapshot(frozenset({Button.B}), tuple(range(len(Axis))))
+    frames = [
+        (1 / 60, InputSnapshot()),
+        (
+            1 / 30,
+            InputSnapshot(
+                keys=frozenset({Key.SPACE, Key.F}),
+                any_key=True,
+                mouse_buttons=frozenset({MouseButton.SECONDARY}),
+                mouse_position=(640, 360),
+                gamepads=(gamepad,),
+            ),
+        ),
+    ]
+    with InputRecorder(tmp_path / "session.inputlog", 42) as recorder:
+        for dt, snapshot in frames:
+            recorder.write(dt, snapshot)
+
+    replay = InputReplay(tmp_path / "session.inputlog")
+
+    assert replay.seed == 42
+    for dt, snapshot in frames:
+        replayed_dt, replayed_snapshot = replay.next_frame()
+        assert replayed_dt == pytest.approx(dt)
+        assert replayed_snapshot == snapshot
+    assert replay.next_frame() is None
+
+
+def test_every_bound_key_is_recorded(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(input_state, "_watched_keys", list(range(100)))
+    snapshot = InputSnapshot(keys=frozenset({3, 64, 99}))
+    with InputRecorder(tmp_path / "session.inputlog", 42) as recorder:
+        recorder.write(1 / 60, snapshot)
+
+    assert InputReplay(tmp_path / "session.inputlog").next_frame()[1] == snapshot
+
+
+def test_empty_and_cut_logs(tmp_path: Path):
+    with InputRecorder(tmp_path / "empty.inputlog", 42):
+        pass
+    assert InputReplay(tmp_path / "empty.inputlog").next_frame() is None
+
+    with InputRecorder(tmp_path / "cut.inputlog", 42) as recorder:
+        recorder.write(1 / 60, InputSnapshot(gamepads=(GamepadSnapshot(),)))
+    data = (tmp_path / "cut.inputlog").read_bytes()
+    (tmp_path / "cut.inputlog").write_bytes(data[:-1])
+    with pytest.raises(InputReplay.InvalidLog):
+        InputReplay(tmp_path / "cut.inputlog").next_frame()
+    (tmp_path / "cut.inputlog").write_bytes(data[:5])
+    with pytest.raises(InputReplay.InvalidLog):
+        InputReplay(tmp_path / "cut.inputlog")
@@ -0,0 +1,77 @@
+import moderngl
+import pygame
+import pytest
+
+from assets import load_assets
+from background import Mountains, background_images
+from settings import SCREEN_HEIGHT, SCREEN_WIDTH
+from shaders.shader import SceneShader, View
+
+
+@pytest.fixture(scope="module")
+def shader():
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+        pygame.display.init()
+    try:
+        ctx = moderngl.create_standalone_context(backend="egl")
+    except Exception:  # pylint: disable=broad-exception-caught
+        pygame.display.quit()
+        pytest.skip("no headless OpenGL")
+    pygame.display.set_mode((1, 1))
+    load_assets()
+    ctx.simple_framebuffer((SCREEN_WIDTH, SCREEN_HEIGHT)).use()
+    yield SceneShader(ctx)
+    ctx.release()
+    pygame.display.quit()
+
+
+def render(shader: SceneShader, offset: float):
+    background = Mountains()
+    shader.set_views(
+        [View(pygame.rect.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT), offset, background)]
+    )
+    # the scene is transparent, only the background shows
+    shader.render(
+        pygame.surface.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+    )
+    return shader.ctx.fbo.read(components=3)
+
+
+def pixel(data: bytes, x: int, y: int):
+    # the framebuffer counts rows from the bottom of the screen
+    index = 3 * ((SCREEN_HEIGHT - 1 - y) * SCREEN_WIDTH + x)
+    return tuple(data[index : index + 3])
+
+
+def expected_pixel(offset: float, x: int, y: int):
+    # layers are drawn back to front over the sky where they are not keyed out
+    color = pygame.Color(Mountains().color)
+    for index, displacement in Mountains.displacements.items():
+        layer = background_images[Mountains][index]
+        texel = layer.get_at((int(x + displacement * (offset % SCREEN_WIDTH)), y))
+        if texel != layer.get_colorkey():
+            color = texel
+    return tuple(color)[:3]
+
+
+@pytest.mark.parametrize("offset", [100, 100 + 3 * SCREEN_WIDTH])
+def test_views_show_the_sky_and_layers_at_their_offset(
+    shader: SceneShader, offset: float
+):
+    data = render(shader, offset)
+
+    sky = tuple(pygame.Color(Mountains().color))[:3]
+    pixels = [
+        (pixel(data, x, y), expected_pixel(offset, x, y))
+        for x in range(0, SCREEN_WIDTH, 97)
+        for y in range(0, SCREEN_HEIGHT, 53)
+    ]
+    assert all(rendered == expected for rendered, expected in pixels)
+    assert any(expected == sky for _, expected in pixels)
+    assert any(expected != sky for _, expected in pixels)
+
+
+def test_offsets_wrap_around_the_screen(shader: SceneShader):
+    assert render(shader, 100) == render(shader, 100 + SCREEN_WIDTH)
+    assert render(shader, 100) != render(shader, 200)
@@ -0,0 +1,29 @@
+import pygame
+import pytest
+
+from scheduling import LodScheduler
+
+
+class Ticking(pygame.sprite.Sprite):
+    def __init__(self, x: int) -> None:
+        super().__init__()
+        self.rect = pygame.rect.Rect(x, 0, 1, 1)
+        self.ticks: list[float] = []
+
+    def update(self, dt: float):
+        self.ticks.append(dt)
+
+
+def test_sprites_are_ticked_by_distance_from_focus():
+    scheduler = LodScheduler()
+    scheduler.set_focus(pygame.rect.Rect(0, 0, 10, 10))
+    near, band, far = Ticking(5), Ticking(10 + scheduler.margin // 2), Ticking(10**6)
+    sprites = pygame.sprite.Group(near, band, far)
+
+    for _ in range(4):
+        scheduler.update(sprites, 1 / 60)
+
+    assert len(near.ticks) == 4
+    assert len(band.ticks) == 2
+    assert sum(band.ticks) == pytest.approx(sum(near.ticks))
+    assert not far.ticks
@@ -0,0 +1,57 @@
+import pytest
+
+from sequencer import InvalidPattern, Pattern, Sequencer
+from sounds import notation_to_frequency, square_wave, triangle_wave
+
+PATTERN = """
+# lead and bass
+square  triangle
+C4+E4   G2
+-       .
+.       -
+"""
+
+
+def test_pattern_parses_chords_rests_and_holds():
+    lead, bass = Pattern.from_string(PATTERN).tracks
+
+    assert [s.duration for s in lead] == [2, 1]
+    assert lead[0].frequencies == (
+        notation_to_frequency("C4"),
+        notation_to_frequency("E4"),
+    )
+    assert lead[0].waveform is square_wave
+    assert lead[1].frequencies == ()
+
+    assert [s.duration for s in bass] == [1, 2]
+    assert bass[0].waveform is triangle_wave
+    assert bass[1].frequencies == ()
+
+
+@pytest.mark.parametrize(
+    "text", ["", "square\nC4 D4", "organ\nC4", "square\nH4"], ids=repr
+)
+def test_invalid_patterns(text: str):
+    with pytest.raises(InvalidPattern):
+        Pattern.from_string(text)
+
+
+def test_sequencer_keeps_next_beat_queued():
+    sequencer = Sequencer(channels=2)
+    assert sequencer.enabled
+
+    sequencer.play(Pattern.from_string(PATTERN), 0.1, loop=True)
+
+    assert sequencer.playing
+    for voice in sequencer.voices:
+        assert voice.channel.get_busy()
+        assert voice.channel.get_queue() is not None
+    sequencer.stop()
+    assert not sequencer.playing
+
+
+def test_sequencer_refuses_more_tracks_than_channels():
+    sequencer = Sequencer(channels=1)
+
+    with pytest.raises(InvalidPattern, match="2 tracks for 1 channels"):
+        sequencer.play(Pattern.from_string(PATTERN), 0.1)
@@ -0,0 +1,45 @@
+from sfx import Effect, SoundEffects
+from sounds import noise_sound
+
+LONG = Effect("long", lambda: noise_sound(2), voices=2, coalesce=0.1)
+URGENT = Effect(
+    "urgent", lambda: noise_sound(2, seed=1), voices=4, priority=1, coalesce=0
+)
+
+
+def test_repeats_within_the_window_are_coalesced():
+    sound_effects = SoundEffects(channels=4)
+    assert sound_effects.enabled
+
+    assert sound_effects.play(LONG, (0, 0))
+    assert not sound_effects.play(LONG, (0, 0))
+    sound_effects.update(0.1)
+    assert sound_effects.play(LONG, (0, 0))
+    sound_effects.stop()
+
+
+def test_voice_limit_and_priority_stealing():
+    sound_effects = SoundEffects(channels=3)
+    for _ in range(3):
+        sound_effects.play(LONG, (0, 0))
+        sound_effects.update(0.1)
+    # the third play took over the oldest voice instead of a free channel
+    assert sound_effects._voices.count(LONG) == 2
+
+    for _ in range(3):
+        assert sound_effects.play(URGENT, (0, 0))
+    assert sound_effects._voices.count(URGENT) == 3
+    assert not sound_effects.play(LONG, (0, 0))
+    sound_effects.stop()
+
+
+def test_distance_attenuation_and_panning():
+    sound_effects = SoundEffects(channels=1, hearing_distance=100)
+    sound_effects.set_listeners((0, 0), (1000, 0))
+
+    left, right = sound_effects._stereo_volume((-40, 0))
+    assert left > right
+    left, right = sound_effects._stereo_volume((1040, 0))
+    assert right > left
+    assert sound_effects._stereo_volume((500, 0)) == (0, 0)
+    assert not sound_effects.play(LONG, (500, 0))
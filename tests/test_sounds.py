@@ -1,6 +1,30 @@
-from sounds import notation_to_frequency
+from sounds import (
+    SAMPLE_RATE,
+    frequencies_to_sound,
+    mixer_ready,
+    notation_to_frequency,
+    square_wave,
+)
 
 
 def test_note_to_freq():
     f = notation_to_frequency("A0")
     assert f == 27.5
+
+
+def test_square_wave_period():
+    wave = square_wave(441, 100)
+
+    assert len(wave) == SAMPLE_RATE
+    # 100 samples per period, half of them high
+    assert (wave[:100] == 100).sum() == 50
+    assert (wave[:100] == -100).sum() == 50
+    assert (wave[100:200] == wave[:100]).all()
+
+
+def test_sounds_are_cached():
+    assert mixer_ready()
+    sound = frequencies_to_sound([440.0, 550.0], square_wave, 0.5)
+
+    assert frequencies_to_sound([440.0, 550.0], square_wave, 0.5) is sound
+    assert frequencies_to_sound([440.0, 550.0], square_wave, 1) is not sound
@@ -0,0 +1,37 @@
+import pygame
+import pytest
+
+from lighting import ShadowCaster
+from settings import BLOCK_SIZE
+from streaming import CHUNK_WIDTH, ChunkStreamer
+from utils.container import Container2d
+
+
+@pytest.fixture
+def streamer():
+    blocks = Container2d((10 * CHUNK_WIDTH, 10))
+    shadow_caster = ShadowCaster(blocks, pygame.rect.Rect(0, 0, 10, 10))
+    list(shadow_caster.detect_outer_layer())
+    return ChunkStreamer(shadow_caster)
+
+
+def test_chunks_in_view(streamer: ChunkStreamer):
+    view = pygame.rect.Rect(CHUNK_WIDTH * BLOCK_SIZE, 0, CHUNK_WIDTH * BLOCK_SIZE, 1)
+    assert streamer.chunks_in(view) == [1, 2]
+
+
+def test_chunks_ahead_of_velocity_come_first(streamer: ChunkStreamer):
+    view = pygame.rect.Rect(5 * CHUNK_WIDTH * BLOCK_SIZE, 0, 1, 1)
+    list(streamer.light([5]))
+
+    streamer.prioritize(view, pygame.math.Vector2(-60, 0))
+    stream = streamer.stream()
+    next(stream)
+
+    assert streamer.pending == set(range(10)) - {4, 5}
+
+
+def test_stream_lights_every_chunk(streamer: ChunkStreamer):
+    list(streamer.stream())
+
+    assert not streamer.pending
@@ -0,0 +1,16 @@
+from timings import import_times
+
+
+def test_import_times_are_grouped_by_package():
+    times = import_times("json.decoder")
+
+    assert times["json"] > 0
+    assert "json.decoder" not in times
+
+
+def test_game_world_is_not_imported_at_launch():
+    times = import_times("game")
+
+    assert "level" not in times
+    assert "world" not in times
+    assert "numpy" not in times